@@ -0,0 +1,4 @@
+from django.contrib import admin
+from .models import CourseStatistics, LessonStatistics
+
+admin.site.register([CourseStatistics, LessonStatistics])
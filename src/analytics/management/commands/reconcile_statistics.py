@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from analytics.statistics import reconcile_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute course and lesson statistics from enrollments and lesson "
+        "progress, as the scheduled reconcile_course_statistics task does"
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            courses, lessons = reconcile_statistics()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled statistics for {courses} courses and {lessons} lessons."
+            )
+        )
@@ -0,0 +1,94 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def backfill_statistics(apps, schema_editor):
+    Course = apps.get_model("course", "Course")
+    Lesson = apps.get_model("course", "Lesson")
+    Enrollment = apps.get_model("enrollment", "Enrollment")
+    LessonProgress = apps.get_model("enrollment", "LessonProgress")
+    CourseStatistics = apps.get_model("analytics", "CourseStatistics")
+    LessonStatistics = apps.get_model("analytics", "LessonStatistics")
+
+    CourseStatistics.objects.bulk_create(
+        (
+            CourseStatistics(course_id=course_id)
+            for course_id in Course.objects.values_list("id", flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+    LessonStatistics.objects.bulk_create(
+        (
+            LessonStatistics(lesson_id=lesson_id)
+            for lesson_id in Lesson.objects.values_list("id", flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+    # Median completion times are left to the first scheduled reconcile.
+    enrollments = Enrollment.objects.filter(course=OuterRef("pk"))
+    CourseStatistics.objects.update(
+        enrollments=count(enrollments, "course"),
+        completions=count(enrollments.filter(is_completed=True), "course"),
+    )
+    LessonStatistics.objects.update(
+        completions=count(
+            LessonProgress.objects.filter(
+                lesson=OuterRef("pk"), completed_at__isnull=False
+            ),
+            "lesson",
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('course', '0004_search_vectors'),
+        ('enrollment', '0004_learner_dashboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStatistics',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='course.course')),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('completions', models.PositiveIntegerField(default=0)),
+                ('median_completion_time', models.DurationField(blank=True, null=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'course_statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonStatistics',
+            fields=[
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='course.lesson')),
+                ('completions', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'lesson_statistics',
+            },
+        ),
+        migrations.RunPython(backfill_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import models
+
+from course.models import Course, Lesson
+
+
+class CourseStatistics(models.Model):
+    """Enrollment and completion totals of a course, kept up to date.
+
+    The counters move with every enrollment and completion (see
+    analytics.signals); the median only changes when the statistics are
+    reconciled, since it cannot be maintained one completion at a time.
+    """
+
+    class Meta:
+        db_table = "course_statistics"
+
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, primary_key=True, related_name="statistics"
+    )
+    enrollments = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+    median_completion_time = models.DurationField(null=True, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+
+class LessonStatistics(models.Model):
+    """Completions of a lesson.
+
+    There is no course column: lessons can move between courses, so the
+    course is always read through the lesson.
+    """
+
+    class Meta:
+        db_table = "lesson_statistics"
+
+    lesson = models.OneToOneField(
+        Lesson, on_delete=models.CASCADE, primary_key=True, related_name="statistics"
+    )
+    completions = models.PositiveIntegerField(default=0)
@@ -0,0 +1,65 @@
+from rest_framework import serializers
+
+from learnify.utils.instrumentation import InstrumentedSerializerMixin
+from .models import CourseStatistics
+from .statistics import dropoff
+
+
+class CourseStatisticsSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
+    """Expects ``select_related("course")``."""
+
+    course = serializers.SerializerMethodField()
+    completion_rate = serializers.SerializerMethodField()
+    median_completion_seconds = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CourseStatistics
+        fields = [
+            "course",
+            "enrollments",
+            "completions",
+            "completion_rate",
+            "median_completion_seconds",
+            "reconciled_at",
+        ]
+
+    def get_course(self, obj):
+        return {"id": obj.course_id, "title": obj.course.title}
+
+    def get_completion_rate(self, obj):
+        if not obj.enrollments:
+            return 0.0
+        return round(obj.completions / obj.enrollments * 100, 2)
+
+    def get_median_completion_seconds(self, obj):
+        if obj.median_completion_time is None:
+            return None
+        return obj.median_completion_time.total_seconds()
+
+
+class CourseStatisticsDetailSerializer(CourseStatisticsSerializer):
+    """Also expects the course's ``ordered_lessons``, with their statistics."""
+
+    lessons = serializers.SerializerMethodField()
+
+    class Meta(CourseStatisticsSerializer.Meta):
+        fields = CourseStatisticsSerializer.Meta.fields + ["lessons"]
+
+    def get_lessons(self, obj):
+        lessons = []
+        reached = obj.enrollments
+        for lesson in obj.course.ordered_lessons:
+            completions = lesson.statistics.completions
+            lessons.append(
+                {
+                    "id": lesson.id,
+                    "title": lesson.title,
+                    "order": lesson.order,
+                    "completions": completions,
+                    "dropoff": dropoff(reached, completions),
+                }
+            )
+            reached = completions
+        return lessons
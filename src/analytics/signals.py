@@ -0,0 +1,78 @@
+from collections import Counter, defaultdict
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from course.models import Course, Lesson
+from course.signals import courses_imported
+from enrollment.models import Enrollment
+from enrollment.signals import enrollments_created, lessons_completed
+from .models import CourseStatistics, LessonStatistics
+
+# Rows written without signals (raw bulk inserts, the synthetic data
+# generator) have no statistics, or stale ones, until reconcile_statistics
+# runs.
+
+
+@receiver(post_save, sender=Course)
+def create_course_statistics(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CourseStatistics.objects.create(course=instance)
+
+
+@receiver(post_save, sender=Lesson)
+def create_lesson_statistics(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        LessonStatistics.objects.create(lesson=instance)
+
+
+@receiver(courses_imported)
+def create_imported_statistics(sender, courses, lessons, **kwargs):
+    # Imported courses have no learners yet, so zeroed rows are exact.
+    CourseStatistics.objects.bulk_create(
+        CourseStatistics(course=course) for course in courses
+    )
+    LessonStatistics.objects.bulk_create(
+        LessonStatistics(lesson=lesson) for lesson in lessons
+    )
+
+
+@receiver(post_save, sender=Enrollment)
+def count_enrollment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CourseStatistics.objects.filter(pk=instance.course_id).update(
+            enrollments=F("enrollments") + 1
+        )
+
+
+@receiver(enrollments_created)
+def count_bulk_enrollments(sender, enrollments, **kwargs):
+    # One UPDATE per distinct number of new enrollments, not per course.
+    courses_by_count = defaultdict(list)
+    for course_id, count in Counter(e.course_id for e in enrollments).items():
+        courses_by_count[count].append(course_id)
+    for count, course_ids in courses_by_count.items():
+        CourseStatistics.objects.filter(pk__in=course_ids).update(
+            enrollments=F("enrollments") + count
+        )
+
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_enrollment(sender, instance, **kwargs):
+    changes = {"enrollments": Greatest(F("enrollments") - 1, 0)}
+    if instance.is_completed:
+        changes["completions"] = Greatest(F("completions") - 1, 0)
+    CourseStatistics.objects.filter(pk=instance.course_id).update(**changes)
+
+
+@receiver(lessons_completed)
+def count_completions(sender, enrollment, lesson_ids, course_completed, **kwargs):
+    LessonStatistics.objects.filter(pk__in=lesson_ids).update(
+        completions=F("completions") + 1
+    )
+    if course_completed:
+        CourseStatistics.objects.filter(pk=enrollment.course_id).update(
+            completions=F("completions") + 1
+        )
@@ -0,0 +1,108 @@
+from itertools import groupby
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from course.models import Course, Lesson
+from enrollment.models import Enrollment, LessonProgress
+from .models import CourseStatistics, LessonStatistics
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def reconcile_statistics():
+    """Recompute every statistics row from enrollments and lesson progress.
+
+    Creates the rows that are missing, rewrites the counters and refreshes
+    the median completion times. Returns the number of course and lesson
+    rows written.
+    """
+    CourseStatistics.objects.bulk_create(
+        (
+            CourseStatistics(course_id=course_id)
+            for course_id in Course.objects.filter(statistics__isnull=True)
+            .values_list("id", flat=True)
+            .iterator()
+        ),
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    LessonStatistics.objects.bulk_create(
+        (
+            LessonStatistics(lesson_id=lesson_id)
+            for lesson_id in Lesson.objects.filter(statistics__isnull=True)
+            .values_list("id", flat=True)
+            .iterator()
+        ),
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+
+    enrollments = Enrollment.objects.filter(course=OuterRef("pk"))
+    courses = CourseStatistics.objects.update(
+        enrollments=_count(enrollments, "course"),
+        completions=_count(enrollments.filter(is_completed=True), "course"),
+        median_completion_time=None,
+        reconciled_at=timezone.now(),
+    )
+    lessons = LessonStatistics.objects.update(
+        completions=_count(
+            LessonProgress.objects.filter(
+                lesson=OuterRef("pk"), completed_at__isnull=False
+            ),
+            "lesson",
+        )
+    )
+
+    medians = [
+        CourseStatistics(course_id=course_id, median_completion_time=median)
+        for course_id, median in median_completion_times()
+    ]
+    CourseStatistics.objects.bulk_update(
+        medians, ["median_completion_time"], batch_size=1000
+    )
+    return courses, lessons
+
+
+def median_completion_times():
+    """Yield (course id, median enrollment-to-completion time) per course.
+
+    Streams the completed enrollments once, sorted by course and duration,
+    so only one course's durations are held at a time.
+    """
+    durations = (
+        Enrollment.objects.filter(is_completed=True, completed_at__isnull=False)
+        .annotate(duration=F("completed_at") - F("enrolled_at"))
+        .order_by("course_id", "duration")
+        .values_list("course_id", "duration")
+    )
+    for course_id, rows in groupby(durations.iterator(), key=lambda row: row[0]):
+        values = [duration for _, duration in rows]
+        middle = len(values) // 2
+        if len(values) % 2:
+            median = values[middle]
+        else:
+            median = (values[middle - 1] + values[middle]) / 2
+        yield course_id, median
+
+
+def dropoff(reached, completions):
+    """Percentage of the learners who reached a lesson but never completed it.
+
+    ``reached`` is the completions of the lesson before, or the enrollments
+    for the first lesson; lessons are completed in order.
+    """
+    if not reached:
+        return 0.0
+    return round(max(reached - completions, 0) / reached * 100, 2)
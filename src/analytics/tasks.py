@@ -0,0 +1,12 @@
+from celery import shared_task
+from django.db import transaction
+
+from .statistics import reconcile_statistics
+
+
+@shared_task
+def reconcile_course_statistics():
+    """Scheduled by CELERY_BEAT_SCHEDULE; repairs drift and refreshes medians."""
+    with transaction.atomic():
+        courses, lessons = reconcile_statistics()
+    return {"courses": courses, "lessons": lessons}
@@ -0,0 +1,180 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from course.models import Course, Lesson
+from enrollment.models import Enrollment, LessonProgress
+from user.models import User
+from .models import CourseStatistics, LessonStatistics
+from .statistics import reconcile_statistics
+from .tasks import reconcile_course_statistics
+
+
+class TestCourseStatistics(APITestCase):
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f"student{i}@test.com",
+                full_name=f"Student {i}",
+                password="student123",
+                role="student",
+            )
+            for i in range(3)
+        ]
+        self.course = Course.objects.create(
+            title="Python Course",
+            description="Learn Python",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.lessons = [
+            Lesson.objects.create(
+                course=self.course, title=f"Lesson {order}", content="", order=order
+            )
+            for order in range(1, 4)
+        ]
+        self.url = reverse("specific-course-statistics", kwargs={"id": self.course.id})
+
+    def _enroll(self, student):
+        self.client.force_authenticate(user=student)
+        response = self.client.post(
+            reverse("enrollments"), {"course_id": self.course.id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return Enrollment.objects.get(user=student, course=self.course)
+
+    def _complete(self, student, enrollment, lessons):
+        self.client.force_authenticate(user=student)
+        url = reverse("enrollment-complete-bulk", kwargs={"pk": enrollment.id})
+        response = self.client.patch(
+            url, {"lessons": [lesson.id for lesson in lessons]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def _statistics(self):
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["data"]
+
+    def test_statistics_follow_enrollments_and_completions(self):
+        for count, student in enumerate(self.students):
+            enrollment = self._enroll(student)
+            self._complete(student, enrollment, self.lessons[:count + 1])
+
+        data = self._statistics()
+        self.assertEqual(data["enrollments"], 3)
+        self.assertEqual(data["completions"], 1)
+        self.assertEqual(data["completion_rate"], 33.33)
+        self.assertEqual(
+            [(lesson["completions"], lesson["dropoff"]) for lesson in data["lessons"]],
+            [(3, 0.0), (2, 33.33), (1, 50.0)],
+        )
+
+        Enrollment.objects.filter(user=self.students[2]).delete()
+        data = self._statistics()
+        self.assertEqual((data["enrollments"], data["completions"]), (2, 0))
+
+    def test_reconcile_repairs_drift_and_computes_the_median(self):
+        now = timezone.now()
+        for days, student in zip((1, 2, 6), self.students):
+            enrollment = Enrollment.objects.create(user=student, course=self.course)
+            Enrollment.objects.filter(pk=enrollment.pk).update(
+                enrolled_at=now - timedelta(days=days),
+                completed_at=now,
+                is_completed=True,
+                completed_lessons=3,
+            )
+            LessonProgress.objects.bulk_create(
+                LessonProgress(enrollment=enrollment, lesson=lesson, completed_at=now)
+                for lesson in self.lessons
+            )
+        # Rows written around the signals, like the data generator does.
+        CourseStatistics.objects.all().delete()
+        LessonStatistics.objects.filter(lesson=self.lessons[0]).update(completions=9)
+
+        self.assertEqual(reconcile_statistics(), (1, 3))
+
+        data = self._statistics()
+        self.assertEqual((data["enrollments"], data["completions"]), (3, 3))
+        self.assertEqual(data["median_completion_seconds"], 2 * 24 * 3600)
+        self.assertEqual([lesson["completions"] for lesson in data["lessons"]], [3] * 3)
+        self.assertIsNotNone(data["reconciled_at"])
+
+    def test_lesson_moved_to_another_course_is_counted_there(self):
+        enrollment = self._enroll(self.students[0])
+        self._complete(self.students[0], enrollment, self.lessons[:1])
+        other = Course.objects.create(
+            title="Other Course", description="", user=self.instructor
+        )
+
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.patch(
+            reverse("specific_lesson", kwargs={"id": self.lessons[0].id}),
+            {"course": other.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self._statistics()
+        self.assertEqual(
+            [lesson["id"] for lesson in data["lessons"]],
+            [lesson.id for lesson in self.lessons[1:]],
+        )
+        response = self.client.get(
+            reverse("specific-course-statistics", kwargs={"id": other.id})
+        )
+        lessons = response.data["data"]["lessons"]
+        self.assertEqual(
+            [(lesson["id"], lesson["completions"]) for lesson in lessons],
+            [(self.lessons[0].id, 1)],
+        )
+
+    def test_reconcile_is_scheduled(self):
+        schedule = settings.CELERY_BEAT_SCHEDULE["reconcile-course-statistics"]
+        self.assertEqual(schedule["task"], reconcile_course_statistics.name)
+        self.assertEqual(reconcile_course_statistics(), {"courses": 1, "lessons": 3})
+
+    def test_query_count_does_not_depend_on_enrollments(self):
+        self.client.force_authenticate(user=self.instructor)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        for student in self.students:
+            self._enroll(student)
+        self.client.force_authenticate(user=self.instructor)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("course-statistics"))
+        self.assertEqual(response.data["data"][0]["enrollments"], 3)
+
+    def test_only_the_owner_sees_course_statistics(self):
+        other = User.objects.create_user(
+            email="other@test.com",
+            full_name="Other Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        self.client.force_authenticate(user=other)
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND
+        )
+        response = self.client.get(reverse("course-statistics"))
+        self.assertEqual(response.data["data"], [])
+
+        self.client.force_authenticate(user=self.students[0])
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
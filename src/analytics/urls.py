@@ -0,0 +1,16 @@
+from django.urls import path
+
+from .views import CourseStatisticsAPIView, CourseStatisticsListAPIView
+
+urlpatterns = [
+    path(
+        "analytics/courses/",
+        CourseStatisticsListAPIView.as_view(),
+        name="course-statistics",
+    ),
+    path(
+        "analytics/courses/<int:id>/",
+        CourseStatisticsAPIView.as_view(),
+        name="specific-course-statistics",
+    ),
+]
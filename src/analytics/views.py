@@ -0,0 +1,99 @@
+from typing import Any
+
+from django.db.models import Prefetch
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from learnify.utils.pagination import CustomPagination
+from learnify.utils.permission import IsInstructor
+from learnify.utils.response import api_response
+from course.models import Lesson
+from .models import CourseStatistics
+from .serializers import CourseStatisticsDetailSerializer, CourseStatisticsSerializer
+
+
+def statistics_for(user):
+    """Statistics rows of the courses ``user`` may see; all for superusers."""
+    queryset = CourseStatistics.objects.select_related("course").only(
+        "course_id",
+        "enrollments",
+        "completions",
+        "median_completion_time",
+        "reconciled_at",
+        "course__title",
+    )
+    if user.is_superuser:
+        return queryset
+    return queryset.filter(course__user=user)
+
+
+class CourseStatisticsListAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsInstructor]
+    paginator = CustomPagination(keyset_ordering=("-course_id",))
+
+    @swagger_auto_schema()
+    def get(
+        self: "CourseStatisticsListAPIView",
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        # Reads the stored counters only, so the cost depends on the page size
+        # and not on how many learners the courses have.
+        statistics = statistics_for(request.user).order_by("-course_id")
+        page = self.paginator.paginate_queryset(statistics, request)
+
+        if page is not None:
+            serializer = CourseStatisticsSerializer(page, many=True)
+            return self.paginator.get_paginated_response(serializer.data)
+
+        serializer = CourseStatisticsSerializer(statistics, many=True)
+        return api_response(
+            data=serializer.data,
+            message="Course statistics retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class CourseStatisticsAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    @swagger_auto_schema()
+    def get(
+        self: "CourseStatisticsAPIView",
+        request: Request,
+        id: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        lessons = (
+            Lesson.objects.filter(statistics__isnull=False)
+            .select_related("statistics")
+            .only("id", "course_id", "title", "order", "statistics__completions")
+            .order_by("order")
+        )
+        try:
+            statistics = (
+                statistics_for(request.user)
+                .prefetch_related(
+                    Prefetch(
+                        "course__lessons",
+                        queryset=lessons,
+                        to_attr="ordered_lessons",
+                    )
+                )
+                .get(course_id=id)
+            )
+        except CourseStatistics.DoesNotExist:
+            raise NotFound("Course not found.")
+
+        return api_response(
+            data=CourseStatisticsDetailSerializer(statistics).data,
+            message="Course statistics retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
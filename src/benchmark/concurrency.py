@@ -0,0 +1,192 @@
+"""Concurrent load on the read endpoints, WSGI workers against ASGI.
+
+Both servers run in this process against the same committed data, each
+behind the same number of clients that send their next request as soon as
+the last one is answered:
+
+* ``wsgi``: Django's WSGI handler behind a pool of ``workers`` threads, as
+  a threaded gunicorn worker would run it. A request waits for a free
+  thread, then holds it through every database wait.
+* ``asgi-sync``: the ASGI handler with the sync views, which Django runs in
+  a thread per request.
+* ``asgi``: the ASGI handler with the async views on one event loop, as a
+  single uvicorn worker would run them.
+
+``db_latency`` adds a fixed delay to every query to stand in for a remote
+or busy database; with a local SQLite file the queries themselves cost
+next to nothing and every mode is bound by the CPU.
+"""
+
+import asyncio
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from learnify.utils.benchmark import percentile
+
+MODES = ("wsgi", "asgi-sync", "asgi")
+
+# (path, query string, bearer token)
+Request = Tuple[str, str, str]
+
+
+class DatabaseLatency:
+    """Sleeps before every query, on every connection while installed."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, connection, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self) -> "DatabaseLatency":
+        if self.seconds:
+            connection_created.connect(self.install)
+            self.install(connection)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        connection_created.disconnect(self.install)
+        if self in connection.execute_wrappers:
+            connection.execute_wrappers.remove(self)
+
+
+def _shares(requests: Sequence[Request], clients: int) -> List[List[Request]]:
+    return [list(requests[i::clients]) for i in range(clients)]
+
+
+def _summary(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+def run_wsgi(
+    requests: Sequence[Request], clients: int, workers: int
+) -> Dict[str, Any]:
+    handler = WSGIHandler()
+    slots = threading.BoundedSemaphore(workers)
+
+    def call(request: Request) -> float:
+        path, query, token = request
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": "testserver",
+            "HTTP_AUTHORIZATION": f"Bearer {token}",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": "http",
+        }
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(status)
+
+        start = time.perf_counter()
+        with slots:
+            response = handler(environ, start_response)
+            try:
+                b"".join(response)
+            finally:
+                # Sends request_finished, which closes the thread's connection.
+                response.close()
+        assert statuses[0].startswith("200"), (path, statuses[0])
+        return time.perf_counter() - start
+
+    def client(share: List[Request]) -> List[float]:
+        return [call(request) for request in share]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        latencies = [
+            latency
+            for share in pool.map(client, _shares(requests, clients))
+            for latency in share
+        ]
+    return _summary(latencies, time.perf_counter() - start)
+
+
+def run_asgi(requests: Sequence[Request], clients: int) -> Dict[str, Any]:
+    return asyncio.run(_run_asgi(ASGIHandler(), requests, clients))
+
+
+async def _run_asgi(
+    handler: ASGIHandler, requests: Sequence[Request], clients: int
+) -> Dict[str, Any]:
+    async def call(request: Request) -> float:
+        path, query, token = request
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        received = False
+        statuses = []
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client stays connected; the handler stops listening once
+            # the response is sent.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        start = time.perf_counter()
+        await handler(scope, receive, send)
+        assert statuses[0] == 200, (path, statuses[0])
+        return time.perf_counter() - start
+
+    async def client(share: List[Request]) -> List[float]:
+        return [await call(request) for request in share]
+
+    start = time.perf_counter()
+    shares = await asyncio.gather(
+        *(client(share) for share in _shares(requests, clients))
+    )
+    latencies = [latency for share in shares for latency in share]
+    return _summary(latencies, time.perf_counter() - start)
+
+
+def format_result(mode: str, clients: int, result: Dict[str, Any]) -> str:
+    return (
+        f"{mode}: clients={clients} requests={result['requests']} "
+        f"rps={result['rps']} p50={result['p50_ms']}ms p95={result['p95_ms']}ms"
+    )
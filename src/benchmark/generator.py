@@ -0,0 +1,281 @@
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from course.models import Course, Lesson
+from enrollment.models import Enrollment, LessonProgress
+from user.models import User, UserRoles
+
+COMPLETION_DISTRIBUTIONS = ("dropoff", "uniform", "none", "all")
+
+
+class SyntheticDataGenerator:
+    """Deterministic bulk generator for users, courses and learner progress.
+
+    Ids are assigned here, counting up from the current maximum of each
+    table, so lessons and enrollments can be referenced by arithmetic
+    instead of being read back. Rows are streamed to the database with
+    ``COPY`` on Postgres and batched inserts elsewhere. Neither fires model
+    signals, so the counters (``total_lessons``, ``completed_lessons``) are
+    written directly; the catalog cache and the course statistics are left
+    to the caller.
+
+    The same seed on the same starting database produces the same rows.
+    """
+
+    def __init__(
+        self,
+        instructors=10,
+        students=100,
+        courses_per_instructor=5,
+        lessons_per_course=10,
+        enrollment_ratio=0.1,
+        completion="dropoff",
+        retention=0.85,
+        seed=0,
+        password="password123",
+        batch_size=10000,
+        log=None,
+    ):
+        if completion not in COMPLETION_DISTRIBUTIONS:
+            raise ValueError(f"Unknown completion distribution: {completion}")
+        self.instructors = instructors
+        self.students = students
+        self.courses_per_instructor = courses_per_instructor
+        self.lessons_per_course = lessons_per_course
+        self.enrollment_ratio = enrollment_ratio
+        self.completion = completion
+        self.retention = retention
+        self.seed = seed
+        self.password = password
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def generate(self):
+        """Write every row and return the generated id ranges and row counts."""
+        # One hash shared by every generated user; hashing is the slow part.
+        self._password_hash = make_password(self.password)
+        users = self._start(User)
+        instructor_ids = range(users, users + self.instructors)
+        student_ids = range(instructor_ids.stop, instructor_ids.stop + self.students)
+        course_count = self.instructors * self.courses_per_instructor
+        course_ids = range(self._start(Course), self._start(Course) + course_count)
+        lesson_start = self._start(Lesson)
+        self._enrollment_start = self._start(Enrollment)
+
+        self._write(
+            User,
+            ["id", "email", "full_name", "role", "password", "created_at"]
+            + ["is_active", "is_superuser", "is_staff"],
+            itertools.chain(
+                self._users(instructor_ids, "instructor", UserRoles.INSTRUCTOR),
+                self._users(student_ids, "student", UserRoles.STUDENT),
+            ),
+        )
+        self._write(
+            Course,
+            ["id", "title", "description", "is_published", "total_lessons"]
+            + ["created_at", "updated_at", "user_id"],
+            self._courses(course_ids, instructor_ids),
+        )
+        self._write(
+            Lesson,
+            ["id", "course_id", "title", "content", "order"]
+            + ["created_at", "updated_at"],
+            self._lessons(course_ids, lesson_start),
+        )
+
+        enrollment_count = self._write(
+            Enrollment,
+            ["id", "user_id", "course_id", "enrolled_at", "is_completed"]
+            + ["completed_at", "completed_lessons", "last_activity_at"],
+            self._enrollments(student_ids, course_ids),
+        )
+        progress_count = self._write(
+            LessonProgress,
+            ["id", "enrollment_id", "lesson_id", "completed_at"],
+            self._progress(student_ids, course_ids, lesson_start),
+        )
+
+        self._reset_sequences()
+        return {
+            "instructor_ids": instructor_ids,
+            "student_ids": student_ids,
+            "course_ids": course_ids,
+            "lesson_start": lesson_start,
+            "counts": {
+                "users": len(instructor_ids) + len(student_ids),
+                "courses": course_count,
+                "lessons": course_count * self.lessons_per_course,
+                "enrollments": enrollment_count,
+                "progress": progress_count,
+            },
+        }
+
+    # Row producers
+
+    def _users(self, ids, prefix, role):
+        for user_id in ids:
+            yield (
+                user_id,
+                f"{prefix}{user_id}@seed.learnify.local",
+                f"{prefix.title()} {user_id}",
+                role,
+                self._password_hash,
+                self.now,
+                True,
+                False,
+                False,
+            )
+
+    def _courses(self, course_ids, instructor_ids):
+        for index, course_id in enumerate(course_ids):
+            created_at = self.now - timedelta(minutes=len(course_ids) - index)
+            yield (
+                course_id,
+                f"Course {course_id}",
+                f"Synthetic course {course_id} of {self.lessons_per_course} lessons.",
+                True,
+                self.lessons_per_course,
+                created_at,
+                created_at,
+                instructor_ids[index // self.courses_per_instructor],
+            )
+
+    def _lessons(self, course_ids, lesson_start):
+        for index, course_id in enumerate(course_ids):
+            for order in range(1, self.lessons_per_course + 1):
+                yield (
+                    lesson_start + index * self.lessons_per_course + order - 1,
+                    course_id,
+                    f"Lesson {order}",
+                    f"Synthetic lesson {order} of course {course_id}.",
+                    order,
+                    self.now,
+                    self.now,
+                )
+
+    def _plan(self, student_ids, course_ids):
+        """Yield (enrollment id, student, course index, enrolled_at, done).
+
+        Replayed from the same seed for the enrollment and the progress
+        pass, so neither has to hold the other's rows in memory.
+        """
+        rng = random.Random(self.seed)
+        enrollment_id = self._enrollment_start
+        per_student = min(
+            round(len(course_ids) * self.enrollment_ratio), len(course_ids)
+        )
+        for student_id in student_ids:
+            for index in sorted(rng.sample(range(len(course_ids)), per_student)):
+                enrolled_at = self.now - timedelta(
+                    minutes=rng.randrange(60 * 24 * 365)
+                )
+                done = self._completed_lessons(rng)
+                yield enrollment_id, student_id, index, enrolled_at, done
+                enrollment_id += 1
+
+    def _enrollments(self, student_ids, course_ids):
+        lessons = self.lessons_per_course
+        for enrollment_id, student_id, index, enrolled_at, done in self._plan(
+            student_ids, course_ids
+        ):
+            finished = done == lessons
+            last_activity = enrolled_at + timedelta(hours=done) if done else None
+            yield (
+                enrollment_id,
+                student_id,
+                course_ids[index],
+                enrolled_at,
+                finished,
+                last_activity if finished else None,
+                done,
+                last_activity,
+            )
+
+    def _progress(self, student_ids, course_ids, lesson_start):
+        progress_id = self._start(LessonProgress)
+        for enrollment_id, _, index, enrolled_at, done in self._plan(
+            student_ids, course_ids
+        ):
+            first_lesson = lesson_start + index * self.lessons_per_course
+            for order in range(done):
+                yield (
+                    progress_id,
+                    enrollment_id,
+                    first_lesson + order,
+                    enrolled_at + timedelta(hours=order + 1),
+                )
+                progress_id += 1
+
+    def _completed_lessons(self, rng):
+        lessons = self.lessons_per_course
+        if self.completion == "none":
+            return 0
+        if self.completion == "all":
+            return lessons
+        if self.completion == "uniform":
+            return rng.randint(0, lessons)
+        # dropoff: every lesson is a chance to stop, like real cohorts.
+        done = 0
+        while done < lessons and rng.random() < self.retention:
+            done += 1
+        return done
+
+    # Writing
+
+    def _start(self, model):
+        return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+    def _write(self, model, columns, rows):
+        """Stream ``rows`` (tuples matching ``columns``) into ``model``'s table."""
+        table = model._meta.db_table
+        quoted = ", ".join(connection.ops.quote_name(column) for column in columns)
+        written = 0
+        self.log(f"Writing {table}...")
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                with cursor.copy(f"COPY {table} ({quoted}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                        written += 1
+                return written
+
+            # Plain multi-row inserts rather than bulk_create, which would
+            # overwrite the generated timestamps of auto_now fields.
+            # Only datetimes need adapting; everything else is already in the
+            # form the driver expects.
+            datetimes = [
+                index
+                for index, column in enumerate(columns)
+                if model._meta.get_field(column).get_internal_type() == "DateTimeField"
+            ]
+            adapt = connection.ops.adapt_datetimefield_value
+            placeholders = ", ".join(["%s"] * len(columns))
+            sql = f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})"
+            rows = iter(rows)
+            while batch := list(itertools.islice(rows, self.batch_size)):
+                params = []
+                for row in batch:
+                    row = list(row)
+                    for index in datetimes:
+                        row[index] = adapt(row[index])
+                    params.append(row)
+                cursor.executemany(sql, params)
+                written += len(batch)
+        return written
+
+    def _reset_sequences(self):
+        models = [User, Course, Lesson, Enrollment, LessonProgress]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
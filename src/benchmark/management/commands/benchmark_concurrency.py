@@ -0,0 +1,162 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import reverse
+
+from benchmark.concurrency import (
+    MODES,
+    DatabaseLatency,
+    format_result,
+    run_asgi,
+    run_wsgi,
+)
+from course.models import Course, Lesson
+from enrollment.models import Enrollment
+from learnify.utils.authentication import clear_user_cache
+from user.models import User, UserRoles
+from user.tokens import LearnifyRefreshToken
+
+INSTRUCTOR_EMAIL = "bench-concurrency-instructor@learnify.local"
+LEARNER_EMAIL = "bench-concurrency-learner@learnify.local"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the read endpoints under "
+        "concurrent clients, served by WSGI worker threads and by ASGI. The "
+        "data is committed so the server threads can read it, and deleted "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients", type=int, nargs="+", default=[1, 10, 50]
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="WSGI worker threads.",
+        )
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=10.0,
+            help="Milliseconds added to every query.",
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            dest="modes",
+            choices=MODES,
+            help="Only run this mode; may be repeated.",
+        )
+        parser.add_argument("--courses", type=int, default=20)
+        parser.add_argument("--lessons", type=int, default=10)
+
+    def handle(self, *args, **options):
+        User.objects.filter(email__in=[INSTRUCTOR_EMAIL, LEARNER_EMAIL]).delete()
+        instructor, learner = self.create_data(options["courses"], options["lessons"])
+
+        # Queueing makes many requests slow; keep their warnings out of the
+        # results.
+        request_log = logging.getLogger("learnify.requests")
+        level = request_log.level
+        request_log.setLevel(logging.ERROR)
+        try:
+            self.run(instructor, learner, options)
+        finally:
+            request_log.setLevel(level)
+            User.objects.filter(pk__in=[instructor.pk, learner.pk]).delete()
+
+    def create_data(self, course_count, lesson_count):
+        instructor = User.objects.create(
+            email=INSTRUCTOR_EMAIL,
+            full_name="Benchmark Instructor",
+            role=UserRoles.INSTRUCTOR,
+        )
+        learner = User.objects.create(
+            email=LEARNER_EMAIL,
+            full_name="Benchmark Learner",
+            role=UserRoles.STUDENT,
+        )
+        courses = Course.objects.bulk_create(
+            Course(
+                title=f"Course {i}",
+                description="Benchmark",
+                is_published=True,
+                total_lessons=lesson_count,
+                user=instructor,
+            )
+            for i in range(course_count)
+        )
+        Lesson.objects.bulk_create(
+            (
+                Lesson(
+                    course=course,
+                    title=f"Lesson {order}",
+                    content="Benchmark",
+                    order=order,
+                )
+                for course in courses
+                for order in range(1, lesson_count + 1)
+            ),
+            batch_size=1000,
+        )
+        Enrollment.objects.bulk_create(
+            Enrollment(user=learner, course=course) for course in courses
+        )
+        return instructor, learner
+
+    def build_requests(self, instructor, learner, asynchronous, count):
+        prefix = "async_" if asynchronous else ""
+        dash = "async-" if asynchronous else ""
+        course = Course.objects.filter(user=instructor).first()
+        enrollment = Enrollment.objects.filter(user=learner).first()
+        teacher = str(LearnifyRefreshToken.for_user(instructor).access_token)
+        student = str(LearnifyRefreshToken.for_user(learner).access_token)
+
+        # Instructors bypass the catalog cache, so every request reads the
+        # database.
+        endpoints = [
+            (reverse(f"{prefix}courses"), "limit=20", teacher),
+            (reverse(f"{prefix}lessons"), f"course_id={course.id}&limit=20", student),
+            (reverse(f"{dash}enrollments"), "limit=20", student),
+            (
+                reverse(f"{dash}enrollment-progress", kwargs={"pk": enrollment.pk}),
+                "",
+                student,
+            ),
+        ]
+        return [endpoints[i % len(endpoints)] for i in range(count)]
+
+    def run(self, instructor, learner, options):
+        modes = options["modes"] or MODES
+        requests = {
+            asynchronous: self.build_requests(
+                instructor, learner, asynchronous, options["requests"]
+            )
+            for asynchronous in (False, True)
+        }
+        self.stdout.write(
+            f"{options['requests']} requests per run, "
+            f"{options['db_latency']}ms added per query, "
+            f"{options['workers']} WSGI worker threads"
+        )
+
+        allowed_hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        latency = DatabaseLatency(options["db_latency"] / 1000)
+        with override_settings(ALLOWED_HOSTS=allowed_hosts), latency:
+            for clients in options["clients"]:
+                for mode in modes:
+                    clear_user_cache()
+                    if mode == "wsgi":
+                        result = run_wsgi(
+                            requests[False], clients, options["workers"]
+                        )
+                    else:
+                        result = run_asgi(requests[mode == "asgi"], clients)
+                    self.stdout.write(format_result(mode, clients, result))
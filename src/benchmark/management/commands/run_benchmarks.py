@@ -0,0 +1,106 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from benchmark.seed import seed
+from benchmark.suite import build_scenarios, compare, run_scenarios
+from learnify.utils.benchmark import format_summary
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a benchmark dataset, time every API scenario and compare the "
+        "results with a stored baseline. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--alloc-iterations", type=int, default=5)
+        parser.add_argument("--transport", choices=["wsgi", "asgi"], default="wsgi")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Only run this scenario; may be repeated.",
+        )
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store these results as the new baseline instead of comparing.",
+        )
+        parser.add_argument("--latency-tolerance", type=float, default=0.5)
+        parser.add_argument("--alloc-tolerance", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        alloc_iterations = options["alloc_iterations"]
+        settings = {
+            "vendor": connection.vendor,
+            "scale": options["scale"],
+            "seed": options["seed"],
+            "transport": options["transport"],
+        }
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            dataset = seed(
+                options["scale"],
+                options["seed"],
+                fresh_enrollments=1 + iterations + alloc_iterations,
+            )
+            counts = ", ".join(f"{n} {name}" for name, n in dataset["counts"].items())
+            self.stdout.write(
+                f"Seeded {counts} in {time.perf_counter() - start:.1f}s"
+            )
+
+            scenarios = build_scenarios(dataset)
+            if options["scenarios"]:
+                unknown = set(options["scenarios"]) - {s.name for s in scenarios}
+                if unknown:
+                    raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}")
+                scenarios = [s for s in scenarios if s.name in options["scenarios"]]
+
+            results = run_scenarios(
+                scenarios, iterations, alloc_iterations, options["transport"]
+            )
+            for name, summary in results.items():
+                self.stdout.write(format_summary(name, summary))
+
+            transaction.set_rollback(True)
+
+        path = options["baseline"]
+        if options["update_baseline"]:
+            stored = {"settings": settings, "scenarios": results}
+            path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Baseline written to {path}")
+            return
+
+        if not path.exists():
+            self.stdout.write(f"No baseline at {path}; run with --update-baseline.")
+            return
+        baseline = json.loads(path.read_text())
+        if baseline["settings"] != settings:
+            raise CommandError(
+                f"Baseline was recorded with {baseline['settings']}, "
+                f"not {settings}; rerun with matching options or update it."
+            )
+
+        regressions = compare(
+            results,
+            baseline["scenarios"],
+            options["latency_tolerance"],
+            options["alloc_tolerance"],
+        )
+        if regressions:
+            raise CommandError(
+                "Performance regressions:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
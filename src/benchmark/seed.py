@@ -0,0 +1,75 @@
+from django.contrib.auth.hashers import make_password
+
+from analytics.statistics import reconcile_statistics
+from course.models import Course, Lesson
+from enrollment.models import Enrollment
+from user.models import User, UserRoles
+from .generator import SyntheticDataGenerator
+
+PASSWORD = "benchmark123"
+
+# Volumes at scale 1.0.
+VOLUMES = {
+    "instructors": 50,
+    "courses_per_instructor": 40,
+    "lessons_per_course": 20,
+    "students": 5000,
+}
+ENROLLMENTS_PER_STUDENT = 40
+
+
+def seed(scale=1.0, seed=0, fresh_enrollments=200):
+    """Create a deterministic benchmark dataset and return the rows it uses.
+
+    Learners have completed a random prefix of each course they are enrolled
+    in. One extra learner, the one the suite logs in as, is enrolled in
+    ``fresh_enrollments`` courses with nothing completed yet, so completion
+    runs never repeat a lesson.
+    """
+    volumes = {name: max(int(count * scale), 1) for name, count in VOLUMES.items()}
+    volumes["lessons_per_course"] = max(volumes["lessons_per_course"], 2)
+    course_count = volumes["instructors"] * volumes["courses_per_instructor"]
+
+    dataset = SyntheticDataGenerator(
+        **volumes,
+        enrollment_ratio=min(ENROLLMENTS_PER_STUDENT / course_count, 1.0),
+        completion="uniform",
+        seed=seed,
+        password=PASSWORD,
+    ).generate()
+
+    learner = User.objects.create(
+        email="bench-learner@learnify.local",
+        full_name="Benchmark Learner",
+        role=UserRoles.STUDENT,
+        password=make_password(PASSWORD),
+    )
+    courses = list(
+        Course.objects.filter(id__in=dataset["course_ids"]).order_by("id")[
+            :fresh_enrollments
+        ]
+    )
+    enrollments = Enrollment.objects.bulk_create(
+        Enrollment(user=learner, course=course) for course in courses
+    )
+    reconcile_statistics()
+    first_lessons = dict(
+        Lesson.objects.filter(course__in=courses, order=1).values_list(
+            "course_id", "id"
+        )
+    )
+
+    counts = dataset["counts"]
+    counts["enrollments"] += len(enrollments)
+    return {
+        "instructor": User.objects.get(id=dataset["instructor_ids"][0]),
+        "learner": learner,
+        "course": courses[0],
+        # (enrollment id, first lesson id) pairs the learner can complete.
+        "completions": [
+            (enrollment.id, first_lessons[enrollment.course_id])
+            for enrollment in enrollments
+        ],
+        "enrollment": enrollments[0],
+        "counts": counts,
+    }
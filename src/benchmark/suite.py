@@ -0,0 +1,217 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from learnify.utils.authentication import clear_user_cache
+from learnify.utils.benchmark import measure, measure_allocations
+from user.revocation import revoked_families
+from user.tokens import LearnifyRefreshToken
+from .seed import PASSWORD
+
+# Compared exactly; anything above the baseline is a regression.
+EXACT_METRICS = ("queries",)
+# Compared with a relative tolerance, ignoring differences below the floor.
+# p99 is reported but not checked: with a hundred runs it is one sample.
+LATENCY_METRICS = ("p50_ms", "p95_ms")
+LATENCY_FLOOR_MS = 1.0
+ALLOCATION_FLOOR_KIB = 16.0
+
+
+class Scenario:
+    """One endpoint call, parametrised by the run index."""
+
+    def __init__(self, name, method, path, data=None, user=None, max_runs=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data or (lambda i: {})
+        self.user = user
+        self.max_runs = max_runs
+
+
+def build_scenarios(dataset):
+    learner = dataset["learner"]
+    enrollment = dataset["enrollment"]
+    completions = dataset["completions"]
+    # Refreshing uses a refresh token up, so every run gets its own.
+    refreshes = [str(LearnifyRefreshToken.for_user(learner)) for _ in range(500)]
+
+    def fixed(value):
+        return lambda i: value
+
+    return [
+        # Instructors bypass the catalog cache, so this is the database path.
+        Scenario(
+            "courses_list",
+            "get",
+            fixed(reverse("courses")),
+            fixed({"limit": 20}),
+            user=dataset["instructor"],
+        ),
+        Scenario(
+            "courses_list_cached",
+            "get",
+            fixed(reverse("courses")),
+            fixed({"limit": 20}),
+            user=learner,
+        ),
+        Scenario(
+            "lessons_list",
+            "get",
+            fixed(reverse("lessons")),
+            fixed({"course_id": dataset["course"].id, "limit": 20}),
+            user=learner,
+        ),
+        Scenario(
+            "enrollments_list",
+            "get",
+            fixed(reverse("enrollments")),
+            fixed({"limit": 20}),
+            user=learner,
+        ),
+        Scenario(
+            "enrollment_progress",
+            "get",
+            fixed(reverse("enrollment-progress", kwargs={"pk": enrollment.id})),
+            user=learner,
+        ),
+        Scenario("dashboard", "get", fixed(reverse("dashboard")), user=learner),
+        Scenario(
+            "course_statistics",
+            "get",
+            fixed(
+                reverse(
+                    "specific-course-statistics", kwargs={"id": dataset["course"].id}
+                )
+            ),
+            user=dataset["instructor"],
+        ),
+        Scenario(
+            "lesson_complete",
+            "patch",
+            lambda i: reverse("enrollment-complete", kwargs={"pk": completions[i][0]}),
+            lambda i: {"lesson": completions[i][1]},
+            user=learner,
+            max_runs=len(completions),
+        ),
+        # Password hashing dominates and is slow by design.
+        Scenario(
+            "login",
+            "post",
+            fixed(reverse("user-login")),
+            fixed({"email": learner.email, "password": PASSWORD}),
+            max_runs=20,
+        ),
+        Scenario(
+            "refresh",
+            "post",
+            fixed(reverse("refresh-token")),
+            lambda i: {"refresh_token": refreshes[i]},
+            max_runs=len(refreshes),
+        ),
+    ]
+
+
+def _caller(scenario, transport):
+    client = AsyncClient() if transport == "asgi" else Client()
+    headers = {}
+    if scenario.user is not None:
+        token = LearnifyRefreshToken.for_user(scenario.user).access_token
+        headers["Authorization"] = f"Bearer {token}"
+    method = getattr(client, scenario.method)
+    if transport == "asgi":
+        method = async_to_sync(method)
+    if scenario.method != "get":
+        method_kwargs = {"content_type": "application/json"}
+    else:
+        method_kwargs = {}
+
+    def call(i):
+        response = method(
+            scenario.path(i), scenario.data(i), headers=headers, **method_kwargs
+        )
+        assert response.status_code == 200, (scenario.name, response.content)
+
+    return call
+
+
+def run_scenarios(scenarios, iterations, alloc_iterations, transport="wsgi"):
+    """Run each scenario and return its latency, query and allocation summary.
+
+    Every scenario gets one unmeasured warm-up call first, so the numbers
+    describe the steady state rather than cold caches. Runs are numbered
+    across the warm-up and both passes, so scenarios that consume data
+    (completions) never see the same index twice.
+    """
+    caches["default"].clear()
+    clear_user_cache()
+    revoked_families.clear()
+
+    results = {}
+    # The test clients send "testserver" as the host, like the test runner.
+    allowed_hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+    # The revocation pull runs on a clock, so it would land in whichever
+    # scenario happens to be running; one pull in the first warm-up is enough.
+    with override_settings(
+        ALLOWED_HOSTS=allowed_hosts, TOKEN_REVOCATION_SYNC_INTERVAL=10**9
+    ):
+        for scenario in scenarios:
+            results[scenario.name] = _run_scenario(
+                scenario, iterations, alloc_iterations, transport
+            )
+    return results
+
+
+def _run_scenario(scenario, iterations, alloc_iterations, transport):
+    runs = iterations
+    allocs = alloc_iterations
+    if scenario.max_runs is not None:
+        runs = max(min(runs, scenario.max_runs - 1 - allocs), 1)
+        allocs = max(min(allocs, scenario.max_runs - 1 - runs), 0)
+
+    call = _caller(scenario, transport)
+    call(0)
+    summary = measure(lambda i: call(1 + i), runs)
+    if allocs:
+        summary["alloc_kib"] = measure_allocations(
+            lambda i: call(1 + runs + i), allocs
+        )
+    return summary
+
+
+def compare(results, baseline, latency_tolerance, alloc_tolerance):
+    """Describe every metric in ``results`` that is worse than ``baseline``."""
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+
+        for metric in EXACT_METRICS:
+            if actual[metric] > expected[metric]:
+                regressions.append(
+                    f"{name}: {metric} {actual[metric]} > baseline {expected[metric]}"
+                )
+        for metric in LATENCY_METRICS:
+            limit = max(
+                expected[metric] * (1 + latency_tolerance),
+                expected[metric] + LATENCY_FLOOR_MS,
+            )
+            if actual[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {actual[metric]} > {limit:.3f} "
+                    f"(baseline {expected[metric]})"
+                )
+        if "alloc_kib" in expected and "alloc_kib" in actual:
+            limit = max(
+                expected["alloc_kib"] * (1 + alloc_tolerance),
+                expected["alloc_kib"] + ALLOCATION_FLOOR_KIB,
+            )
+            if actual["alloc_kib"] > limit:
+                regressions.append(
+                    f"{name}: alloc_kib {actual['alloc_kib']} > {limit:.1f} "
+                    f"(baseline {expected['alloc_kib']})"
+                )
+    return regressions
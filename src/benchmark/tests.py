@@ -0,0 +1,143 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase
+
+from course.models import Course
+from enrollment.models import Enrollment, LessonProgress
+from enrollment.utils.progress import find_counter_drift
+from user.models import User
+from .generator import SyntheticDataGenerator
+from .suite import compare
+
+
+class TestRunBenchmarks(TestCase):
+
+    def _run(self, baseline, *args):
+        out = StringIO()
+        call_command(
+            "run_benchmarks",
+            "--scale=0.05",
+            "--iterations=2",
+            "--alloc-iterations=1",
+            "--scenario=courses_list",
+            "--scenario=lesson_complete",
+            f"--baseline={baseline}",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_records_and_checks_a_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / "baseline.json"
+
+            self._run(baseline, "--update-baseline")
+            stored = json.loads(baseline.read_text())
+            self.assertEqual(
+                set(stored["scenarios"]), {"courses_list", "lesson_complete"}
+            )
+            self.assertEqual(stored["scenarios"]["lesson_complete"]["queries"], 5)
+
+            output = self._run(baseline, "--latency-tolerance=100")
+            self.assertIn("No regressions", output)
+
+        # The seeded rows are rolled back.
+        self.assertFalse(Course.objects.exists())
+
+    def test_mismatched_baseline_is_an_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / "baseline.json"
+            self._run(baseline, "--update-baseline")
+
+            with self.assertRaises(CommandError):
+                self._run(baseline, "--transport=asgi")
+
+    def test_compare_flags_extra_queries_and_slower_runs(self):
+        baseline = {
+            "courses_list": {
+                "p50_ms": 10.0,
+                "p95_ms": 20.0,
+                "p99_ms": 30.0,
+                "queries": 4,
+                "alloc_kib": 100.0,
+            }
+        }
+        results = {
+            "courses_list": {
+                "p50_ms": 10.5,
+                "p95_ms": 45.0,
+                "p99_ms": 30.0,
+                "queries": 5,
+                "alloc_kib": 200.0,
+            }
+        }
+
+        regressions = compare(results, baseline, 0.5, 0.25)
+
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(regressions[0].startswith("courses_list: queries 5"))
+
+
+class TestSyntheticDataGenerator(TestCase):
+
+    def _generate(self, **kwargs):
+        options = {
+            "instructors": 2,
+            "students": 20,
+            "courses_per_instructor": 3,
+            "lessons_per_course": 4,
+            "enrollment_ratio": 0.5,
+            "seed": 7,
+        }
+        options.update(kwargs)
+        return SyntheticDataGenerator(**options).generate()
+
+    def test_counters_match_generated_rows(self):
+        result = self._generate()
+
+        self.assertEqual(result["counts"]["enrollments"], 20 * 3)
+        self.assertEqual(
+            result["counts"]["progress"], LessonProgress.objects.count()
+        )
+        self.assertEqual(find_counter_drift(), ([], []))
+        for enrollment in Enrollment.objects.filter(completed_lessons=4):
+            self.assertTrue(enrollment.is_completed)
+
+    def test_same_seed_gives_the_same_rows(self):
+        def snapshot():
+            return list(
+                Enrollment.objects.order_by("id").values_list(
+                    "user_id", "course_id", "completed_lessons"
+                )
+            )
+
+        with transaction.atomic():
+            self._generate()
+            first = snapshot()
+            transaction.set_rollback(True)
+        self._generate()
+
+        self.assertEqual(snapshot(), first)
+
+    def test_seed_data_generates_on_request(self):
+        call_command(
+            "seed_data",
+            "--instructors=1",
+            "--students=5",
+            "--courses-per-instructor=2",
+            "--lessons-per-course=3",
+            "--enrollment-ratio=1",
+            "--completion=all",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Enrollment.objects.filter(is_completed=True).count(), 10)
+        self.assertEqual(LessonProgress.objects.count(), 30)
+        # The demo accounts are still created.
+        self.assertTrue(User.objects.filter(email="student@gmail.com").exists())
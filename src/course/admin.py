@@ -1,4 +1,4 @@
 from django.contrib import admin
-from .models import Course, Lesson
+from .models import Course, ImportJob, Lesson
 
-admin.site.register([Course, Lesson])
+admin.site.register([Course, Lesson, ImportJob])
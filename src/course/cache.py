@@ -0,0 +1,151 @@
+import datetime
+import hashlib
+import time
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.request import Request
+
+from .filters import CourseFilter
+
+VERSION_KEY = "catalog:version"
+
+# Query parameters that select a published catalog page. Requests carrying
+# anything else bypass the cache rather than multiplying its keys.
+LIST_PARAMS = tuple(CourseFilter.base_filters) + (
+    "page",
+    "limit",
+    "cursor",
+    "fields",
+)
+
+# (response data, ETag, Last-Modified): a hit answers conditional requests
+# without touching the database.
+Entry = Tuple[Any, str, Optional[datetime.datetime]]
+
+# Per-process counters; exported with the other request metrics.
+stats = {"hits": 0, "misses": 0}
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def catalog_version() -> int:
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so a version lost to eviction never comes back
+        # to a value whose pages may still be cached.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def acatalog_version() -> int:
+    cache = _cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _bump_version() -> None:
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _list_digest(request: Request) -> Optional[str]:
+    params = request.query_params
+    if any(name not in LIST_PARAMS for name in params):
+        return None
+    normalized = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return hashlib.sha1(f"{request.get_host()}|{normalized}".encode()).hexdigest()
+
+
+def list_key(request: Request) -> Optional[str]:
+    digest = _list_digest(request)
+    if digest is None:
+        return None
+    return f"catalog:v{catalog_version()}:list:{digest}"
+
+
+async def alist_key(request: Request) -> Optional[str]:
+    digest = _list_digest(request)
+    if digest is None:
+        return None
+    return f"catalog:v{await acatalog_version()}:list:{digest}"
+
+
+def detail_key(course_id: int) -> str:
+    return f"catalog:course:{course_id}"
+
+
+def lookup(key: Optional[str]) -> Optional[Entry]:
+    if key is None:
+        return None
+    return _entry(_cache().get(key))
+
+
+async def alookup(key: Optional[str]) -> Optional[Entry]:
+    if key is None:
+        return None
+    return _entry(await _cache().aget(key))
+
+
+def _entry(value: Any) -> Optional[Entry]:
+    # Anything else was written by an older release; treat it as a miss.
+    entry = value if isinstance(value, tuple) and len(value) == 3 else None
+    stats["hits" if entry is not None else "misses"] += 1
+    return entry
+
+
+def store(
+    key: Optional[str],
+    data: Any,
+    etag: str,
+    last_modified: Optional[datetime.datetime],
+) -> None:
+    if key is not None:
+        _cache().set(
+            key, (data, etag, last_modified), timeout=settings.CATALOG_CACHE_TIMEOUT
+        )
+
+
+async def astore(
+    key: Optional[str],
+    data: Any,
+    etag: str,
+    last_modified: Optional[datetime.datetime],
+) -> None:
+    if key is not None:
+        await _cache().aset(
+            key, (data, etag, last_modified), timeout=settings.CATALOG_CACHE_TIMEOUT
+        )
+
+
+def _invalidate(course_id: int) -> None:
+    _bump_version()
+    _cache().delete(detail_key(course_id))
+
+
+def invalidate_lists() -> None:
+    """Drop every cached list page, e.g. after rows were bulk inserted."""
+    _bump_version()
+
+
+def invalidate_course(course_id: int) -> None:
+    """Drop every cached page that can contain ``course_id``.
+
+    Runs once straight away and once after commit, so a request that
+    re-caches the old rows while the write is still in flight does not
+    outlive the transaction.
+    """
+    _invalidate(course_id)
+    transaction.on_commit(lambda: _invalidate(course_id))
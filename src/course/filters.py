@@ -1,11 +1,12 @@
 import django_filters
 
 from .models import Course, Lesson
+from .search import filter_title
 
 
 class CourseFilter(django_filters.FilterSet):
     is_published = django_filters.BooleanFilter(field_name="is_published")
-    title = django_filters.CharFilter(field_name="title", lookup_expr="icontains")
+    title = django_filters.CharFilter(method="filter_title")
     from_date = django_filters.DateFilter(field_name="created_at", lookup_expr="gte")
     to_date = django_filters.DateFilter(field_name="created_at", lookup_expr="lte")
 
@@ -18,10 +19,13 @@ class CourseFilter(django_filters.FilterSet):
             "to_date",
         ]
 
+    def filter_title(self, queryset, name, value):
+        return filter_title(queryset, value)
+
 
 class LessonFilter(django_filters.FilterSet):
     course_id = django_filters.NumberFilter(field_name="course__id")
-    title = django_filters.CharFilter(field_name="title", lookup_expr="icontains")
+    title = django_filters.CharFilter(method="filter_title")
     from_date = django_filters.DateFilter(field_name="created_at", lookup_expr="gte")
     to_date = django_filters.DateFilter(field_name="created_at", lookup_expr="lte")
 
@@ -33,3 +37,6 @@ class LessonFilter(django_filters.FilterSet):
             "from_date",
             "to_date",
         ]
+
+    def filter_title(self, queryset, name, value):
+        return filter_title(queryset, value)
@@ -0,0 +1,216 @@
+"""Bulk course import from JSON lines or CSV, in bounded chunks.
+
+Each record of the file is one course with its lessons. In JSON lines
+that is one object per line::
+
+    {"title": "...", "description": "...", "is_published": true,
+     "lessons": [{"title": "...", "content": "...", "order": 1}]}
+
+In CSV it is a run of consecutive rows sharing the ``course`` column, which
+only has to tell courses apart. The first row of a run carries the course
+columns (``title``, ``description``, ``is_published``) and every row may
+carry one lesson (``lesson_title``, ``lesson_content``, ``lesson_order``).
+
+The file is read one record at a time and each record is validated with
+ImportCourseSerializer, which needs no query. Valid records are written
+with ``bulk_create`` once ``IMPORT_CHUNK_SIZE`` courses and lessons are
+pending, one transaction per chunk. The transaction also advances the
+ImportJob checkpoint, so a job whose import was interrupted resumes from
+the first record that was not committed.
+"""
+
+import csv
+import json
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Course, ImportJob, Lesson
+from .serializers import ImportCourseSerializer
+from .signals import courses_imported
+
+# (first line of the record, its data, or an error when it cannot be parsed)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[Any]]
+
+COURSE_COLUMNS = ("title", "description", "is_published")
+LESSON_COLUMNS = {
+    "lesson_title": "title",
+    "lesson_content": "content",
+    "lesson_order": "order",
+}
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be imported, e.g. a CSV without its header."""
+
+
+class ImportConflict(RuntimeError):
+    """Another run of the same job committed a chunk first."""
+
+
+def text_lines(file: IO[bytes]) -> Iterator[str]:
+    """Decode ``file`` one line at a time, so a bad byte names its line."""
+    for number, line in enumerate(file, start=1):
+        try:
+            yield line.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise ImportFileError(
+                f"Line {number} is not valid UTF-8; save the file as UTF-8."
+            )
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[Record]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield number, None, {"non_field_errors": [f"Invalid JSON: {e}"]}
+            continue
+        if not isinstance(data, dict):
+            yield number, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+        yield number, data, None
+
+
+def _csv_rows(reader: csv.DictReader) -> Iterator[Dict[str, str]]:
+    """The rows of ``reader``; a malformed one fails the file with its line."""
+    while True:
+        try:
+            yield next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            raise ImportFileError(f"Line {reader.reader.line_num}: {e}.")
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Record]:
+    # Strict, so a stray quote fails the file instead of merging fields.
+    reader = csv.DictReader(lines, strict=True)
+    try:
+        fieldnames = reader.fieldnames
+    except csv.Error as e:
+        raise ImportFileError(f"Line {reader.reader.line_num}: {e}.")
+    if fieldnames is None or "course" not in fieldnames:
+        raise ImportFileError("The CSV header must have a 'course' column.")
+
+    key = first_line = course = None
+    line = reader.line_num + 1
+    for row in _csv_rows(reader):
+        # Empty cells are left out, so the serializer applies its defaults.
+        row = {column: value for column, value in row.items() if value}
+        if course is None or row.get("course") != key:
+            if course is not None:
+                yield first_line, course, None
+            key, first_line = row.get("course"), line
+            course = {c: row[c] for c in COURSE_COLUMNS if c in row}
+            course["lessons"] = []
+        lesson = {
+            field: row[column]
+            for column, field in LESSON_COLUMNS.items()
+            if column in row
+        }
+        if lesson:
+            course["lessons"].append(lesson)
+        line = reader.line_num + 1
+    if course is not None:
+        yield first_line, course, None
+
+
+READERS = {
+    ImportJob.Format.JSONL: read_jsonl,
+    ImportJob.Format.CSV: read_csv,
+}
+
+
+def guess_format(name: str) -> str:
+    if name.lower().endswith(".csv"):
+        return ImportJob.Format.CSV
+    return ImportJob.Format.JSONL
+
+
+class CourseImporter:
+    def __init__(self, job: ImportJob) -> None:
+        self.job = job
+        self.chunk_size = settings.IMPORT_CHUNK_SIZE
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_objects = 0
+        self.pending_records = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def run(self, lines: Iterable[str]) -> ImportJob:
+        """Import the records of ``lines`` the job has not settled yet."""
+        records = READERS[self.job.format](lines)
+        for line, data, error in islice(records, self.job.records_done, None):
+            if error is None:
+                serializer = ImportCourseSerializer(data=data)
+                if serializer.is_valid():
+                    record = serializer.validated_data
+                    self.pending.append(record)
+                    self.pending_objects += 1 + len(record["lessons"])
+                else:
+                    error = serializer.errors
+            if error is not None:
+                self.errors.append({"line": line, "errors": error})
+            self.pending_records += 1
+
+            if max(self.pending_objects, self.pending_records) >= self.chunk_size:
+                self.flush()
+
+        self.flush(status=ImportJob.Status.COMPLETED)
+        return self.job
+
+    def flush(self, status: str = ImportJob.Status.RUNNING) -> None:
+        job = self.job
+        room = max(settings.IMPORT_MAX_ERRORS - len(job.errors), 0)
+        errors = job.errors + self.errors[:room]
+        lesson_count = sum(len(record["lessons"]) for record in self.pending)
+
+        with transaction.atomic():
+            # Matches only while the checkpoint is the one this run started
+            # from, so two runs of one job cannot both import a chunk.
+            updated = ImportJob.objects.filter(
+                pk=job.pk, records_done=job.records_done
+            ).update(
+                status=status,
+                records_done=F("records_done") + self.pending_records,
+                records_failed=F("records_failed") + len(self.errors),
+                courses_created=F("courses_created") + len(self.pending),
+                lessons_created=F("lessons_created") + lesson_count,
+                errors=errors,
+                updated_at=timezone.now(),
+            )
+            if not updated:
+                raise ImportConflict("The import was resumed elsewhere.")
+
+            courses = Course.objects.bulk_create(
+                Course(
+                    user_id=job.user_id,
+                    total_lessons=len(record["lessons"]),
+                    **{f: record[f] for f in COURSE_COLUMNS if f in record},
+                )
+                for record in self.pending
+            )
+            lessons = Lesson.objects.bulk_create(
+                Lesson(course=course, **lesson)
+                for course, record in zip(courses, self.pending)
+                for lesson in record["lessons"]
+            )
+            if courses:
+                courses_imported.send(sender=Course, courses=courses, lessons=lessons)
+
+        job.status = status
+        job.records_done += self.pending_records
+        job.records_failed += len(self.errors)
+        job.courses_created += len(self.pending)
+        job.lessons_created += lesson_count
+        job.errors = errors
+
+        self.pending = []
+        self.pending_objects = self.pending_records = 0
+        self.errors = []
@@ -0,0 +1,95 @@
+import json
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.models import User, UserRoles
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the time and queries to create courses with their lessons "
+        "one request per object through CourseAPIView and LessonAPIView, and "
+        "with one upload to CourseImportAPIView. All data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=50)
+        parser.add_argument("--lessons", type=int, default=20)
+
+    def handle(self, *args, **options):
+        courses = options["courses"]
+        lessons = options["lessons"]
+
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(user=instructor)
+
+            def one_by_one():
+                for i in range(courses):
+                    response = client.post(
+                        reverse("courses"),
+                        {"title": f"Course {i}", "description": "Benchmark"},
+                        format="json",
+                    )
+                    assert response.status_code == 200, response.content
+                    course_id = instructor.courses.get(title=f"Course {i}").pk
+                    for order in range(1, lessons + 1):
+                        response = client.post(
+                            reverse("lessons"),
+                            {
+                                "course": course_id,
+                                "title": f"Lesson {order}",
+                                "content": "Benchmark",
+                                "order": order,
+                            },
+                            format="json",
+                        )
+                        assert response.status_code == 200, response.content
+
+            def bulk():
+                text = "\n".join(
+                    json.dumps(
+                        {
+                            "title": f"Imported {i}",
+                            "description": "Benchmark",
+                            "lessons": [
+                                {"title": f"Lesson {order}", "content": "Benchmark"}
+                                for order in range(1, lessons + 1)
+                            ],
+                        }
+                    )
+                    for i in range(courses)
+                )
+                response = client.post(
+                    reverse("course_import"),
+                    {"file": SimpleUploadedFile("courses.jsonl", text.encode())},
+                    format="multipart",
+                )
+                assert response.status_code == 200, response.content
+
+            for label, create in (
+                ("one request per object", one_by_one),
+                ("import", bulk),
+            ):
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    create()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {courses} courses x {lessons} lessons in "
+                    f"{elapsed * 1000:.0f}ms, queries={len(context.captured_queries)}"
+                )
+
+            transaction.set_rollback(True)
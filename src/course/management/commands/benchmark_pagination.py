@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from course.models import Course
+from course.views import CourseAPIView
+from learnify.utils.benchmark import format_summary, measure
+from user.models import User, UserRoles
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare offset and keyset pagination latency for a deep page of "
+        "CourseAPIView. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", type=int, default=1000)
+        parser.add_argument("--limit", type=int, default=5)
+        parser.add_argument("--iterations", type=int, default=50)
+
+    def handle(self, *args, **options):
+        page = options["page"]
+        limit = options["limit"]
+        total = page * limit
+
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            Course.objects.bulk_create(
+                (
+                    Course(
+                        title=f"Course {i}",
+                        description="Benchmark",
+                        is_published=True,
+                        user=instructor,
+                    )
+                    for i in range(total)
+                ),
+                batch_size=1000,
+            )
+
+            # The cursor a client would hold after paging to just before the
+            # requested page.
+            paginator = CourseAPIView.paginator
+            ordering = paginator.keyset_ordering
+            previous = Course.objects.filter(user=instructor).order_by(*ordering)[
+                (page - 1) * limit - 1
+            ]
+            cursor = paginator.encode_cursor(paginator.position_of(previous))
+
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(user=instructor)
+            url = reverse("courses")
+
+            def offset(_):
+                response = client.get(url, {"page": page, "limit": limit})
+                assert response.status_code == 200, response.content
+
+            def keyset(_):
+                response = client.get(url, {"cursor": cursor, "limit": limit})
+                assert response.status_code == 200, response.content
+
+            iterations = options["iterations"]
+            self.stdout.write(f"{total} courses, page {page} of size {limit}")
+            self.stdout.write(format_summary("offset", measure(offset, iterations)))
+            self.stdout.write(format_summary("keyset", measure(keyset, iterations)))
+
+            transaction.set_rollback(True)
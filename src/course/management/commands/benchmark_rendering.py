@@ -0,0 +1,117 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from course.models import Course, Lesson
+from course.serializers import ListCourseSerializer
+from learnify.utils.benchmark import percentile
+from learnify.utils.renderers import FastJSONRenderer
+from learnify.utils.serializers import FastReadMixin
+from user.models import User, UserRoles
+
+# label -> (FastReadMixin.fast_read, renderer)
+MODES = {
+    "stock": (False, JSONRenderer()),
+    "fast serializers": (True, JSONRenderer()),
+    "fast renderer": (False, FastJSONRenderer()),
+    "both": (True, FastJSONRenderer()),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the CPU time to serialize and render one page of "
+        "CourseAPIView, with DRF's serializers and JSONRenderer and with the "
+        "fast paths. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=100)
+        parser.add_argument("--lessons", type=int, default=20)
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        lesson_count = options["lessons"]
+
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            courses = Course.objects.bulk_create(
+                Course(
+                    title=f"Course {i}",
+                    description="Benchmark course with a longer description. " * 4,
+                    is_published=True,
+                    user=instructor,
+                )
+                for i in range(limit)
+            )
+            Lesson.objects.bulk_create(
+                (
+                    Lesson(course=course, title=f"Lesson {order}", order=order)
+                    for course in courses
+                    for order in range(1, lesson_count + 1)
+                ),
+                batch_size=1000,
+            )
+            # Loaded once: only the CPU spent after the queries is measured.
+            page = list(
+                ListCourseSerializer.setup_eager_loading(
+                    Course.objects.filter(user=instructor).order_by("-updated_at")
+                )
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{limit} courses with {lesson_count} lessons each, "
+            f"CPU time per response"
+        )
+        expected = None
+        stock_mean = None
+        for label, (fast_read, renderer) in MODES.items():
+            body, timings = self.measure(page, fast_read, renderer, options)
+            if expected is None:
+                expected = body
+            elif body != expected:
+                raise CommandError(f"{label} rendered different bytes.")
+
+            mean = sum(timings) / len(timings)
+            stock_mean = stock_mean or mean
+            self.stdout.write(
+                f"{label}: p50={percentile(timings, 50) * 1000:.2f}ms "
+                f"mean={mean * 1000:.2f}ms speedup={stock_mean / mean:.2f}x "
+                f"bytes={len(body)}"
+            )
+
+    def measure(self, page, fast_read, renderer, options):
+        def respond():
+            data = ListCourseSerializer(page, many=True).data
+            # The envelope of CustomPagination.get_paginated_response.
+            return renderer.render(
+                {
+                    "status": "success",
+                    "message": "Retrieved successfully",
+                    "count": len(page),
+                    "next": None,
+                    "previous": None,
+                    "data": data,
+                }
+            )
+
+        previous = FastReadMixin.fast_read
+        FastReadMixin.fast_read = fast_read
+        try:
+            body = respond()
+            timings = []
+            for _ in range(options["iterations"]):
+                start = time.process_time()
+                respond()
+                timings.append(time.process_time() - start)
+        finally:
+            FastReadMixin.fast_read = previous
+        return body, timings
@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from course.models import Course, Lesson
+from course.ordering import ORDER_GAP
+from user.models import User, UserRoles
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the time and queries to insert a lesson at the start of a "
+        "course: by renumbering every lesson one PATCH at a time, with "
+        "position on a course with gaps between orders, and with a rebalance "
+        "of a course without gaps. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lessons", type=int, default=200)
+
+    def handle(self, *args, **options):
+        lessons = options["lessons"]
+
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(user=instructor)
+
+            def course(gap):
+                course = Course.objects.create(
+                    title=f"Reorder {gap}", description="Benchmark", user=instructor
+                )
+                Lesson.objects.bulk_create(
+                    Lesson(
+                        course=course,
+                        title=f"Lesson {rank}",
+                        content="Benchmark",
+                        order=rank * gap,
+                    )
+                    for rank in range(1, lessons + 1)
+                )
+                return course
+
+            def add(course, **data):
+                response = client.post(
+                    reverse("lessons"),
+                    {"course": course.pk, "title": "New", "content": "New", **data},
+                    format="json",
+                )
+                assert response.status_code == 200, response.content
+
+            def renumbered():
+                dense = course(1)
+                for lesson in dense.lessons.order_by("-order"):
+                    response = client.patch(
+                        reverse("specific_lesson", kwargs={"id": lesson.pk}),
+                        {"order": lesson.order + 1},
+                        format="json",
+                    )
+                    assert response.status_code == 200, response.content
+                add(dense, order=1)
+
+            sparse = course(ORDER_GAP)
+            dense = course(1)
+            for label, insert in (
+                ("renumber every lesson", renumbered),
+                ("position", lambda: add(sparse, position=1)),
+                ("position after rebalance", lambda: add(dense, position=1)),
+            ):
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    insert()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {lessons} lessons in {elapsed * 1000:.1f}ms, "
+                    f"queries={len(context.captured_queries)}"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from course import imports
+from course.models import ImportJob
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import courses with their lessons from a JSON lines or CSV file for "
+        "an instructor, as /api/v1/courses/import/ does. Pass --resume with "
+        "the job id an interrupted run printed to finish it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--instructor", help="Email of the course owner.")
+        parser.add_argument("--format", choices=ImportJob.Format.values)
+        parser.add_argument("--resume", type=int, metavar="JOB")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if options["resume"] is not None:
+            job = ImportJob.objects.filter(pk=options["resume"]).first()
+            if job is None:
+                raise CommandError(f"Import job {options['resume']} does not exist.")
+            if job.status == ImportJob.Status.COMPLETED:
+                raise CommandError(f"Import job {job.pk} is already completed.")
+            self.stdout.write(
+                f"Resuming job {job.pk} after {job.records_done} records."
+            )
+        else:
+            if not options["instructor"]:
+                raise CommandError("New imports need --instructor.")
+            user = User.objects.filter(email=options["instructor"]).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['instructor']}.")
+            job = ImportJob.objects.create(
+                user=user,
+                source=path[-255:],
+                format=options["format"] or imports.guess_format(path),
+            )
+            self.stdout.write(f"Started import job {job.pk}.")
+
+        try:
+            with open(path, "rb") as file:
+                imports.CourseImporter(job).run(imports.text_lines(file))
+        except (imports.ImportFileError, imports.ImportConflict) as e:
+            raise CommandError(str(e))
+
+        for error in job.errors:
+            self.stdout.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {job.courses_created} courses and {job.lessons_created} "
+                f"lessons; {job.records_failed} records rejected."
+            )
+        )
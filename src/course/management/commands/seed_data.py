@@ -1,12 +1,82 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from analytics.statistics import reconcile_statistics
+from benchmark.generator import COMPLETION_DISTRIBUTIONS, SyntheticDataGenerator
+from course import cache as catalog_cache
 from user.models import User, UserRoles
 from course.models import Course, Lesson
 
 
 class Command(BaseCommand):
-    help = "Seed the database with instructor, student, courses, and lessons"
+    help = (
+        "Seed the database with instructor, student, courses, and lessons. "
+        "With --instructors/--students it also generates synthetic volumes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--instructors", type=int, default=0)
+        parser.add_argument("--students", type=int, default=0)
+        parser.add_argument("--courses-per-instructor", type=int, default=10)
+        parser.add_argument("--lessons-per-course", type=int, default=20)
+        parser.add_argument(
+            "--enrollment-ratio",
+            type=float,
+            default=0.05,
+            help="Share of all generated courses each student is enrolled in.",
+        )
+        parser.add_argument(
+            "--completion",
+            choices=COMPLETION_DISTRIBUTIONS,
+            default="dropoff",
+            help="How far learners got: dropoff stops after each lesson "
+            "with probability 1 - retention.",
+        )
+        parser.add_argument("--retention", type=float, default=0.85)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        self.seed_demo_data()
+
+        if options["instructors"] or options["students"]:
+            if not options["instructors"]:
+                raise CommandError("Generated students need --instructors.")
+            if not 0 <= options["enrollment_ratio"] <= 1:
+                raise CommandError("--enrollment-ratio must be between 0 and 1.")
+            self.generate(options)
+
+    def generate(self, options):
+        start = time.perf_counter()
+        generator = SyntheticDataGenerator(
+            instructors=options["instructors"],
+            students=options["students"],
+            courses_per_instructor=options["courses_per_instructor"],
+            lessons_per_course=options["lessons_per_course"],
+            enrollment_ratio=options["enrollment_ratio"],
+            completion=options["completion"],
+            retention=options["retention"],
+            seed=options["seed"],
+            password="password123",
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        with transaction.atomic():
+            result = generator.generate()
+            reconcile_statistics()
+        catalog_cache.invalidate_lists()
+
+        counts = ", ".join(f"{n} {name}" for name, n in result["counts"].items())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {counts} in {time.perf_counter() - start:.1f}s. "
+                "Generated users log in with password123."
+            )
+        )
 
-    def handle(self, *args, **kwargs):
+    def seed_demo_data(self):
         self.stdout.write("Seeding users...")
 
         # Instructor
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_lessons(apps, schema_editor):
+    Course = apps.get_model("course", "Course")
+    Lesson = apps.get_model("course", "Lesson")
+
+    lesson_counts = (
+        Lesson.objects.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Course.objects.update(total_lessons=Coalesce(Subquery(lesson_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_total_lessons, migrations.RunPython.noop),
+    ]
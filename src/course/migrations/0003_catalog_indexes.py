@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def renumber_duplicate_orders(apps, schema_editor):
+    """Renumber lessons 1..n in courses where two lessons share an order."""
+    Lesson = apps.get_model("course", "Lesson")
+
+    duplicated = (
+        Lesson.objects.values("course_id", "order")
+        .annotate(total=models.Count("id"))
+        .filter(total__gt=1)
+        .values_list("course_id", flat=True)
+        .distinct()
+    )
+    for course_id in list(duplicated):
+        lessons = list(
+            Lesson.objects.filter(course_id=course_id).order_by("order", "id")
+        )
+        for position, lesson in enumerate(lessons, start=1):
+            lesson.order = position
+        Lesson.objects.bulk_update(lessons, ["order"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0002_course_total_lessons'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-updated_at', '-id'], name='courses_published_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='courses_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['order', 'id'], name='lessons_order_idx'),
+        ),
+        migrations.RunPython(renumber_duplicate_orders, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='lesson',
+            constraint=models.UniqueConstraint(fields=('course', 'order'), name='lessons_course_order_uniq'),
+        ),
+    ]
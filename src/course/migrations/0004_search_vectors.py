@@ -0,0 +1,81 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# table -> (title column, body column)
+SEARCHABLE = {
+    "courses": ("title", "description"),
+    "lessons": ("title", "content"),
+}
+
+
+def install_postgres_search(apps, schema_editor):
+    """Keep search_vector current with a trigger, index it and backfill it.
+
+    Other backends use the FTS5 tables installed after migrate instead.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table, (title, body) in SEARCHABLE.items():
+        schema_editor.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('english', coalesce(NEW.{title}, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(NEW.{body}, '')), 'B');
+                RETURN NEW;
+            END
+            $$
+            """
+        )
+        # Counter updates such as total_lessons do not touch the text
+        # columns and so do not pay for re-parsing them.
+        schema_editor.execute(
+            f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {title}, {body} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+            """
+        )
+        schema_editor.execute(f"UPDATE {table} SET {title} = {title}")
+        schema_editor.execute(
+            f"CREATE INDEX {table}_search_vector_idx ON {table} "
+            "USING gin (search_vector)"
+        )
+
+
+def remove_postgres_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table in SEARCHABLE:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_vector_idx")
+        schema_editor.execute(
+            f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}"
+        )
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0003_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_postgres_search, remove_postgres_search),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -5,10 +6,26 @@ class Course(models.Model):
     class Meta:
         db_table = "courses"
         ordering = ["-created_at"]
+        indexes = [
+            # Student catalog: published courses, newest first.
+            models.Index(
+                fields=["-updated_at", "-id"],
+                condition=models.Q(is_published=True),
+                name="courses_published_updated_idx",
+            ),
+            # Instructor dashboard: own courses, newest first.
+            models.Index(
+                fields=["user", "-updated_at", "-id"],
+                name="courses_user_updated_idx",
+            ),
+        ]
 
     title = models.CharField(max_length=255)
     description = models.TextField()
     is_published = models.BooleanField(default=False)
+    total_lessons = models.PositiveIntegerField(default=0)
+    # Maintained by a database trigger on Postgres; see course.search.
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(
@@ -27,13 +44,65 @@ class Lesson(models.Model):
     class Meta:
         db_table = "lessons"
         ordering = ["order"]
+        constraints = [
+            # Sequential completion compares order against a counter, so two
+            # lessons of a course must never share a position.
+            models.UniqueConstraint(
+                fields=["course", "order"], name="lessons_course_order_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["order", "id"], name="lessons_order_idx"),
+        ]
 
     course = models.ForeignKey(Course, related_name="lessons", on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
     content = models.TextField()
     order = models.PositiveIntegerField()
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.course.title} - {self.title}"
+
+
+class ImportJob(models.Model):
+    """Progress of one bulk course import; see course.imports.
+
+    ``records_done`` counts the courses of the file that are settled, either
+    imported or rejected, and is committed with each chunk, so an
+    interrupted import resumes right after the last committed chunk.
+    """
+
+    class Meta:
+        db_table = "import_jobs"
+        ordering = ["-created_at"]
+
+    class Format(models.TextChoices):
+        JSONL = "jsonl", "JSON lines"
+        CSV = "csv", "CSV"
+
+    class Status(models.TextChoices):
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+
+    user = models.ForeignKey(
+        "user.User", related_name="import_jobs", on_delete=models.CASCADE
+    )
+    source = models.CharField(max_length=255)
+    format = models.CharField(max_length=8, choices=Format.choices)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.RUNNING
+    )
+    records_done = models.PositiveIntegerField(default=0)
+    courses_created = models.PositiveIntegerField(default=0)
+    lessons_created = models.PositiveIntegerField(default=0)
+    records_failed = models.PositiveIntegerField(default=0)
+    # The first IMPORT_MAX_ERRORS rejected records: {"line", "errors"}.
+    errors = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
@@ -0,0 +1,101 @@
+"""Sparse lesson orders: inserts and moves that write one row.
+
+``Lesson.order`` only sorts the lessons of a course; what learners see,
+and what sequential completion checks, is a lesson's rank in that sort.
+New lessons are spaced ``ORDER_GAP`` apart, so a lesson moved or inserted
+between two others takes the midpoint of their orders and no other row
+changes. Only when two neighbours have no integer left between them is the
+course rebalanced: every lesson is respaced ``ORDER_GAP`` apart in bulk,
+keeping its rank, which leaves room for the next ~10 inserts at any spot.
+
+Orders handed out or accepted stay below ``ORDER_LIMIT``. Rebalancing
+moves the lessons above their current orders first, so that no
+intermediate state breaks the unique (course, order) constraint, and uses
+the range up to the column's maximum as that scratch space.
+"""
+
+from typing import Optional
+
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import cache as catalog_cache
+from .models import Course, Lesson
+
+ORDER_GAP = 1024
+ORDER_LIMIT = 2**30
+
+
+def lock_course(course_id: int) -> None:
+    """Serialize order changes within one course; call inside a transaction."""
+    list(Course.objects.select_for_update().filter(pk=course_id).values("pk"))
+
+
+def order_for_position(
+    course_id: int, position: Optional[int] = None, moving: Optional[int] = None
+) -> int:
+    """The order that puts a lesson at 1-based ``position`` of its course.
+
+    ``moving`` is the id of a lesson of the course being moved, which does
+    not count as a neighbour. No position, or one past the end, appends.
+    Call with the course locked; the course may be rebalanced first.
+    """
+    for _ in range(2):
+        low, high = _neighbours(course_id, position, moving)
+        if high is None and low + ORDER_GAP < ORDER_LIMIT:
+            return low + ORDER_GAP
+        if high is not None and high - low > 1:
+            return (low + high) // 2
+        rebalance(course_id)
+    raise ValueError(f"Course {course_id} has no room for another lesson.")
+
+
+def _neighbours(course_id: int, position: Optional[int], moving: Optional[int]):
+    """Orders of the lessons before and at ``position``: (low, high).
+
+    Before the first lesson ``low`` is 0; past the last one ``high`` is None.
+    """
+    lessons = Lesson.objects.filter(course_id=course_id).exclude(pk=moving)
+    orders = []
+    if position is not None:
+        start = max(position - 2, 0)
+        orders = list(
+            lessons.order_by("order").values_list("order", flat=True)[start:position]
+        )
+        if position == 1:
+            orders.insert(0, 0)
+    if not orders:
+        # Past the end: after the last lesson.
+        return lessons.aggregate(last=Max("order"))["last"] or 0, None
+    return orders[0], orders[1] if len(orders) > 1 else None
+
+
+def rebalance(course_id: int) -> int:
+    """Respace the lessons of a course ``ORDER_GAP`` apart; return how many.
+
+    Two statement batches whatever the course size: the new orders are
+    written above every current one, then shifted down into place.
+    """
+    now = timezone.now()
+    lessons = list(
+        Lesson.objects.filter(course_id=course_id)
+        .order_by("order")
+        .only("id", "order")
+    )
+    if not lessons:
+        return 0
+    gap = min(ORDER_GAP, ORDER_LIMIT // (len(lessons) + 1))
+    # Above every current order and every new one, so neither statement can
+    # meet a row it has not rewritten yet, whichever order rows are updated.
+    offset = max(lessons[-1].order, len(lessons) * gap) + 1
+    for rank, lesson in enumerate(lessons, start=1):
+        lesson.order = offset + rank * gap
+        lesson.updated_at = now
+    Lesson.objects.bulk_update(lessons, ["order", "updated_at"], batch_size=500)
+    Lesson.objects.filter(course_id=course_id).update(order=F("order") - offset)
+
+    # Neither statement sends post_save; ranks are unchanged, but the
+    # orders every lesson list shows are not.
+    Course.objects.filter(pk=course_id).update(updated_at=now)
+    catalog_cache.invalidate_course(course_id)
+    return len(lessons)
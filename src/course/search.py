@@ -0,0 +1,152 @@
+"""Full-text search over courses and lessons.
+
+Postgres keeps a weighted ``search_vector`` column (title A, body B) current
+with BEFORE INSERT/UPDATE triggers and indexes it with GIN; see migration
+0004. SQLite, used for local runs and tests, falls back to FTS5 external
+content tables kept in sync by triggers that ``install_sqlite_fts`` creates
+after every migrate.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, QuerySet, TextField
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "english"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# table -> indexed (title, body) columns
+SEARCH_COLUMNS = {
+    "courses": ("title", "description"),
+    "lessons": ("title", "content"),
+}
+
+
+def _tokens(text: str) -> list:
+    return re.findall(r"\w+", text.lower())
+
+
+def search(queryset: QuerySet, text: str) -> QuerySet:
+    """Rows of ``queryset`` matching ``text``, best first.
+
+    Each row is annotated with ``rank`` (higher is better) and ``snippet``,
+    an excerpt of the body with matches wrapped in ``<mark>``.
+    """
+    table = queryset.model._meta.db_table
+    body = SEARCH_COLUMNS[table][1]
+
+    if connection.vendor == "postgresql":
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                snippet=SearchHeadline(
+                    body,
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    max_words=35,
+                    min_words=15,
+                ),
+            )
+            .order_by("-rank", "id")
+        )
+
+    match = " ".join(f'"{token}"' for token in _tokens(text))
+    if not match:
+        return queryset.none()
+    fts = f"{table}_fts"
+    matched = f"FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = {table}.id"
+    return (
+        queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+        )
+        .annotate(
+            # bm25() is lower-is-better; negate it to match SearchRank.
+            rank=RawSQL(
+                f"SELECT -bm25({fts}, 10.0, 5.0) {matched}",
+                [match],
+                output_field=FloatField(),
+            ),
+            snippet=RawSQL(
+                f"SELECT snippet({fts}, 1, %s, %s, '…', 24) {matched}",
+                [HIGHLIGHT_START, HIGHLIGHT_STOP, match],
+                output_field=TextField(),
+            ),
+        )
+        .order_by("-rank", "id")
+    )
+
+
+def filter_title(queryset: QuerySet, text: str) -> QuerySet:
+    """Rows whose title has words starting with every word of ``text``."""
+    tokens = _tokens(text)
+    if not tokens:
+        return queryset
+
+    if connection.vendor == "postgresql":
+        # Weight A holds the title; ":*A" is a prefix match restricted to it.
+        raw = " & ".join(f"{token}:*A" for token in tokens)
+        query = SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query)
+
+    table = queryset.model._meta.db_table
+    fts = f"{table}_fts"
+    match = " AND ".join(f'title : "{token}"*' for token in tokens)
+    return queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+    )
+
+
+def install_sqlite_fts(using: str = "default", **kwargs) -> None:
+    """Create the FTS5 fallback tables and triggers if any are missing.
+
+    Runs after every migrate because SQLite rebuilds a table (dropping its
+    triggers) for many schema changes; the index is rebuilt whenever a
+    trigger had to be recreated.
+    """
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+
+    with conn.cursor() as cursor:
+        for table, (title, body) in SEARCH_COLUMNS.items():
+            fts = f"{table}_fts"
+            triggers = {f"{fts}_insert", f"{fts}_delete", f"{fts}_update"}
+            cursor.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'trigger' AND tbl_name = %s",
+                [table],
+            )
+            if triggers <= {row[0] for row in cursor.fetchall()}:
+                continue
+
+            columns = f"{title}, {body}"
+            old = f"'delete', old.id, old.{title}, old.{body}"
+            new = f"new.id, new.{title}, new.{body}"
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{columns}, content='{table}', content_rowid='id', "
+                "tokenize='porter unicode61')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} "
+                f"BEGIN INSERT INTO {fts}(rowid, {columns}) VALUES ({new}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} "
+                f"BEGIN INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ({old}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} "
+                f"BEGIN INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ({old}); "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES ({new}); END"
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
@@ -1,23 +1,101 @@
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
 from rest_framework import serializers
-from .models import Course, Lesson
+from . import ordering
+from .models import Course, ImportJob, Lesson
+from learnify.utils.instrumentation import InstrumentedSerializerMixin
+from learnify.utils.serializers import DynamicFieldsMixin, FastReadMixin
 
 
 class AddLessonSerializer(serializers.ModelSerializer):
+    """Creates, edits and moves lessons; call ``save()`` in a transaction.
+
+    ``position`` places the lesson at that 1-based rank of its course, for
+    one row written in the usual case; see course.ordering. Without it or
+    an explicit ``order``, a new lesson goes last.
+    """
+
+    position = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        write_only=True,
+        help_text="1-based place among the lessons of the course.",
+    )
+
     class Meta:
         model = Lesson
-        fields = ["course", "title", "content", "order"]
+        fields = ["course", "title", "content", "order", "position"]
+        extra_kwargs = {
+            "order": {"required": False, "max_value": ordering.ORDER_LIMIT - 1}
+        }
+
+    def get_validators(self):
+        # The (course, order) constraint is checked in validate(), where a
+        # missing order is allowed.
+        return []
+
+    def validate(self, attrs):
+        if "order" in attrs and "position" in attrs:
+            raise serializers.ValidationError("Send either order or position.")
+
+        if "order" in attrs:
+            course = attrs.get("course") or self.instance.course
+            clashes = Lesson.objects.filter(course=course, order=attrs["order"])
+            if self.instance is not None:
+                clashes = clashes.exclude(pk=self.instance.pk)
+            if clashes.exists():
+                raise serializers.ValidationError(
+                    {"order": "Another lesson of this course has this order."}
+                )
+        return attrs
+
+    def place(self, validated_data):
+        """Set ``order`` from ``position`` when the lesson is added or moves."""
+        position = validated_data.pop("position", None)
+        if "order" in validated_data:
+            return
+        lesson = self.instance
+        course = validated_data.get("course") or lesson.course
+        if lesson is not None and position is None and course.pk == lesson.course_id:
+            return
+
+        ordering.lock_course(course.pk)
+        validated_data["order"] = ordering.order_for_position(
+            course.pk, position, moving=lesson.pk if lesson else None
+        )
 
     def create(self, validated_data):
-        lesson = Lesson.objects.create(**validated_data)
-        return lesson
+        self.place(validated_data)
+        return Lesson.objects.create(**validated_data)
 
     def update(self, instance, validated_data):
+        self.place(validated_data)
         return super().update(instance, validated_data)
 
 
-class ListLessonSerializer(serializers.ModelSerializer):
+class ListLessonSerializer(
+    InstrumentedSerializerMixin,
+    FastReadMixin,
+    DynamicFieldsMixin,
+    serializers.ModelSerializer,
+):
     course = serializers.SerializerMethodField()
 
+    # Model columns behind each field; id and order, the pagination keys,
+    # and the timestamps behind the HTTP validators are always loaded.
+    COLUMNS = {
+        "course": [
+            "course__id",
+            "course__title",
+            "course__is_published",
+            "course__updated_at",
+        ],
+        "title": ["title"],
+        "content": ["content"],
+        "created_at": ["created_at"],
+        "updated_at": ["updated_at"],
+    }
+
     class Meta:
         model = Lesson
         fields = [
@@ -29,16 +107,36 @@ class ListLessonSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # Lesson bodies can be large; lists only send them on ?expand=content.
+        expandable_fields = ["content"]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is None:
+            fields = cls.default_fields()
+        columns = ["id", "order", "updated_at"]
+        for name in fields:
+            columns += cls.COLUMNS.get(name, [])
+        if "course" in fields:
+            queryset = queryset.select_related("course")
+        return queryset.only(*columns)
 
     def get_course(self, obj):
         return {
             "id": obj.course.id,
             "title": obj.course.title,
-            "description": obj.course.description,
             "is_published": obj.course.is_published,
         }
 
 
+class LessonContentSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = Lesson
+        fields = ["id", "title", "content", "updated_at"]
+
+
 class AddCourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
@@ -53,9 +151,86 @@ class AddCourseSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class ListCourseSerializer(serializers.ModelSerializer):
+class ImportLessonSerializer(serializers.ModelSerializer):
+    order = serializers.IntegerField(
+        min_value=1, max_value=ordering.ORDER_LIMIT - 1, required=False
+    )
+
+    class Meta:
+        model = Lesson
+        fields = ["title", "content", "order"]
+
+
+class ImportCourseSerializer(serializers.ModelSerializer):
+    """One course of an import file; validated without touching the database."""
+
+    lessons = ImportLessonSerializer(many=True, default=list)
+
+    class Meta:
+        model = Course
+        fields = ["title", "description", "is_published", "lessons"]
+
+    def validate_lessons(self, lessons):
+        # A lesson without an order comes right after the one before it,
+        # leaving room to insert lessons in between later.
+        orders = set()
+        previous = 0
+        for lesson in lessons:
+            lesson.setdefault("order", previous + ordering.ORDER_GAP)
+            if lesson["order"] in orders:
+                raise serializers.ValidationError(
+                    f"More than one lesson has order {lesson['order']}."
+                )
+            orders.add(lesson["order"])
+            previous = lesson["order"]
+        return lessons
+
+
+class ImportUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=ImportJob.Format.choices, required=False)
+    job = serializers.IntegerField(
+        required=False, help_text="Resume this unfinished import."
+    )
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "source",
+            "format",
+            "status",
+            "records_done",
+            "courses_created",
+            "lessons_created",
+            "records_failed",
+            "errors",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class ListCourseSerializer(
+    InstrumentedSerializerMixin,
+    FastReadMixin,
+    DynamicFieldsMixin,
+    serializers.ModelSerializer,
+):
     lesson_list = serializers.SerializerMethodField()
 
+    # Model columns behind each field; id and updated_at, the pagination
+    # keys, are always loaded.
+    COLUMNS = {
+        "title": ["title"],
+        "description": ["description"],
+        "is_published": ["is_published"],
+        "created_at": ["created_at"],
+        # Read by the nested lessons' course summary.
+        "lesson_list": ["title", "is_published"],
+    }
+
     class Meta:
         model = Course
         fields = [
@@ -68,6 +243,72 @@ class ListCourseSerializer(serializers.ModelSerializer):
             "lesson_list",
         ]
 
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is None:
+            fields = cls.default_fields()
+        columns = ["id", "updated_at"]
+        for name in fields:
+            columns += cls.COLUMNS.get(name, [])
+        queryset = queryset.only(*columns)
+        if "lesson_list" not in fields:
+            return queryset
+        return queryset.prefetch_related(cls.lesson_prefetch())
+
+    @staticmethod
+    def lesson_prefetch():
+        # The reverse prefetch attaches each course instance to its lessons,
+        # so ListLessonSerializer.get_course never goes back to the database.
+        lessons = Lesson.objects.only(
+            "id", "course_id", "title", "order", "created_at", "updated_at"
+        )
+        return Prefetch("lessons", queryset=lessons)
+
+    @cached_property
+    def lesson_serializer(self):
+        # Built once per page: constructing a ModelSerializer per course
+        # cost more than rendering its lessons.
+        return ListLessonSerializer()
+
     def get_lesson_list(self, obj):
-        lessons = obj.lessons.all()
-        return ListLessonSerializer(lessons, many=True).data
+        return [
+            self.lesson_serializer.to_representation(lesson)
+            for lesson in obj.lessons.all()
+        ]
+
+
+class CourseSearchResultSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ["id", "title", "is_published", "rank", "snippet"]
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # The snippet is cut in the database; the body itself is not fetched.
+        return queryset.only("id", "title", "is_published")
+
+
+class LessonSearchResultSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
+    course_id = serializers.IntegerField(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Lesson
+        fields = ["id", "course_id", "title", "order", "rank", "snippet"]
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.only("id", "course_id", "title", "order")
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.ChoiceField(choices=["courses", "lessons"], default="courses")
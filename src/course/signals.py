@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import cache as catalog_cache
+from .models import Course, Lesson
+
+# Sent for courses and lessons written with bulk_create, which skips
+# post_save, with ``courses`` and ``lessons``. The courses' total_lessons
+# are already counted.
+courses_imported = Signal()
+
+# A course's updated_at is also the HTTP validator of everything that embeds
+# its lessons (see learnify.utils.conditional), so every lesson write moves
+# it, in the same UPDATE that keeps total_lessons in step.
+
+
+@receiver(post_save, sender=Lesson)
+def touch_course_on_lesson_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changes = {"updated_at": instance.updated_at}
+    if created:
+        changes["total_lessons"] = F("total_lessons") + 1
+    Course.objects.filter(pk=instance.course_id).update(**changes)
+
+
+@receiver(post_delete, sender=Lesson)
+def touch_course_on_lesson_delete(sender, instance, **kwargs):
+    Course.objects.filter(pk=instance.course_id).update(
+        total_lessons=Greatest(F("total_lessons") - 1, 0),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_cached_course(sender, instance, **kwargs):
+    catalog_cache.invalidate_course(instance.pk)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_cached_lesson_course(sender, instance, **kwargs):
+    catalog_cache.invalidate_course(instance.course_id)
+
+
+@receiver(courses_imported)
+def invalidate_cached_lists_on_import(sender, courses, lessons, **kwargs):
+    # New courses have no cached detail pages, only list pages to drop.
+    catalog_cache.invalidate_lists()
+    transaction.on_commit(catalog_cache.invalidate_lists)
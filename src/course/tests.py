@@ -1,9 +1,40 @@
+import datetime
+import decimal
+import json
+import tempfile
+import uuid
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 
+from learnify.utils.instrumentation import InstrumentationMiddleware, registry
+from learnify.utils.renderers import FastJSONRenderer
+from learnify.utils.serializers import FastReadMixin
+from learnify.utils.testing import (
+    QueryCountAssertionsMixin,
+    QueryPlanAssertionsMixin,
+)
+from analytics.models import CourseStatistics, LessonStatistics
+from user import revocation
 from user.models import User
-from .models import Course
+from user.tokens import LearnifyRefreshToken
+from . import cache as catalog_cache, ordering
+from .models import Course, ImportJob, Lesson
+from .serializers import ListCourseSerializer
 
 
 class TestCourseList(APITestCase):
@@ -80,3 +111,1263 @@ class TestCourseCreationPermission(APITestCase):
 
         response = self.client.post(self.url, self.payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestCourseListQueryCount(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student3@test.com",
+            full_name="Student Three",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor3@test.com",
+            full_name="Instructor Three",
+            password="instructor123",
+            role="instructor",
+        )
+
+        for i in range(20):
+            course = Course.objects.create(
+                title=f"Course {i}",
+                description="Course description",
+                is_published=True,
+                user=instructor,
+            )
+            for order in range(1, 4):
+                Lesson.objects.create(
+                    course=course,
+                    title=f"Lesson {order}",
+                    content="Lesson content",
+                    order=order,
+                )
+
+        self.url = reverse("courses")
+
+    def _count_queries(self, limit):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"limit": limit})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), limit)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.client.force_authenticate(user=self.student)
+
+        self.assertEqual(self._count_queries(2), self._count_queries(20))
+
+    def test_lessons_embed_parent_course(self):
+        self.client.force_authenticate(user=self.student)
+
+        response = self.client.get(self.url, {"limit": 1})
+
+        course = response.data["data"][0]
+        self.assertEqual(len(course["lesson_list"]), 3)
+        for lesson in course["lesson_list"]:
+            self.assertEqual(lesson["course"]["id"], course["id"])
+            self.assertEqual(lesson["course"]["title"], course["title"])
+
+    def test_course_detail_runs_fixed_number_of_queries(self):
+        self.client.force_authenticate(user=self.student)
+        course = Course.objects.first()
+        url = reverse("specific_course", kwargs={"id": course.id})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]["lesson_list"]), 3)
+
+
+class TestCatalogCache(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student4@test.com",
+            full_name="Student Four",
+            password="student123",
+            role="student",
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor4@test.com",
+            full_name="Instructor Four",
+            password="instructor123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(
+            title="Cached Course",
+            description="Served from cache",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.url = reverse("courses")
+        self.detail_url = reverse("specific_course", kwargs={"id": self.course.id})
+
+    def test_second_request_is_served_without_queries(self):
+        self.client.force_authenticate(user=self.student)
+        hits = catalog_cache.stats["hits"]
+
+        first = self.client.get(self.url, {"is_published": "true"})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {"is_published": "true"})
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(catalog_cache.stats["hits"], hits + 1)
+
+    def test_lesson_write_invalidates_list_and_detail(self):
+        self.client.force_authenticate(user=self.student)
+        self.client.get(self.url)
+        self.client.get(self.detail_url)
+
+        Lesson.objects.create(
+            course=self.course, title="New lesson", content="Content", order=1
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["data"][0]["lesson_list"]), 1)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["data"]["lesson_list"]), 1)
+
+    def test_moving_a_lesson_invalidates_its_previous_course(self):
+        lesson = Lesson.objects.create(
+            course=self.course, title="Moving lesson", content="Content", order=1
+        )
+        other = Course.objects.create(
+            title="Other Course",
+            description="Receives the lesson",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.client.force_authenticate(user=self.student)
+        self.client.get(self.detail_url)
+
+        self.client.force_authenticate(user=self.instructor)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse("specific_lesson", kwargs={"id": lesson.id}),
+                {"course": other.id},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.student)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["data"]["lesson_list"], [])
+
+    def test_unpublishing_removes_course_from_cached_pages(self):
+        self.client.force_authenticate(user=self.student)
+        self.client.get(self.url)
+
+        self.course.is_published = False
+        self.course.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["data"], [])
+
+    def test_instructors_bypass_the_shared_cache(self):
+        self.client.force_authenticate(user=self.instructor)
+
+        response = self.client.get(self.url)
+
+        self.assertNotIn("X-Cache", response)
+
+
+class TestConditionalRequests(APITestCase):
+
+    def setUp(self):
+        catalog_cache._cache().clear()
+        self.student = User.objects.create_user(
+            email="student12@test.com",
+            full_name="Student Twelve",
+            password="student123",
+            role="student",
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor12@test.com",
+            full_name="Instructor Twelve",
+            password="instructor123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(
+            title="Polled Course",
+            description="Checked by mobile clients",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.lesson = Lesson.objects.create(
+            course=self.course, title="Lesson", content="Content", order=1
+        )
+        self.detail_url = reverse("specific_course", kwargs={"id": self.course.id})
+
+    def revalidate(self, url, params=None, **headers):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        return response, self.client.get(
+            url, params or {}, headers={"If-None-Match": response["ETag"], **headers}
+        )
+
+    def test_unchanged_course_list_is_not_resent(self):
+        self.client.force_authenticate(user=self.instructor)
+
+        first, second = self.revalidate(reverse("courses"))
+
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_not_modified_skips_serialization(self):
+        self.client.force_authenticate(user=self.instructor)
+        first = self.client.get(reverse("courses"))
+
+        with mock.patch.object(
+            ListCourseSerializer, "to_representation", side_effect=AssertionError
+        ):
+            response = self.client.get(
+                reverse("courses"), headers={"If-None-Match": first["ETag"]}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_catalog_answers_without_queries(self):
+        self.client.force_authenticate(user=self.student)
+        first = self.client.get(reverse("courses"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("courses"), headers={"If-None-Match": f'W/{first["ETag"]}'}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_if_modified_since(self):
+        self.client.force_authenticate(user=self.instructor)
+        url = reverse("specific_lesson", kwargs={"id": self.lesson.id})
+        first = self.client.get(url)
+
+        response = self.client.get(
+            url, headers={"If-Modified-Since": first["Last-Modified"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # If-None-Match wins when both are sent.
+        response = self.client.get(
+            url,
+            headers={
+                "If-None-Match": '"stale"',
+                "If-Modified-Since": first["Last-Modified"],
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lesson_edit_changes_course_validators(self):
+        self.client.force_authenticate(user=self.student)
+        detail = self.client.get(self.detail_url)
+        listing = self.client.get(reverse("courses"))
+
+        self.lesson.title = "Renamed lesson"
+        self.lesson.save()
+
+        for url, before in ((self.detail_url, detail), (reverse("courses"), listing)):
+            response = self.client.get(url, headers={"If-None-Match": before["ETag"]})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], before["ETag"])
+
+    def test_lesson_delete_changes_lesson_list_validators(self):
+        self.client.force_authenticate(user=self.student)
+        Lesson.objects.create(
+            course=self.course, title="Second", content="Content", order=2
+        )
+        params = {"course_id": self.course.id}
+        first, second = self.revalidate(reverse("lessons"), params)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.lesson.delete()
+
+        response = self.client.get(
+            reverse("lessons"), params, headers={"If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_cursor_pages_revalidate_without_counting(self):
+        self.client.force_authenticate(user=self.instructor)
+        first = self.client.get(reverse("courses"), {"cursor": ""})
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("courses"),
+                {"cursor": ""},
+                headers={"If-None-Match": first["ETag"]},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in context.captured_queries)
+        )
+
+    def test_validators_are_scoped_to_the_instructor(self):
+        other = User.objects.create_user(
+            email="instructor13@test.com",
+            full_name="Instructor Thirteen",
+            password="instructor123",
+            role="instructor",
+        )
+        self.client.force_authenticate(user=other)
+        first = self.client.get(reverse("courses"))
+
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.get(
+            reverse("courses"), headers={"If-None-Match": first["ETag"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_async_views_revalidate(self):
+        token = LearnifyRefreshToken.for_user(self.instructor).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        get = async_to_sync(self.async_client.get)
+
+        for url in (reverse("async_courses"), reverse("async_lessons")):
+            first = get(url, headers=headers)
+            response = get(url, headers={**headers, "If-None-Match": first["ETag"]})
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class TestKeysetPagination(APITestCase):
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor5@test.com",
+            full_name="Instructor Five",
+            password="instructor123",
+            role="instructor",
+        )
+        for i in range(7):
+            Course.objects.create(
+                title=f"Course {i}",
+                description="Course description",
+                is_published=True,
+                user=self.instructor,
+            )
+        self.url = reverse("courses")
+
+    def test_cursor_pages_match_offset_pages(self):
+        self.client.force_authenticate(user=self.instructor)
+        expected = [
+            course["id"]
+            for page in (1, 2, 3)
+            for course in self.client.get(self.url, {"page": page, "limit": 3}).data[
+                "data"
+            ]
+        ]
+
+        seen = []
+        response = self.client.get(self.url, {"cursor": "", "limit": 3})
+        while True:
+            self.assertIsNone(response.data["count"])
+            seen.extend(course["id"] for course in response.data["data"])
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [course["id"] for course in previous.data["data"]], expected[3:6]
+        )
+
+    def test_cursor_mode_skips_the_count_query(self):
+        self.client.force_authenticate(user=self.instructor)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {"cursor": "", "limit": 3})
+
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in context.captured_queries)
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        self.client.force_authenticate(user=self.instructor)
+
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestCatalogQueryPlans(QueryPlanAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor6@test.com",
+            full_name="Instructor Six",
+            password="instructor123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(
+            title="Indexed Course",
+            description="Course description",
+            is_published=True,
+            user=self.instructor,
+        )
+        Lesson.objects.create(
+            course=self.course, title="Lesson", content="Content", order=1
+        )
+
+    def test_published_catalog_uses_an_index(self):
+        self.assertUsesIndexes(
+            Course.objects.filter(is_published=True).order_by("-updated_at")
+        )
+
+    def test_instructor_courses_use_an_index(self):
+        self.assertUsesIndexes(
+            Course.objects.filter(user=self.instructor).order_by("-updated_at")
+        )
+
+    def test_published_lessons_use_an_index(self):
+        self.assertUsesIndexes(
+            Lesson.objects.filter(course__is_published=True).order_by("order")
+        )
+
+    def test_lesson_order_is_unique_within_a_course(self):
+        with self.assertRaises(IntegrityError):
+            Lesson.objects.create(
+                course=self.course, title="Clash", content="Content", order=1
+            )
+
+
+class TestSearch(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student6@test.com",
+            full_name="Student Six",
+            password="student123",
+            role="student",
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor6@test.com",
+            full_name="Instructor Six",
+            password="instructor123",
+            role="instructor",
+        )
+        self.python = Course.objects.create(
+            title="Python Basics",
+            description="Variables, loops and functions for beginners",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.cooking = Course.objects.create(
+            title="Cooking",
+            description="Knife skills. Later chapters script recipes in Python",
+            is_published=True,
+            user=self.instructor,
+        )
+        Course.objects.create(
+            title="Python Drafts",
+            description="Not ready",
+            is_published=False,
+            user=self.instructor,
+        )
+        self.lesson = Lesson.objects.create(
+            course=self.python,
+            title="Loops",
+            content="A for loop repeats the indented block for each item",
+            order=1,
+        )
+        self.url = reverse("search")
+        self.client.force_authenticate(user=self.student)
+
+    def test_title_matches_rank_above_body_matches(self):
+        response = self.client.get(self.url, {"q": "python"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [result["id"] for result in response.data["data"]]
+        self.assertEqual(ids, [self.python.id, self.cooking.id])
+        self.assertIn("<mark>Python</mark>", response.data["data"][1]["snippet"])
+
+    def test_lesson_search_highlights_stemmed_matches(self):
+        response = self.client.get(self.url, {"q": "looping", "type": "lessons"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [result] = response.data["data"]
+        self.assertEqual(result["id"], self.lesson.id)
+        self.assertEqual(result["course_id"], self.python.id)
+        self.assertIn("<mark>loop</mark>", result["snippet"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.cooking.description = "Knife skills"
+        self.cooking.save()
+        self.python.delete()
+
+        response = self.client.get(self.url, {"q": "python"})
+
+        self.assertEqual(response.data["data"], [])
+
+    def test_query_is_required(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_punctuation_is_not_query_syntax(self):
+        response = self.client.get(self.url, {"q": 'python" OR NEAR(*'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_title_filter_matches_word_prefixes(self):
+        response = self.client.get(reverse("courses"), {"title": "pyth"})
+
+        ids = [course["id"] for course in response.data["data"]]
+        self.assertEqual(ids, [self.python.id])
+
+
+class TestSparseFieldsets(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student7@test.com",
+            full_name="Student Seven",
+            password="student123",
+            role="student",
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor7@test.com",
+            full_name="Instructor Seven",
+            password="instructor123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(
+            title="Course",
+            description="Course description",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.lesson = Lesson.objects.create(
+            course=self.course, title="Lesson", content="Long lesson body", order=1
+        )
+        draft = Course.objects.create(
+            title="Draft",
+            description="Draft description",
+            is_published=False,
+            user=self.instructor,
+        )
+        self.draft_lesson = Lesson.objects.create(
+            course=draft, title="Draft lesson", content="Hidden", order=1
+        )
+        self.client.force_authenticate(user=self.student)
+
+    def test_lesson_list_leaves_out_bodies_by_default(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("lessons"))
+
+        [lesson] = response.data["data"]
+        self.assertNotIn("content", lesson)
+        self.assertEqual(
+            lesson["course"],
+            {"id": self.course.id, "title": "Course", "is_published": True},
+        )
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn('"lessons"."content"', sql)
+        self.assertNotIn('"courses"."description"', sql)
+
+    def test_expand_adds_lesson_bodies(self):
+        response = self.client.get(reverse("lessons"), {"expand": "content"})
+
+        [lesson] = response.data["data"]
+        self.assertEqual(lesson["content"], "Long lesson body")
+
+    def test_fields_selects_exact_keys(self):
+        response = self.client.get(reverse("lessons"), {"fields": "id,title"})
+
+        self.assertEqual(
+            response.data["data"], [{"id": self.lesson.id, "title": "Lesson"}]
+        )
+
+    def test_course_list_without_lessons_skips_the_prefetch(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("courses"), {"fields": "id,title"})
+
+        self.assertEqual(
+            response.data["data"], [{"id": self.course.id, "title": "Course"}]
+        )
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn('FROM "lessons"', sql)
+
+    def test_course_list_nests_lesson_summaries(self):
+        response = self.client.get(reverse("courses"))
+
+        [lesson] = response.data["data"][0]["lesson_list"]
+        self.assertNotIn("content", lesson)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse("lessons"), {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse("courses"), {"expand": "lesson_list"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_content_endpoint_serves_published_lessons(self):
+        response = self.client.get(
+            reverse("lesson_content", kwargs={"id": self.lesson.id})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["content"], "Long lesson body")
+
+        response = self.client.get(
+            reverse("lesson_content", kwargs={"id": self.draft_lesson.id})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_lesson_detail_includes_content(self):
+        self.client.force_authenticate(user=self.instructor)
+
+        response = self.client.get(
+            reverse("specific_lesson", kwargs={"id": self.lesson.id})
+        )
+
+        self.assertEqual(response.data["data"]["content"], "Long lesson body")
+
+
+class TestRequestInstrumentation(APITestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        Course.objects.create(
+            title="Course", description="", is_published=True, user=instructor
+        )
+        self.client.force_authenticate(user=self.student)
+
+    def test_server_timing_reports_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("courses"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(context.captured_queries)} queries"', timing)
+        self.assertIn("serializer;dur=", timing)
+        self.assertIn("app;dur=", timing)
+
+    def test_repeated_statements_are_logged_as_n_plus_one(self):
+        def view(request):
+            # One owner lookup per course: the N+1 shape.
+            for course in Course.objects.all():
+                list(User.objects.filter(id=course.user_id))
+                list(User.objects.filter(id=course.user_id))
+            return HttpResponse()
+
+        middleware = InstrumentationMiddleware(view)
+        with override_settings(INSTRUMENTATION_N_PLUS_ONE_THRESHOLD=2):
+            with self.assertLogs("learnify.requests", "WARNING") as logs:
+                middleware(RequestFactory().get("/"))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["db_queries"], 3)
+        self.assertEqual(record["duplicate_queries"], 1)
+        self.assertEqual(record["repeated_count"], 2)
+        self.assertIn('"users"', record["repeated_sql"])
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("courses"))
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+        body = response.content.decode()
+        self.assertIn(
+            'learnify_requests_total{route="courses",method="GET",status="200"} 1',
+            body,
+        )
+        self.assertIn('learnify_db_queries_total{route="courses"}', body)
+        self.assertIn("learnify_catalog_cache_misses_total", body)
+
+
+class TestListQueryCounts(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        for i in range(6):
+            course = Course.objects.create(
+                title=f"Python course {i}",
+                description="Python from scratch",
+                is_published=True,
+                user=self.instructor,
+            )
+            for order in range(1, 3):
+                Lesson.objects.create(
+                    course=course,
+                    title=f"Python lesson {order}",
+                    content="Lesson content",
+                    order=order,
+                )
+        self.client.force_authenticate(user=self.student)
+
+    def test_course_list(self):
+        self.assertQueryCountFlat(reverse("courses"))
+
+    def test_course_list_for_instructor(self):
+        self.client.force_authenticate(user=self.instructor)
+        self.assertQueryCountFlat(reverse("courses"))
+
+    def test_lesson_list(self):
+        self.assertQueryCountFlat(reverse("lessons"))
+        self.assertQueryCountFlat(reverse("lessons"), {"expand": "content"})
+
+    def test_search(self):
+        self.assertQueryCountFlat(reverse("search"), {"q": "python"})
+        self.assertQueryCountFlat(
+            reverse("search"), {"q": "python", "type": "lessons"}
+        )
+
+    def test_guard_reports_per_row_queries(self):
+        def lesson_count(serializer, course):
+            return Lesson.objects.filter(course=course).count()
+
+        with mock.patch.object(
+            ListCourseSerializer, "get_lesson_list", lesson_count
+        ):
+            with self.assertRaises(AssertionError) as failure:
+                # The middleware flags the same repeats in its log.
+                with self.assertLogs("learnify.requests", "WARNING"):
+                    self.assertQueryCountFlat(reverse("courses"))
+
+        self.assertIn("lesson_count", str(failure.exception))
+        self.assertIn('"lessons"', str(failure.exception))
+
+
+class TestAsyncReadViews(APITestCase):
+
+    def setUp(self):
+        catalog_cache._cache().clear()
+        # Pull the revoked token families now, so no request below pays for
+        # the periodic sync, whichever test ran before.
+        revocation.revoked_families.clear()
+        revocation.revoked_families.sync()
+        self.student = User.objects.create_user(
+            email="student9@test.com",
+            full_name="Student Nine",
+            password="student123",
+            role="student",
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor9@test.com",
+            full_name="Instructor Nine",
+            password="instructor123",
+            role="instructor",
+        )
+        for i in range(3):
+            course = Course.objects.create(
+                title=f"Async Course {i}",
+                description="Served by an async view",
+                is_published=True,
+                user=self.instructor,
+            )
+            for order in (1, 2):
+                Lesson.objects.create(
+                    course=course, title=f"Lesson {order}", content="", order=order
+                )
+        self.course = course
+
+    def _get(self, url, params=None, user=None, asynchronous=True):
+        headers = {}
+        if user is not None:
+            token = LearnifyRefreshToken.for_user(user).access_token
+            headers["Authorization"] = f"Bearer {token}"
+        if asynchronous:
+            return async_to_sync(self.async_client.get)(
+                url, params or {}, headers=headers
+            )
+        return self.client.get(url, params or {}, headers=headers)
+
+    def assertSameResponse(self, sync_url, async_url, params=None, user=None):
+        expected = self._get(sync_url, params, user, asynchronous=False)
+        response = self._get(async_url, params, user)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response["Content-Type"], "application/json")
+        # Page links point back at the async endpoint.
+        body = response.content.decode().replace("/async/", "/")
+        self.assertEqual(json.loads(body), expected.json())
+        return response
+
+    def test_course_list_matches_sync_view(self):
+        for params in ({"limit": 2}, {"limit": 2, "page": 2}, {"cursor": ""}):
+            self.assertSameResponse(
+                reverse("courses"), reverse("async_courses"), params, self.instructor
+            )
+
+    def test_course_list_shares_the_catalog_cache(self):
+        first = self._get(reverse("async_courses"), user=self.student)
+        second = self._get(reverse("courses"), user=self.student, asynchronous=False)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.json(), second.json())
+
+    def test_course_detail_and_lessons_match_sync_views(self):
+        self.assertSameResponse(
+            reverse("specific_course", kwargs={"id": self.course.id}),
+            reverse("async_specific_course", kwargs={"id": self.course.id}),
+            user=self.student,
+        )
+        self.assertSameResponse(
+            reverse("lessons"),
+            reverse("async_lessons"),
+            {"course_id": self.course.id, "expand": "content"},
+            self.student,
+        )
+
+    def test_errors_use_the_api_format(self):
+        missing = self._get(
+            reverse("async_specific_course", kwargs={"id": 0}), user=self.student
+        )
+        anonymous = self._get(reverse("async_courses"))
+        invalid = self._get(
+            reverse("async_courses"), {"from_date": "never"}, self.instructor
+        )
+
+        self.assertEqual(
+            missing.json(), {"status": 404, "message": "Course not found."}
+        )
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(anonymous.json()["status"], 401)
+        self.assertIn("Bearer", anonymous["WWW-Authenticate"])
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_queries_are_instrumented(self):
+        response = self._get(reverse("async_lessons"), user=self.instructor)
+
+        # The user, the count and the page; the revoked families were pulled
+        # in setUp.
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+
+class TestFastRendering(APITestCase):
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor10@test.com",
+            full_name="Instructor Ten",
+            password="instructor123",
+            role="instructor",
+        )
+        for i in range(3):
+            course = Course.objects.create(
+                title=f"Cours {i} \u2014 d\u00e9butant \u2028",
+                description="Line\nbreak \"quoted\" \u2029 \U0001f600",
+                is_published=bool(i % 2),
+                user=self.instructor,
+            )
+            Lesson.objects.create(
+                course=course, title="Le\u00e7on", content="", order=1
+            )
+        self.client.force_authenticate(user=self.instructor)
+
+    def assertSameBytes(self, data):
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_renderer_matches_drf(self):
+        serializer = ListCourseSerializer(Course.objects.first())
+        self.assertSameBytes(
+            {
+                "status": 200,
+                "message": gettext_lazy("Retrieved successfully"),
+                "data": ReturnList(
+                    [ReturnDict(serializer.data, serializer=serializer)],
+                    serializer=serializer,
+                ),
+                "when": timezone.now(),
+                "naive": datetime.datetime(2026, 1, 2, 3, 4, 5, 678901),
+                "day": datetime.date(2026, 1, 2),
+                "duration": datetime.timedelta(hours=1, seconds=1),
+                "price": decimal.Decimal("9.99"),
+                "id": uuid.uuid4(),
+                "progress": [0.0, 33.33, 100.0, -1, True, None],
+                "separators": "\u2028\u2029",
+            }
+        )
+
+    def test_renderer_falls_back_for_what_orjson_refuses(self):
+        self.assertSameBytes({"big": 2**70, 1: "integer key"})
+        self.assertEqual(
+            FastJSONRenderer().render({"a": 1}, "application/json; indent=2"),
+            b'{\n  "a": 1\n}',
+        )
+
+    def test_responses_match_the_stock_serializers_and_renderer(self):
+        fast = self.client.get(reverse("courses"))
+        with mock.patch.object(FastReadMixin, "fast_read", False):
+            stock = self.client.get(reverse("courses"))
+
+        self.assertEqual(fast.data, stock.data)
+        self.assertEqual(fast.content, JSONRenderer().render(stock.data))
+        self.assertIn(b"\\u2028", fast.content)
+
+    def test_fast_serializers_follow_the_current_time_zone(self):
+        courses = ListCourseSerializer.setup_eager_loading(Course.objects.all())
+        with timezone.override("Asia/Kathmandu"):
+            fast = ListCourseSerializer(courses, many=True).data
+            with mock.patch.object(FastReadMixin, "fast_read", False):
+                stock = ListCourseSerializer(courses, many=True).data
+
+        self.assertEqual(fast, stock)
+        self.assertTrue(fast[0]["created_at"].endswith("+05:45"))
+
+
+class TestCourseImport(APITestCase):
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="importer@test.com",
+            full_name="Importer",
+            password="instructor123",
+            role="instructor",
+        )
+        self.client.force_authenticate(user=self.instructor)
+        self.url = reverse("course_import")
+
+    def course_line(self, i, lessons=2, **extra):
+        record = {
+            "title": f"Imported {i}",
+            "description": "From another platform",
+            "is_published": True,
+            "lessons": [
+                {"title": f"Lesson {n}", "content": "Content"}
+                for n in range(1, lessons + 1)
+            ],
+            **extra,
+        }
+        return json.dumps(record)
+
+    def upload(self, text, name="courses.jsonl", encoding="utf-8", **data):
+        upload = SimpleUploadedFile(name, text.encode(encoding))
+        return self.client.post(self.url, {"file": upload, **data}, format="multipart")
+
+    def test_jsonl_import_writes_courses_lessons_and_statistics(self):
+        version = catalog_cache.catalog_version()
+
+        response = self.upload("\n".join(self.course_line(i) for i in range(3)))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["courses_created"], 3)
+        self.assertEqual(response.data["data"]["lessons_created"], 6)
+        self.assertEqual(response.data["data"]["status"], "completed")
+        course = Course.objects.get(title="Imported 0")
+        self.assertEqual(course.total_lessons, 2)
+        self.assertIsNotNone(course.updated_at)
+        self.assertEqual(
+            list(course.lessons.values_list("order", flat=True)), [1024, 2048]
+        )
+        self.assertEqual(CourseStatistics.objects.count(), 3)
+        self.assertEqual(LessonStatistics.objects.count(), 6)
+        self.assertNotEqual(catalog_cache.catalog_version(), version)
+
+        response = self.client.get(reverse("search"), {"q": "Imported"})
+        self.assertEqual(len(response.data["data"]), 3)
+
+    def test_queries_do_not_grow_with_the_file(self):
+        def queries(count):
+            text = "\n".join(self.course_line(i) for i in range(count))
+            with CaptureQueriesContext(connection) as context:
+                self.upload(text)
+            return len(context.captured_queries)
+
+        self.assertEqual(queries(2), queries(20))
+
+    def test_rejected_records_are_reported_by_line(self):
+        lines = [
+            self.course_line(0),
+            "{not json",
+            self.course_line(2, title=""),
+            json.dumps(
+                {
+                    "title": "Same order twice",
+                    "description": "From another platform",
+                    "lessons": [
+                        {"title": "A", "content": "Content", "order": 1},
+                        {"title": "B", "content": "Content", "order": 1},
+                    ],
+                }
+            ),
+            self.course_line(4),
+        ]
+
+        response = self.upload("\n".join(lines))
+
+        data = response.data["data"]
+        self.assertEqual(data["courses_created"], 2)
+        self.assertEqual(data["records_failed"], 3)
+        self.assertEqual([error["line"] for error in data["errors"]], [2, 3, 4])
+        self.assertIn("title", data["errors"][1]["errors"])
+
+    def test_csv_rows_of_one_course_are_grouped(self):
+        text = (
+            "course,title,description,is_published,lesson_title,lesson_content\n"
+            "a,First,Imported from CSV,true,Intro,Hello\n"
+            "a,,,,Next,World\n"
+            "b,Second,No lessons yet,,,\n"
+        )
+
+        response = self.upload(text, name="courses.csv")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = Course.objects.get(title="First")
+        self.assertTrue(first.is_published)
+        self.assertEqual(
+            list(first.lessons.values_list("title", "order")),
+            [("Intro", 1024), ("Next", 2048)],
+        )
+        self.assertEqual(Course.objects.get(title="Second").total_lessons, 0)
+
+    def test_csv_without_course_column_is_rejected(self):
+        response = self.upload("title,description\nA,B\n", name="courses.csv")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_file_that_is_not_utf8_is_rejected_with_its_line(self):
+        text = (
+            "course,title,description\n"
+            "a,Python,Basics\n"
+            "b,Caf\u00e9 French,Ordering a coffee\n"
+        )
+
+        response = self.upload(text, name="courses.csv", encoding="cp1252")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Line 3 is not valid UTF-8", str(response.data))
+
+    def test_malformed_csv_is_rejected_with_its_line(self):
+        text = 'course,title,description\na,First,Fine\nb,"Second"quoted,Broken\n'
+
+        response = self.upload(text, name="courses.csv")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Line 3:", str(response.data))
+
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_interrupted_import_resumes_from_its_checkpoint(self):
+        text = "\n".join(self.course_line(i, lessons=0) for i in range(5))
+        bulk_create = Course.objects.bulk_create
+        calls = []
+
+        def fail_on_second_chunk(objs, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("Connection lost")
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(
+            Course.objects, "bulk_create", side_effect=fail_on_second_chunk
+        ):
+            with self.assertRaises(RuntimeError):
+                self.upload(text)
+
+        job = ImportJob.objects.get()
+        self.assertEqual(job.records_done, 2)
+        self.assertEqual(job.status, ImportJob.Status.RUNNING)
+
+        response = self.upload(text, job=job.pk)
+
+        self.assertEqual(response.data["data"]["courses_created"], 5)
+        self.assertEqual(
+            sorted(Course.objects.values_list("title", flat=True)),
+            [f"Imported {i}" for i in range(5)],
+        )
+        self.assertEqual(self.upload(text, job=job.pk).status_code, 400)
+
+    def test_students_cannot_import(self):
+        student = User.objects.create_user(
+            email="learner@test.com",
+            full_name="Learner",
+            password="student123",
+            role="student",
+        )
+        self.client.force_authenticate(user=student)
+
+        self.assertEqual(self.upload(self.course_line(0)).status_code, 403)
+
+    def test_command_imports_a_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as file:
+            file.write(self.course_line(0))
+            file.flush()
+            out = StringIO()
+            call_command(
+                "import_courses",
+                file.name,
+                "--instructor",
+                self.instructor.email,
+                stdout=out,
+            )
+
+        self.assertIn("Imported 1 courses and 2 lessons", out.getvalue())
+        self.assertEqual(Course.objects.get().user, self.instructor)
+
+
+class TestLessonOrdering(APITestCase):
+
+    def setUp(self):
+        catalog_cache._cache().clear()
+        self.instructor = User.objects.create_user(
+            email="instructor25@test.com",
+            full_name="Instructor TwentyFive",
+            password="instructor123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(
+            title="Ordered Course", description="Lessons move", user=self.instructor
+        )
+        self.lessons = [
+            Lesson.objects.create(
+                course=self.course,
+                title=f"Lesson {i}",
+                content="Content",
+                order=i * ordering.ORDER_GAP,
+            )
+            for i in range(1, 4)
+        ]
+        self.client.force_authenticate(user=self.instructor)
+
+    def titles(self):
+        lessons = self.course.lessons.order_by("order")
+        return list(lessons.values_list("title", flat=True))
+
+    def add(self, **data):
+        return self.client.post(
+            reverse("lessons"),
+            {"course": self.course.id, "title": "New", "content": "New", **data},
+            format="json",
+        )
+
+    def test_new_lesson_without_order_goes_last(self):
+        response = self.add()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["order"], 4 * ordering.ORDER_GAP)
+        self.assertEqual(self.titles()[-1], "New")
+
+    def test_insert_at_position_writes_one_lesson(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.add(position=2)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.titles(), ["Lesson 1", "New", "Lesson 2", "Lesson 3"]
+        )
+        writes = [
+            q["sql"]
+            for q in context.captured_queries
+            if q["sql"].startswith(('INSERT INTO "lessons"', 'UPDATE "lessons"'))
+        ]
+        self.assertEqual(len(writes), 1)
+
+    def test_move_to_position(self):
+        url = reverse("specific_lesson", kwargs={"id": self.lessons[2].id})
+
+        response = self.client.patch(url, {"position": 1}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.titles(), ["Lesson 3", "Lesson 1", "Lesson 2"])
+        # Only the moved lesson changed.
+        self.assertEqual(
+            list(
+                Lesson.objects.filter(pk__in=[lesson.pk for lesson in self.lessons[:2]])
+                .order_by("order")
+                .values_list("order", flat=True)
+            ),
+            [ordering.ORDER_GAP, 2 * ordering.ORDER_GAP],
+        )
+
+    def test_exhausted_gap_rebalances_the_course(self):
+        Lesson.objects.filter(pk=self.lessons[1].pk).update(
+            order=ordering.ORDER_GAP + 1
+        )
+        Course.objects.filter(pk=self.course.pk).update(
+            updated_at=timezone.now() - datetime.timedelta(days=1)
+        )
+        before = Course.objects.get(pk=self.course.pk).updated_at
+
+        response = self.add(position=2)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.titles(), ["Lesson 1", "New", "Lesson 2", "Lesson 3"]
+        )
+        orders = list(
+            self.course.lessons.exclude(title="New")
+            .order_by("order")
+            .values_list("order", flat=True)
+        )
+        self.assertEqual(orders, [1024, 2048, 3072])
+        self.assertGreater(Course.objects.get(pk=self.course.pk).updated_at, before)
+
+    def test_rebalance_of_dense_orders_against_id_order(self):
+        # Orders from before gaps were used, numbered against the insert order:
+        # shifted rows must never land on one that has not moved yet.
+        course = Course.objects.create(
+            title="Dense Course", description="Legacy orders", user=self.instructor
+        )
+        count = 1023
+        Lesson.objects.bulk_create(
+            Lesson(course=course, title=f"Dense {order}", content="C", order=order)
+            for order in range(count, 0, -1)
+        )
+
+        self.assertEqual(ordering.rebalance(course.pk), count)
+
+        lessons = list(course.lessons.order_by("order").values_list("title", "order"))
+        self.assertEqual(
+            lessons,
+            [
+                (f"Dense {rank}", rank * ordering.ORDER_GAP)
+                for rank in range(1, count + 1)
+            ],
+        )
+
+    def test_order_and_position_are_exclusive(self):
+        response = self.add(order=10, position=1)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("either order or position", str(response.data))
+
+    def test_taken_order_is_rejected(self):
+        response = self.add(order=ordering.ORDER_GAP)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Another lesson of this course", str(response.data))
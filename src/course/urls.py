@@ -1,7 +1,14 @@
 from django.urls import path
 from .views import (
+    AsyncCourseAPIView,
+    AsyncLessonAPIView,
+    AsyncSpecificCourseAPIView,
     CourseAPIView,
+    CourseImportAPIView,
+    ImportJobAPIView,
     LessonAPIView,
+    LessonContentAPIView,
+    SearchAPIView,
     SpecificCourseAPIView,
     SpecificLessonAPIView,
 )
@@ -9,6 +16,26 @@ from .views import (
 urlpatterns = [
     path("courses/", CourseAPIView.as_view(), name="courses"),
     path("courses/<int:id>/", SpecificCourseAPIView.as_view(), name="specific_course"),
+    path("courses/import/", CourseImportAPIView.as_view(), name="course_import"),
+    path(
+        "courses/import/<int:id>/",
+        ImportJobAPIView.as_view(),
+        name="course_import_job",
+    ),
     path("lessons/", LessonAPIView.as_view(), name="lessons"),
     path("lessons/<int:id>/", SpecificLessonAPIView.as_view(), name="specific_lesson"),
+    path(
+        "lessons/<int:id>/content/",
+        LessonContentAPIView.as_view(),
+        name="lesson_content",
+    ),
+    path("search/", SearchAPIView.as_view(), name="search"),
+    # Async variants of the read endpoints, for deployments under ASGI.
+    path("async/courses/", AsyncCourseAPIView.as_view(), name="async_courses"),
+    path(
+        "async/courses/<int:id>/",
+        AsyncSpecificCourseAPIView.as_view(),
+        name="async_specific_course",
+    ),
+    path("async/lessons/", AsyncLessonAPIView.as_view(), name="async_lessons"),
 ]
@@ -1,35 +1,102 @@
-from typing import Any
-
+import datetime
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    F,
+    Max,
+    aprefetch_related_objects,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Greatest
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import GenericAPIView, ListCreateAPIView
 
+from . import cache as catalog_cache, imports
 from .filters import CourseFilter, LessonFilter
+from .search import search
 from .serializers import (
     AddCourseSerializer,
     ListCourseSerializer,
     AddLessonSerializer,
     ListLessonSerializer,
+    LessonContentSerializer,
+    CourseSearchResultSerializer,
+    LessonSearchResultSerializer,
+    SearchQuerySerializer,
+    ImportJobSerializer,
+    ImportUploadSerializer,
 )
 
-from .models import Course, Lesson
+from .models import Course, ImportJob, Lesson
+from learnify.utils import conditional
+from learnify.utils.async_views import AsyncAPIView
 from learnify.utils.response import api_response
 from learnify.utils.pagination import CustomPagination
 from learnify.utils.permission import IsInstructor
 
+# What list validators are built from: an insert or a delete changes the
+# count, an update moves a timestamp. Lesson writes touch their course (see
+# course.signals), so lesson changes reach the course lists too.
+COURSE_LIST_VALIDATORS = {"count": Count("pk"), "updated_at": Max("updated_at")}
+LESSON_LIST_VALIDATORS = {
+    "count": Count("pk"),
+    "updated_at": Max("updated_at"),
+    "course_updated_at": Max("course__updated_at"),
+}
+
+
+def validator_scope(request: Request) -> str:
+    # Instructors list their own rows; everyone else the published catalog.
+    if request.user.role == "instructor":
+        return f"instructor:{request.user.pk}"
+    return "catalog"
+
+
+def keyset_validators(
+    paginator: CustomPagination,
+    rows: List[Any],
+    timestamps: Callable[[Any], Iterable[datetime.datetime]],
+) -> Dict[str, Any]:
+    """Validator aggregates of a keyset page, read off its rows: that mode
+    never counts the whole queryset."""
+    return {
+        "ids": ",".join(str(row.pk) for row in rows),
+        "links": (paginator.has_next, paginator.has_previous),
+        "updated_at": max(
+            (stamp for row in rows for stamp in timestamps(row)), default=None
+        ),
+    }
+
+
+def course_timestamps(course: Course) -> Iterable[datetime.datetime]:
+    return (course.updated_at,)
+
+
+def cached_response(request: Request, entry: catalog_cache.Entry) -> Response:
+    data, etag, last_modified = entry
+    if conditional.is_not_modified(request, etag, last_modified):
+        response = conditional.not_modified(etag, last_modified)
+    else:
+        response = conditional.set_validators(Response(data), etag, last_modified)
+    response["X-Cache"] = "HIT"
+    return response
+
 
 class CourseAPIView(ListCreateAPIView):
     permission_classes = [IsAuthenticated, IsInstructor]
     ordering_fields = ["-updated_at"]
     sort_by = ["-updated_at"]
-    paginator = CustomPagination()
+    paginator = CustomPagination(keyset_ordering=("-updated_at", "-id"))
     filter_backends = [DjangoFilterBackend]
     filterset_class = CourseFilter
 
@@ -43,8 +110,12 @@ class CourseAPIView(ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role == "instructor":
-            return Course.objects.filter(user=user).order_by("-updated_at")
-        return Course.objects.filter(is_published=True).order_by("-updated_at")
+            queryset = Course.objects.filter(user=user)
+        else:
+            queryset = Course.objects.filter(is_published=True)
+        return ListCourseSerializer.setup_eager_loading(
+            queryset.order_by("-updated_at"), getattr(self, "fields", None)
+        )
 
     @swagger_auto_schema(request_body=AddCourseSerializer)
     def post(
@@ -71,11 +142,27 @@ class CourseAPIView(ListCreateAPIView):
                 description="Filter by published status",
                 type=openapi.TYPE_BOOLEAN,
             ),
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated fields to return",
+                type=openapi.TYPE_STRING,
+            ),
         ]
     )
     def get(
         self: "CourseAPIView", request: Request, *args: Any, **kwargs: Any
     ) -> Response:
+        self.fields = ListCourseSerializer.requested_fields(request)
+
+        # Everyone but instructors sees the same published catalog pages.
+        cache_key = None
+        if request.user.role != "instructor":
+            cache_key = catalog_cache.list_key(request)
+            entry = catalog_cache.lookup(cache_key)
+            if entry is not None:
+                return cached_response(request, entry)
+
         queryset = self.get_queryset()
         filterset = self.filterset_class(request.GET, queryset=queryset)
 
@@ -83,18 +170,39 @@ class CourseAPIView(ListCreateAPIView):
             return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
         queryset = filterset.qs
 
-        page = self.paginator.paginate_queryset(queryset, request)
+        if self.paginator.uses_cursor(request):
+            page = self.paginator.paginate_queryset(queryset, request)
+            aggregates = keyset_validators(self.paginator, page, course_timestamps)
+        else:
+            # Replaces the paginator's COUNT(*), so validating costs no query.
+            aggregates = queryset.order_by().aggregate(**COURSE_LIST_VALIDATORS)
+            page = None
+        etag, last_modified = conditional.validators(
+            request, aggregates, validator_scope(request)
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
 
-        if page is not None:
-            serializer = ListCourseSerializer(page, many=True)
-            return self.paginator.get_paginated_response(serializer.data)
+        if page is None:
+            page = self.paginator.paginate_queryset(
+                queryset, request, count=aggregates["count"]
+            )
 
-        serializer = ListCourseSerializer(queryset, many=True)
-        return api_response(
+        if page is not None:
+            serializer = ListCourseSerializer(page, many=True, fields=self.fields)
+            response = self.paginator.get_paginated_response(serializer.data)
+            catalog_cache.store(cache_key, response.data, etag, last_modified)
+            if cache_key:
+                response["X-Cache"] = "MISS"
+            return conditional.set_validators(response, etag, last_modified)
+
+        serializer = ListCourseSerializer(queryset, many=True, fields=self.fields)
+        response = api_response(
             data=serializer.data,
             message="List of courses retrieved successfully",
             status_code=status.HTTP_200_OK,
         )
+        return conditional.set_validators(response, etag, last_modified)
 
 
 class SpecificCourseAPIView(GenericAPIView):
@@ -109,7 +217,12 @@ class SpecificCourseAPIView(GenericAPIView):
         try:
             if self.request.method == "PATCH":
                 return Course.objects.get(id=self.kwargs["id"], user=self.request.user)
-            return Course.objects.get(id=self.kwargs["id"])
+            # The lessons are prefetched by get() once the validators miss.
+            return (
+                ListCourseSerializer.setup_eager_loading(Course.objects)
+                .prefetch_related(None)
+                .get(id=self.kwargs["id"])
+            )
         except Course.DoesNotExist:
             raise NotFound("Course not found.")
 
@@ -134,24 +247,41 @@ class SpecificCourseAPIView(GenericAPIView):
 
     @swagger_auto_schema()
     def get(self, request, *args, **kwargs):
+        cache_key = catalog_cache.detail_key(self.kwargs["id"])
+        entry = catalog_cache.lookup(cache_key)
+        if entry is not None:
+            return cached_response(request, entry)
 
         try:
             course = self.get_object()
         except Course.DoesNotExist:
             raise NotFound("Course not found.")
 
+        # Lesson writes touch the course, so its own timestamp covers them.
+        etag, last_modified = conditional.validators(
+            request, {"updated_at": course.updated_at}
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        prefetch_related_objects([course], ListCourseSerializer.lesson_prefetch())
         serializer = ListCourseSerializer(course)
 
-        return api_response(
+        response = api_response(
             data=serializer.data,
             message="Course details retrieved successfully",
             status_code=status.HTTP_200_OK,
         )
+        # Drafts stay uncached; only the published catalog is shared.
+        if course.is_published:
+            catalog_cache.store(cache_key, response.data, etag, last_modified)
+        response["X-Cache"] = "MISS"
+        return conditional.set_validators(response, etag, last_modified)
 
 
 class LessonAPIView(ListCreateAPIView):
     permission_classes = [IsAuthenticated]
-    paginator = CustomPagination()
+    paginator = CustomPagination(keyset_ordering=("order", "id"))
     filter_backends = [DjangoFilterBackend]
     filterset_class = LessonFilter
 
@@ -165,8 +295,17 @@ class LessonAPIView(ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role == "instructor":
-            return Lesson.objects.filter(course__user=user)
-        return Lesson.objects.filter(course__is_published=True)
+            queryset = Lesson.objects.filter(course__user=user)
+        else:
+            queryset = Lesson.objects.filter(course__is_published=True)
+        return ListLessonSerializer.setup_eager_loading(
+            queryset, getattr(self, "fields", None)
+        )
+
+    def lesson_timestamps(self, lesson: Lesson) -> Iterable[datetime.datetime]:
+        if "course" in self.fields:
+            return (lesson.updated_at, lesson.course.updated_at)
+        return (lesson.updated_at,)
 
     @swagger_auto_schema(request_body=AddLessonSerializer)
     def post(
@@ -175,7 +314,11 @@ class LessonAPIView(ListCreateAPIView):
 
         serializer = AddLessonSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+
+        # Course.total_lessons is bumped by the post_save signal; keep it in the
+        # same transaction as the insert.
+        with transaction.atomic():
+            serializer.save()
 
         return api_response(
             data=serializer.data,
@@ -183,10 +326,26 @@ class LessonAPIView(ListCreateAPIView):
             status_code=status.HTTP_200_OK,
         )
 
-    @swagger_auto_schema()
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated fields to return",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "expand",
+                openapi.IN_QUERY,
+                description="Comma-separated extra fields, e.g. content",
+                type=openapi.TYPE_STRING,
+            ),
+        ]
+    )
     def get(
         self: "LessonAPIView", request: Request, *args: Any, **kwargs: Any
     ) -> Response:
+        self.fields = ListLessonSerializer.requested_fields(request)
 
         queryset = self.get_queryset()
         filterset = self.filterset_class(request.GET, queryset=queryset)
@@ -194,17 +353,36 @@ class LessonAPIView(ListCreateAPIView):
             return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
         queryset = filterset.qs
 
-        page = self.paginator.paginate_queryset(queryset, request)
+        if self.paginator.uses_cursor(request):
+            page = self.paginator.paginate_queryset(queryset, request)
+            aggregates = keyset_validators(
+                self.paginator, page, self.lesson_timestamps
+            )
+        else:
+            aggregates = queryset.order_by().aggregate(**LESSON_LIST_VALIDATORS)
+            page = None
+        etag, last_modified = conditional.validators(
+            request, aggregates, validator_scope(request)
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        if page is None:
+            page = self.paginator.paginate_queryset(
+                queryset, request, count=aggregates["count"]
+            )
         if page is not None:
-            serializer = ListLessonSerializer(page, many=True)
-            return self.paginator.get_paginated_response(serializer.data)
+            serializer = ListLessonSerializer(page, many=True, fields=self.fields)
+            response = self.paginator.get_paginated_response(serializer.data)
+            return conditional.set_validators(response, etag, last_modified)
 
-        serializer = ListLessonSerializer(queryset, many=True)
-        return api_response(
+        serializer = ListLessonSerializer(queryset, many=True, fields=self.fields)
+        response = api_response(
             data=serializer.data,
             message="List of lessons retrieved successfully",
             status_code=status.HTTP_200_OK,
         )
+        return conditional.set_validators(response, etag, last_modified)
 
 
 class SpecificLessonAPIView(GenericAPIView):
@@ -212,7 +390,7 @@ class SpecificLessonAPIView(GenericAPIView):
 
     def get_object(self):
         try:
-            return Lesson.objects.get(
+            return Lesson.objects.select_related("course").get(
                 id=self.kwargs["id"], course__user=self.request.user
             )
         except Lesson.DoesNotExist:
@@ -227,9 +405,22 @@ class SpecificLessonAPIView(GenericAPIView):
         except Lesson.DoesNotExist:
             raise NotFound("Lesson not found.")
 
+        previous_course_id = lesson.course_id
         serializer = AddLessonSerializer(lesson, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+
+        with transaction.atomic():
+            lesson = serializer.save()
+            if lesson.course_id != previous_course_id:
+                Course.objects.filter(pk=previous_course_id).update(
+                    total_lessons=Greatest(F("total_lessons") - 1, 0),
+                    updated_at=lesson.updated_at,
+                )
+                Course.objects.filter(pk=lesson.course_id).update(
+                    total_lessons=F("total_lessons") + 1
+                )
+                # The lesson's signals only drop the pages of its new course.
+                catalog_cache.invalidate_course(previous_course_id)
 
         return api_response(
             data=serializer.data,
@@ -237,6 +428,22 @@ class SpecificLessonAPIView(GenericAPIView):
             status_code=status.HTTP_200_OK,
         )
 
+    @swagger_auto_schema()
+    def delete(
+        self: "LessonAPIView", request: Request, id: int, *args: Any, **kwargs: Any
+    ) -> Response:
+        lesson = self.get_object()
+
+        # The post_delete signals decrement Course.total_lessons and the
+        # completed_lessons of every enrollment that had finished this lesson.
+        with transaction.atomic():
+            lesson.delete()
+
+        return api_response(
+            message="Lesson has been deleted!",
+            status_code=status.HTTP_200_OK,
+        )
+
     @swagger_auto_schema()
     def get(self, request, *args, **kwargs):
 
@@ -245,10 +452,366 @@ class SpecificLessonAPIView(GenericAPIView):
         except Lesson.DoesNotExist:
             raise NotFound("Lesson not found.")
 
-        serializer = ListLessonSerializer(lesson)
+        # The embedded course is part of the body.
+        etag, last_modified = conditional.validators(
+            request,
+            {
+                "updated_at": lesson.updated_at,
+                "course_updated_at": lesson.course.updated_at,
+            },
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        serializer = ListLessonSerializer(
+            lesson, fields=ListLessonSerializer.Meta.fields
+        )
 
-        return api_response(
+        response = api_response(
             data=serializer.data,
             message="Lesson details retrieved successfully",
             status_code=status.HTTP_200_OK,
         )
+        return conditional.set_validators(response, etag, last_modified)
+
+
+class LessonContentAPIView(GenericAPIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        user = self.request.user
+        if user.role == "instructor":
+            queryset = Lesson.objects.filter(course__user=user)
+        else:
+            queryset = Lesson.objects.filter(course__is_published=True)
+        try:
+            return queryset.only("id", "title", "content", "updated_at").get(
+                id=self.kwargs["id"]
+            )
+        except Lesson.DoesNotExist:
+            raise NotFound("Lesson not found.")
+
+    @swagger_auto_schema()
+    def get(
+        self: "LessonContentAPIView",
+        request: Request,
+        id: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        lesson = self.get_object()
+        etag, last_modified = conditional.validators(
+            request, {"updated_at": lesson.updated_at}
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        serializer = LessonContentSerializer(lesson)
+
+        response = api_response(
+            data=serializer.data,
+            message="Lesson content retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+        return conditional.set_validators(response, etag, last_modified)
+
+
+class SearchAPIView(GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    paginator = CustomPagination()
+
+    def get_queryset(self):
+        user = self.request.user
+        if self.search_type == "lessons":
+            if user.role == "instructor":
+                return Lesson.objects.filter(course__user=user)
+            return Lesson.objects.filter(course__is_published=True)
+        if user.role == "instructor":
+            return Course.objects.filter(user=user)
+        return Course.objects.filter(is_published=True)
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Search terms",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "type",
+                openapi.IN_QUERY,
+                description="What to search: courses (default) or lessons",
+                type=openapi.TYPE_STRING,
+                enum=["courses", "lessons"],
+            ),
+        ]
+    )
+    def get(
+        self: "SearchAPIView", request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        self.search_type = params.validated_data["type"]
+
+        serializer_class = (
+            LessonSearchResultSerializer
+            if self.search_type == "lessons"
+            else CourseSearchResultSerializer
+        )
+        queryset = search(
+            serializer_class.setup_eager_loading(self.get_queryset()),
+            params.validated_data["q"],
+        )
+
+        page = self.paginator.paginate_queryset(queryset, request)
+        if page is not None:
+            serializer = serializer_class(page, many=True)
+            return self.paginator.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset, many=True)
+        return api_response(
+            data=serializer.data,
+            message="Search results retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class CourseImportAPIView(APIView):
+    """Import courses with their lessons from a JSON lines or CSV upload.
+
+    See course.imports for the file layout. The response reports the
+    records that were rejected, with their line numbers. An import that
+    was interrupted can be finished by uploading the same file again with
+    ``job`` set to its id; the records it already settled are skipped.
+    """
+
+    permission_classes = [IsAuthenticated, IsInstructor]
+    paginator = CustomPagination()
+
+    @swagger_auto_schema()
+    def get(
+        self: "CourseImportAPIView", request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        jobs = ImportJob.objects.filter(user=request.user).order_by("-id")
+        page = self.paginator.paginate_queryset(jobs, request)
+        return self.paginator.get_paginated_response(
+            ImportJobSerializer(page, many=True).data
+        )
+
+    @swagger_auto_schema(request_body=ImportUploadSerializer)
+    def post(
+        self: "CourseImportAPIView", request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        serializer = ImportUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+
+        if "job" in serializer.validated_data:
+            job = ImportJob.objects.filter(
+                pk=serializer.validated_data["job"], user=request.user
+            ).first()
+            if job is None:
+                raise NotFound("Import job not found.")
+            if job.status == ImportJob.Status.COMPLETED:
+                raise ValidationError({"job": ["This import is already completed."]})
+        else:
+            job = ImportJob.objects.create(
+                user=request.user,
+                source=upload.name[:255],
+                format=serializer.validated_data.get("format")
+                or imports.guess_format(upload.name),
+            )
+
+        try:
+            imports.CourseImporter(job).run(imports.text_lines(upload.file))
+        except imports.ImportFileError as e:
+            raise ValidationError({"file": [str(e)]})
+        except imports.ImportConflict as e:
+            return api_response(
+                data=ImportJobSerializer(job).data,
+                message=str(e),
+                status_code=status.HTTP_409_CONFLICT,
+            )
+
+        return api_response(
+            data=ImportJobSerializer(job).data,
+            message=(
+                f"{job.courses_created} courses and {job.lessons_created} lessons "
+                f"imported, {job.records_failed} records rejected."
+            ),
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class ImportJobAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    @swagger_auto_schema()
+    def get(
+        self: "ImportJobAPIView", request: Request, id: int, *args: Any, **kwargs: Any
+    ) -> Response:
+        job = ImportJob.objects.filter(pk=id, user=request.user).first()
+        if job is None:
+            raise NotFound("Import job not found.")
+        return api_response(
+            data=ImportJobSerializer(job).data,
+            message="Import job retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class AsyncCourseAPIView(AsyncAPIView):
+    """``GET courses/`` on the async ORM, answering as CourseAPIView does."""
+
+    paginator = CustomPagination(keyset_ordering=("-updated_at", "-id"))
+    get_queryset = CourseAPIView.get_queryset
+
+    async def get(
+        self: "AsyncCourseAPIView", request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        self.fields = ListCourseSerializer.requested_fields(request)
+
+        cache_key = None
+        if request.user.role != "instructor":
+            cache_key = await catalog_cache.alist_key(request)
+            entry = await catalog_cache.alookup(cache_key)
+            if entry is not None:
+                return cached_response(request, entry)
+
+        filterset = CourseFilter(request.GET, queryset=self.get_queryset())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = filterset.qs
+
+        if self.paginator.uses_cursor(request):
+            page = await self.paginator.apaginate_queryset(queryset, request)
+            aggregates = keyset_validators(self.paginator, page, course_timestamps)
+        else:
+            aggregates = await queryset.order_by().aaggregate(
+                **COURSE_LIST_VALIDATORS
+            )
+            page = None
+        etag, last_modified = conditional.validators(
+            request, aggregates, validator_scope(request)
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        if page is None:
+            page = await self.paginator.apaginate_queryset(
+                queryset, request, count=aggregates["count"]
+            )
+        if page is not None:
+            serializer = ListCourseSerializer(page, many=True, fields=self.fields)
+            response = self.paginator.get_paginated_response(serializer.data)
+            await catalog_cache.astore(cache_key, response.data, etag, last_modified)
+            if cache_key:
+                response["X-Cache"] = "MISS"
+            return conditional.set_validators(response, etag, last_modified)
+
+        courses = [course async for course in queryset]
+        serializer = ListCourseSerializer(courses, many=True, fields=self.fields)
+        response = api_response(
+            data=serializer.data,
+            message="List of courses retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+        return conditional.set_validators(response, etag, last_modified)
+
+
+class AsyncSpecificCourseAPIView(AsyncAPIView):
+    """``GET courses/<id>/`` on the async ORM."""
+
+    async def get(
+        self: "AsyncSpecificCourseAPIView",
+        request: Request,
+        id: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        cache_key = catalog_cache.detail_key(id)
+        entry = await catalog_cache.alookup(cache_key)
+        if entry is not None:
+            return cached_response(request, entry)
+
+        try:
+            course = await (
+                ListCourseSerializer.setup_eager_loading(Course.objects)
+                .prefetch_related(None)
+                .aget(id=id)
+            )
+        except Course.DoesNotExist:
+            raise NotFound("Course not found.")
+
+        etag, last_modified = conditional.validators(
+            request, {"updated_at": course.updated_at}
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        await aprefetch_related_objects(
+            [course], ListCourseSerializer.lesson_prefetch()
+        )
+        response = api_response(
+            data=ListCourseSerializer(course).data,
+            message="Course details retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+        if course.is_published:
+            await catalog_cache.astore(cache_key, response.data, etag, last_modified)
+        response["X-Cache"] = "MISS"
+        return conditional.set_validators(response, etag, last_modified)
+
+
+class AsyncLessonAPIView(AsyncAPIView):
+    """``GET lessons/`` on the async ORM, answering as LessonAPIView does."""
+
+    paginator = CustomPagination(keyset_ordering=("order", "id"))
+    get_queryset = LessonAPIView.get_queryset
+    lesson_timestamps = LessonAPIView.lesson_timestamps
+
+    async def get(
+        self: "AsyncLessonAPIView", request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        self.fields = ListLessonSerializer.requested_fields(request)
+
+        filterset = LessonFilter(request.GET, queryset=self.get_queryset())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = filterset.qs
+
+        if self.paginator.uses_cursor(request):
+            page = await self.paginator.apaginate_queryset(queryset, request)
+            aggregates = keyset_validators(
+                self.paginator, page, self.lesson_timestamps
+            )
+        else:
+            aggregates = await queryset.order_by().aaggregate(
+                **LESSON_LIST_VALIDATORS
+            )
+            page = None
+        etag, last_modified = conditional.validators(
+            request, aggregates, validator_scope(request)
+        )
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        if page is None:
+            page = await self.paginator.apaginate_queryset(
+                queryset, request, count=aggregates["count"]
+            )
+        if page is not None:
+            serializer = ListLessonSerializer(page, many=True, fields=self.fields)
+            response = self.paginator.get_paginated_response(serializer.data)
+            return conditional.set_validators(response, etag, last_modified)
+
+        lessons = [lesson async for lesson in queryset]
+        serializer = ListLessonSerializer(lessons, many=True, fields=self.fields)
+        response = api_response(
+            data=serializer.data,
+            message="List of lessons retrieved successfully",
+            status_code=status.HTTP_200_OK,
+        )
+        return conditional.set_validators(response, etag, last_modified)
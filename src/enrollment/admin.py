@@ -1,4 +1,4 @@
 from django.contrib import admin
-from .models import Enrollment, LessonProgress
+from .models import CompletionEvent, Enrollment, LearnerActivity, LessonProgress
 
-admin.site.register([Enrollment, LessonProgress])
+admin.site.register([Enrollment, LessonProgress, LearnerActivity, CompletionEvent])
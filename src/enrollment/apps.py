@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class EnrollmentConfig(AppConfig):
     name = 'enrollment'
+
+    def ready(self):
+        from . import signals  # noqa: F401
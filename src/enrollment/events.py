@@ -0,0 +1,149 @@
+"""Post-completion pipeline: a transactional outbox drained in batches.
+
+Completing a course writes a ``CompletionEvent`` in the same transaction
+and, once that commits, asks a worker to drain the outbox. Task messages
+carry no payload, and at most one is scheduled per
+``COMPLETION_EVENT_DELAY`` window, so the events that arrive meanwhile are
+handled together: every handler registered for a kind is called once per
+batch with all of its events. The completion request only pays for the
+INSERT, however slow the workers are.
+
+Handlers may see an event again if their batch fails and is retried, and
+must tolerate that, keyed on ``event.idempotency_key``. The scheduled
+``process_completion_events`` run picks up events whose task was never
+delivered.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CompletionEvent, Enrollment
+
+logger = logging.getLogger("learnify.events")
+
+COURSE_COMPLETED = "course_completed"
+# Bump when the payload changes shape; handlers see the version in "v".
+PAYLOAD_VERSION = 1
+
+_SCHEDULED_KEY = "completion-events:scheduled"
+_handlers: Dict[str, List[Callable]] = defaultdict(list)
+
+
+def handles(kind: str) -> Callable:
+    """Register the decorated function to receive batches of ``kind`` events."""
+
+    def register(handler: Callable) -> Callable:
+        _handlers[kind].append(handler)
+        return handler
+
+    return register
+
+
+def course_completed(enrollment: Enrollment) -> None:
+    """Record that ``enrollment`` finished its course. Call inside its transaction."""
+    payload = {
+        "v": PAYLOAD_VERSION,
+        "enrollment": enrollment.pk,
+        "user": enrollment.user_id,
+        "course": enrollment.course_id,
+        "enrolled_at": int(enrollment.enrolled_at.timestamp()),
+        "completed_at": int(enrollment.completed_at.timestamp()),
+    }
+    CompletionEvent.objects.bulk_create(
+        [
+            CompletionEvent(
+                kind=COURSE_COMPLETED,
+                idempotency_key=f"{COURSE_COMPLETED}:{enrollment.pk}",
+                payload=payload,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(schedule_processing)
+
+
+def schedule_processing() -> None:
+    """Queue one drain per delay window, however many events were added."""
+    delay = settings.COMPLETION_EVENT_DELAY
+    if not cache.add(_SCHEDULED_KEY, True, timeout=delay + 60):
+        return
+
+    from .tasks import process_completion_events
+
+    try:
+        process_completion_events.apply_async(countdown=delay)
+    except Exception:
+        # The events are committed; the periodic run will process them.
+        cache.delete(_SCHEDULED_KEY)
+        logger.exception("Could not schedule completion event processing")
+
+
+def process_pending_events(batch_size: int = 0) -> int:
+    """Hand pending events to their handlers, a batch at a time.
+
+    Each batch is locked with SKIP LOCKED, so concurrent workers split the
+    backlog instead of queueing on each other. A failing batch is rolled
+    back and its attempts counted; after COMPLETION_EVENT_MAX_ATTEMPTS the
+    events are left for inspection. Returns the number of events handled.
+    """
+    cache.delete(_SCHEDULED_KEY)
+    batch_size = batch_size or settings.COMPLETION_EVENT_BATCH_SIZE
+    processed = 0
+    while True:
+        ids = []
+        try:
+            with transaction.atomic():
+                events = list(
+                    CompletionEvent.objects.filter(
+                        processed_at__isnull=True,
+                        attempts__lt=settings.COMPLETION_EVENT_MAX_ATTEMPTS,
+                    )
+                    .select_for_update(skip_locked=True)
+                    .order_by("id")[:batch_size]
+                )
+                ids = [event.id for event in events]
+                if not events:
+                    return processed
+
+                dispatch(events)
+                CompletionEvent.objects.filter(id__in=ids).update(
+                    processed_at=timezone.now()
+                )
+        except Exception:
+            CompletionEvent.objects.filter(id__in=ids).update(
+                attempts=F("attempts") + 1
+            )
+            raise
+
+        processed += len(events)
+        if len(events) < batch_size:
+            return processed
+
+
+def dispatch(events: List[CompletionEvent]) -> None:
+    by_kind = defaultdict(list)
+    for event in events:
+        by_kind[event.kind].append(event)
+    for kind, batch in by_kind.items():
+        for handler in _handlers[kind]:
+            handler(batch)
+
+
+@handles(COURSE_COMPLETED)
+def log_course_completions(events: List[CompletionEvent]) -> None:
+    for event in events:
+        payload = event.payload
+        logger.info(
+            "User %s completed course %s in %s",
+            payload["user"],
+            payload["course"],
+            timedelta(seconds=payload["completed_at"] - payload["enrolled_at"]),
+        )
@@ -0,0 +1,119 @@
+"""Full exports of enrollments and lesson progress, streamed row by row.
+
+Rows are read with ``QuerySet.iterator(chunk_size=EXPORT_CHUNK_SIZE)``, a
+server-side cursor on PostgreSQL, as flat ``values_list`` tuples, and each
+chunk is written out before the next is fetched. Memory use therefore
+depends on the chunk size and not on how many rows the export holds.
+"""
+
+import csv
+import datetime
+import io
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from .models import Enrollment, LessonProgress
+
+# Export name -> (column, lookup) pairs; the columns are the CSV header and
+# the NDJSON keys.
+COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "enrollments": [
+        ("id", "id"),
+        ("user_id", "user_id"),
+        ("user_email", "user__email"),
+        ("course_id", "course_id"),
+        ("course_title", "course__title"),
+        ("enrolled_at", "enrolled_at"),
+        ("is_completed", "is_completed"),
+        ("completed_at", "completed_at"),
+        ("completed_lessons", "completed_lessons"),
+        ("last_activity_at", "last_activity_at"),
+    ],
+    "progress": [
+        ("enrollment_id", "enrollment_id"),
+        ("user_id", "enrollment__user_id"),
+        ("user_email", "enrollment__user__email"),
+        ("course_id", "lesson__course_id"),
+        ("lesson_id", "lesson_id"),
+        ("lesson_order", "lesson__order"),
+        ("lesson_title", "lesson__title"),
+        ("completed_at", "completed_at"),
+    ],
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def enrollments_for(user) -> QuerySet:
+    """Enrollments in the courses ``user`` teaches; all for superusers."""
+    if user.is_superuser:
+        return Enrollment.objects.all()
+    return Enrollment.objects.filter(course__user=user)
+
+
+def export_rows(name: str, enrollments: QuerySet) -> Iterator[tuple]:
+    """Stream the rows of export ``name`` for ``enrollments``, in id order."""
+    lookups = [lookup for _, lookup in COLUMNS[name]]
+    if name == "progress":
+        queryset = LessonProgress.objects.filter(
+            enrollment__in=enrollments.values("pk")
+        )
+    else:
+        queryset = enrollments
+    return (
+        queryset.order_by("id")
+        .values_list(*lookups)
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _chunks(rows: Iterable[tuple]) -> Iterator[List[tuple]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, settings.EXPORT_CHUNK_SIZE)):
+        yield chunk
+
+
+def csv_lines(name: str, rows: Iterable[tuple]) -> Iterator[str]:
+    """The header, then one string per chunk of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column for column, _ in COLUMNS[name])
+    yield buffer.getvalue()
+
+    for chunk in _chunks(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            ["" if value is None else _value(value) for value in row]
+            for row in chunk
+        )
+        yield buffer.getvalue()
+
+
+def ndjson_lines(name: str, rows: Iterable[tuple]) -> Iterator[str]:
+    """One JSON object per row, one string per chunk of rows."""
+    columns = [column for column, _ in COLUMNS[name]]
+    for chunk in _chunks(rows):
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_value, row)))) + "\n" for row in chunk
+        )
+
+
+FORMATS = {"csv": csv_lines, "ndjson": ndjson_lines}
+
+
+def stream_export(name: str, output: str, enrollments: QuerySet) -> Iterator[str]:
+    return FORMATS[output](name, export_rows(name, enrollments))
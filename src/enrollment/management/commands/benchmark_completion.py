@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from course.models import Course, Lesson
+from enrollment.models import Enrollment
+from learnify.utils.benchmark import format_summary, measure
+from user.models import User, UserRoles
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and latency per lesson completion through "
+        "EnrollmentCompleteAPIView. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--learners", type=int, default=20)
+        parser.add_argument("--lessons", type=int, default=50)
+
+    def handle(self, *args, **options):
+        learners = options["learners"]
+        lessons = options["lessons"]
+
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            # One extra lesson keeps every enrollment short of completion, so
+            # the run never writes completion events.
+            course = Course.objects.create(
+                title="Benchmark Course",
+                description="Benchmark",
+                is_published=True,
+                user=instructor,
+                total_lessons=lessons + 1,
+            )
+            lesson_ids = [
+                lesson.id
+                for lesson in Lesson.objects.bulk_create(
+                    Lesson(course=course, title=f"Lesson {order}", order=order)
+                    for order in range(1, lessons + 2)
+                )
+            ]
+            students = User.objects.bulk_create(
+                User(
+                    email=f"bench-student-{i}@learnify.local",
+                    full_name=f"Benchmark Student {i}",
+                    role=UserRoles.STUDENT,
+                    password="!",
+                )
+                for i in range(learners)
+            )
+            enrollments = Enrollment.objects.bulk_create(
+                Enrollment(user=student, course=course) for student in students
+            )
+
+            client = APIClient(SERVER_NAME="localhost")
+
+            def complete(i):
+                enrollment = enrollments[i // lessons]
+                client.force_authenticate(user=students[i // lessons])
+                response = client.patch(
+                    reverse("enrollment-complete", kwargs={"pk": enrollment.id}),
+                    {"lesson": lesson_ids[i % lessons]},
+                    format="json",
+                )
+                assert response.status_code == 200, response.content
+
+            summary = measure(complete, learners * lessons)
+            self.stdout.write(format_summary("lesson completion", summary))
+
+            transaction.set_rollback(True)
@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from course.models import Course
+from enrollment import exports
+from enrollment.models import Enrollment
+from learnify.utils.benchmark import measure_allocations
+from user.models import User, UserRoles
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure rows/sec and peak Python memory of the enrollment export for "
+        "growing row counts, streamed and with every row read up front. All "
+        "data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+        parser.add_argument("--output", choices=exports.FORMATS, default="csv")
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["rows"])
+        output = options["output"]
+
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            students = User.objects.bulk_create(
+                (
+                    User(
+                        email=f"bench-student-{i}@learnify.local",
+                        full_name=f"Benchmark Student {i}",
+                        role=UserRoles.STUDENT,
+                        password="!",
+                    )
+                    for i in range(sizes[-1])
+                ),
+                batch_size=1000,
+            )
+            # One course per size, with that many enrollments.
+            courses = []
+            for size in sizes:
+                course = Course.objects.create(
+                    title=f"Export {size}", description="Benchmark", user=instructor
+                )
+                Enrollment.objects.bulk_create(
+                    (
+                        Enrollment(user=student, course=course)
+                        for student in students[:size]
+                    ),
+                    batch_size=1000,
+                )
+                courses.append(course)
+
+            for size, course in zip(sizes, courses):
+                enrollments = Enrollment.objects.filter(course=course)
+                for label, export in (
+                    ("streamed", self.streamed),
+                    ("read up front", self.read_up_front),
+                ):
+                    started = time.perf_counter()
+                    export(enrollments, output)
+                    elapsed = time.perf_counter() - started
+                    peak = measure_allocations(
+                        lambda _: export(enrollments, output), 1
+                    )
+                    self.stdout.write(
+                        f"{size} rows {label}: rows/s={round(size / elapsed)} "
+                        f"peak={peak}KiB"
+                    )
+
+            transaction.set_rollback(True)
+
+    def streamed(self, enrollments, output):
+        for _ in exports.stream_export("enrollments", output, enrollments):
+            pass
+
+    def read_up_front(self, enrollments, output):
+        rows = list(exports.export_rows("enrollments", enrollments))
+        "".join(exports.FORMATS[output]("enrollments", rows))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from enrollment import exports
+from enrollment.filters import EnrollmentFilters
+from enrollment.models import Enrollment
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every enrollment, or every lesson progress row with --progress, "
+        "as CSV or NDJSON to stdout or --file. Takes the same filters as "
+        "/api/v1/enrollments/export/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--progress", action="store_true")
+        parser.add_argument("--output", choices=exports.FORMATS, default="csv")
+        parser.add_argument("--file", help="Write here instead of stdout.")
+        parser.add_argument("--course-id", type=int)
+        parser.add_argument("--is-completed", choices=["true", "false"])
+        parser.add_argument("--from-date", help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--to-date", help="YYYY-MM-DD, inclusive.")
+
+    def handle(self, *args, **options):
+        data = {
+            name: options[name]
+            for name in ("course_id", "is_completed", "from_date", "to_date")
+            if options[name] is not None
+        }
+        filterset = EnrollmentFilters(data, queryset=Enrollment.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        export = "progress" if options["progress"] else "enrollments"
+        chunks = exports.stream_export(export, options["output"], filterset.qs)
+        if options["file"] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["file"], "w", newline="", encoding="utf-8") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        self.stderr.write(f"Wrote {export} to {options['file']}.")
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from enrollment.utils.progress import find_counter_drift, rebuild_progress_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Course.total_lessons and Enrollment.completed_lessons from "
+        "lessons and lesson progress, or only report drift with --check"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Report stale counters and exit with an error instead of fixing them.",
+        )
+
+    def handle(self, *args, **options):
+        courses, enrollments = find_counter_drift()
+
+        for course_id, stored, actual in courses:
+            self.stdout.write(
+                f"Course {course_id}: total_lessons is {stored}, expected {actual}"
+            )
+        for enrollment_id, stored, actual in enrollments:
+            self.stdout.write(
+                f"Enrollment {enrollment_id}: completed_lessons is {stored}, "
+                f"expected {actual}"
+            )
+
+        if options["check"]:
+            if courses or enrollments:
+                raise CommandError(
+                    f"{len(courses)} course and {len(enrollments)} enrollment "
+                    "counters are out of date."
+                )
+            self.stdout.write(self.style.SUCCESS("All progress counters are correct."))
+            return
+
+        with transaction.atomic():
+            course_rows, enrollment_rows = rebuild_progress_counters()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt counters for {course_rows} courses and "
+                f"{enrollment_rows} enrollments."
+            )
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_completed_lessons(apps, schema_editor):
+    Enrollment = apps.get_model("enrollment", "Enrollment")
+    LessonProgress = apps.get_model("enrollment", "LessonProgress")
+
+    completed_counts = (
+        LessonProgress.objects.filter(
+            enrollment=OuterRef("pk"), completed_at__isnull=False
+        )
+        .order_by()
+        .values("enrollment")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Enrollment.objects.update(
+        completed_lessons=Coalesce(Subquery(completed_counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_completed_lessons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0003_catalog_indexes'),
+        ('enrollment', '0002_enrollment_completed_lessons'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['user', '-enrolled_at', '-id'], name='enrollments_user_enrolled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False)), fields=['enrollment', 'lesson'], name='lesson_progress_completed_idx'),
+        ),
+    ]
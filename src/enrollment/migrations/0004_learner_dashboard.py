@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+
+def backfill_activity(apps, schema_editor):
+    Enrollment = apps.get_model("enrollment", "Enrollment")
+    LessonProgress = apps.get_model("enrollment", "LessonProgress")
+    LearnerActivity = apps.get_model("enrollment", "LearnerActivity")
+
+    last_completed = (
+        LessonProgress.objects.filter(enrollment=OuterRef("pk"))
+        .order_by()
+        .values("enrollment")
+        .annotate(last=Max("completed_at"))
+        .values("last")
+    )
+    Enrollment.objects.update(last_activity_at=Subquery(last_completed))
+
+    # Past streaks are not reconstructed; the last active day counts as one.
+    learners = (
+        Enrollment.objects.filter(last_activity_at__isnull=False)
+        .order_by()
+        .values("user_id")
+        .annotate(last=Max("last_activity_at"))
+    )
+    LearnerActivity.objects.bulk_create(
+        (
+            LearnerActivity(
+                user_id=row["user_id"],
+                last_activity_at=row["last"],
+                last_active_on=timezone.localdate(row["last"]),
+                current_streak=1,
+                longest_streak=1,
+            )
+            for row in learners.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollment', '0003_enrollment_indexes'),
+        ('user', '0003_user_users_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerActivity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_activity_at', models.DateTimeField()),
+                ('last_active_on', models.DateField()),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'learner_activity',
+            },
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
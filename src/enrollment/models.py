@@ -1,13 +1,106 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from course.models import Course, Lesson
 from user.models import User
 
 
+class EnrollmentQuerySet(models.QuerySet):
+    def with_completion_state(self, lesson_id):
+        """Annotate everything the completion rules need to know about a lesson.
+
+        Lesson columns come back as None when the lesson does not exist, so
+        one SELECT answers every check in EnrollmentCompleteSerializer.
+        ``earlier_lesson_open`` tells whether a lesson ordered before this
+        one is not completed yet, i.e. whether it cannot be completed next.
+        """
+        lesson = Lesson.objects.filter(pk=lesson_id)
+        return self.annotate(
+            course_total_lessons=F("course__total_lessons"),
+            lesson_course_id=Subquery(lesson.values("course_id")),
+            lesson_order=Subquery(lesson.values("order")),
+            lesson_title=Subquery(lesson.values("title")),
+            lesson_completed=Exists(
+                LessonProgress.objects.filter(
+                    enrollment=OuterRef("pk"),
+                    lesson_id=lesson_id,
+                    completed_at__isnull=False,
+                )
+            ),
+        ).annotate(
+            earlier_lesson_open=Exists(
+                Lesson.objects.filter(
+                    course=OuterRef("course_id"), order__lt=OuterRef("lesson_order")
+                ).exclude(
+                    pk__in=LessonProgress.objects.filter(
+                        enrollment=OuterRef(OuterRef("pk")), completed_at__isnull=False
+                    ).values("lesson_id")
+                )
+            ),
+        )
+
+    def with_next_lesson(self):
+        """Annotate the lesson the sequential rule lets the learner complete next.
+
+        That is the first lesson, in course order, the learner has not
+        completed, and ``next_lesson_rank`` is its 1-based place in the
+        course. Orders are sparse (see course.ordering), so the rank is
+        counted rather than read. The id and title are None once the course
+        is finished.
+        """
+        completed = LessonProgress.objects.filter(
+            enrollment=OuterRef(OuterRef("pk")),
+            lesson=OuterRef("pk"),
+            completed_at__isnull=False,
+        )
+        next_lesson = (
+            Lesson.objects.filter(course=OuterRef("course_id"))
+            .filter(~Exists(completed))
+            .order_by("order")
+        )
+        lessons_before = (
+            Lesson.objects.filter(
+                course=OuterRef("course_id"), order__lt=OuterRef("next_lesson_order")
+            )
+            .order_by()
+            .values("course")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(
+            next_lesson_id=Subquery(next_lesson.values("id")[:1]),
+            next_lesson_title=Subquery(next_lesson.values("title")[:1]),
+            next_lesson_order=Subquery(next_lesson.values("order")[:1]),
+        ).annotate(
+            next_lesson_rank=Coalesce(Subquery(lessons_before), 0) + 1,
+        )
+
+
 class Enrollment(models.Model):
     class Meta:
         db_table = "enrollments"
         unique_together = ("user", "course")
+        indexes = [
+            # A learner's enrollments filtered by enrolled_at, newest first.
+            models.Index(
+                fields=["user", "-enrolled_at", "-id"],
+                name="enrollments_user_enrolled_idx",
+            ),
+        ]
+
+    objects = EnrollmentQuerySet.as_manager()
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="enrollments")
     course = models.ForeignKey(
@@ -16,6 +109,8 @@ class Enrollment(models.Model):
     enrolled_at = models.DateTimeField(auto_now_add=True)
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
+    completed_lessons = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.user.email} -> {self.course.title}"
@@ -25,11 +120,61 @@ class Enrollment(models.Model):
         self.completed_at = timezone.now()
         self.save(update_fields=["is_completed", "completed_at"])
 
+    def record_lesson_completions(self, lesson_ids, total_lessons):
+        """Advance completed_lessons past ``lesson_ids`` and store their progress.
+
+        The UPDATE only matches while completed_lessons still holds the value
+        this instance was read with, so a concurrent completion that got there
+        first turns it into a no-op. A row locked with select_for_update can
+        be fresher than the state it was validated against, so the UPDATE can
+        still match while the progress already exists; both are then rolled
+        back together. Returns False in either case.
+        """
+        completed_at = timezone.now()
+        completed_lessons = self.completed_lessons + len(lesson_ids)
+        changes = {
+            "completed_lessons": completed_lessons,
+            "last_activity_at": completed_at,
+        }
+        if completed_lessons >= total_lessons:
+            changes.update(is_completed=True, completed_at=completed_at)
+
+        try:
+            with transaction.atomic():
+                updated = Enrollment.objects.filter(
+                    pk=self.pk, completed_lessons=self.completed_lessons
+                ).update(**changes)
+                if not updated:
+                    return False
+
+                LessonProgress.objects.bulk_create(
+                    LessonProgress(
+                        enrollment_id=self.pk,
+                        lesson_id=lesson_id,
+                        completed_at=completed_at,
+                    )
+                    for lesson_id in lesson_ids
+                )
+        except IntegrityError:
+            return False
+        LearnerActivity.objects.record(self.user_id, completed_at)
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return True
+
 
 class LessonProgress(models.Model):
     class Meta:
         db_table = "lesson_progress"
         unique_together = ("enrollment", "lesson")
+        indexes = [
+            # Covers the completed-lesson lookups without touching the table.
+            models.Index(
+                fields=["enrollment", "lesson"],
+                condition=models.Q(completed_at__isnull=False),
+                name="lesson_progress_completed_idx",
+            ),
+        ]
 
     enrollment = models.ForeignKey(
         Enrollment, on_delete=models.CASCADE, related_name="lesson_progress"
@@ -38,3 +183,95 @@ class LessonProgress(models.Model):
         Lesson, on_delete=models.CASCADE, related_name="lesson_progress"
     )
     completed_at = models.DateTimeField(null=True, blank=True)
+
+
+class LearnerActivityQuerySet(models.QuerySet):
+    def record(self, user_id, completed_at):
+        """Count ``completed_at`` towards the learner's daily streak.
+
+        One UPDATE computes the new streak from the stored one: unchanged
+        on a day that already counts, one longer the day after, otherwise
+        restarted. The row is created on the learner's first completion.
+        """
+        today = timezone.localdate(completed_at)
+        streak = Case(
+            When(last_active_on__gte=today, then=F("current_streak")),
+            When(
+                last_active_on=today - timedelta(days=1),
+                then=F("current_streak") + 1,
+            ),
+            default=Value(1),
+        )
+        # Both expressions read the row as it was before the UPDATE.
+        updated = self.filter(user_id=user_id).update(
+            current_streak=streak,
+            longest_streak=Greatest(F("longest_streak"), streak),
+            last_active_on=today,
+            last_activity_at=completed_at,
+        )
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(
+                    user_id=user_id,
+                    current_streak=1,
+                    longest_streak=1,
+                    last_active_on=today,
+                    last_activity_at=completed_at,
+                )
+        except IntegrityError:
+            # A concurrent first completion created the row; count this one.
+            self.record(user_id, completed_at)
+
+
+class LearnerActivity(models.Model):
+    """Per-learner summary the dashboard reads, kept up to date on completion."""
+
+    class Meta:
+        db_table = "learner_activity"
+
+    objects = LearnerActivityQuerySet.as_manager()
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="activity"
+    )
+    last_activity_at = models.DateTimeField()
+    # Days with at least one completed lesson, in TIME_ZONE.
+    last_active_on = models.DateField()
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+
+    def streak_on(self, day):
+        """The current streak as of ``day``; 0 once a whole day was missed."""
+        if self.last_active_on >= day - timedelta(days=1):
+            return self.current_streak
+        return 0
+
+
+class CompletionEvent(models.Model):
+    """Outbox row for work that follows a completion; see enrollment.events.
+
+    Written in the completing transaction, so an event exists exactly when
+    the completion was committed. ``idempotency_key`` makes enqueueing the
+    same event twice a no-op, and ``processed_at`` keeps a retried batch
+    from handling an event again.
+    """
+
+    class Meta:
+        db_table = "completion_events"
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(processed_at__isnull=True),
+                name="completion_events_pending_idx",
+            ),
+        ]
+
+    kind = models.CharField(max_length=32)
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
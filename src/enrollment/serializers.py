@@ -1,8 +1,13 @@
+from django.db.models import F
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 from .models import Enrollment
+from .signals import enrollments_created, lessons_completed
 from .utils.progress import calculate_enrollment_progress
 from course.models import Course, Lesson
-from user.models import UserRoles
+from user.models import User, UserRoles
+from learnify.utils.instrumentation import InstrumentedSerializerMixin
+from learnify.utils.serializers import FastReadMixin
 
 
 class EnrollmentSerializer(serializers.Serializer):
@@ -33,13 +38,15 @@ class EnrollmentSerializer(serializers.Serializer):
         return enrollment
 
 
-class EnrollmentCourseSerializer(serializers.ModelSerializer):
+class EnrollmentCourseSerializer(FastReadMixin, serializers.ModelSerializer):
     class Meta:
         model = Course
         fields = ["id", "title", "description", "is_published"]
 
 
-class EnrollmentListSerializer(serializers.ModelSerializer):
+class EnrollmentListSerializer(
+    InstrumentedSerializerMixin, FastReadMixin, serializers.ModelSerializer
+):
     course = EnrollmentCourseSerializer()
     progress = serializers.SerializerMethodField()
 
@@ -58,37 +65,291 @@ class EnrollmentListSerializer(serializers.ModelSerializer):
         return calculate_enrollment_progress(obj)
 
 
+class DashboardEnrollmentSerializer(
+    InstrumentedSerializerMixin, FastReadMixin, serializers.ModelSerializer
+):
+    """Expects ``with_next_lesson()`` and ``select_related("course")``."""
+
+    course = EnrollmentCourseSerializer()
+    progress = serializers.SerializerMethodField()
+    next_lesson = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Enrollment
+        fields = [
+            "id",
+            "course",
+            "enrolled_at",
+            "is_completed",
+            "completed_at",
+            "last_activity_at",
+            "progress",
+            "next_lesson",
+        ]
+
+    def get_progress(self, obj):
+        return calculate_enrollment_progress(obj)
+
+    def get_next_lesson(self, obj):
+        if obj.next_lesson_id is None:
+            return None
+        return {
+            "id": obj.next_lesson_id,
+            "title": obj.next_lesson_title,
+            "order": obj.next_lesson_rank,
+        }
+
+
+def lesson_completion_error(
+    course_id, lesson_course_id, already_completed, is_next, next_rank
+):
+    """Return why a lesson cannot be completed next, or None if it can.
+
+    ``is_next`` tells whether the lesson is the first one, in course order,
+    the learner has not completed; ``next_rank`` is the place of that one.
+    """
+    if lesson_course_id is None:
+        return "Lesson does not exist."
+
+    if lesson_course_id != course_id:
+        return "Lesson does not belong to this course."
+
+    if already_completed:
+        return "This lesson has already been completed."
+
+    # Enforce sequential lesson completion
+    if not is_next:
+        return f"You must complete lesson {next_rank} first."
+
+    return None
+
+
 class EnrollmentCompleteSerializer(serializers.Serializer):
     lesson = serializers.IntegerField()
 
-    def validate_lesson(self, value):
-        enrollment = self.context["enrollment"]
+    def validate(self, attrs):
+        request = self.context["request"]
 
+        # Lock the enrollment so concurrent completions for the same learner
+        # are validated one after another against the committed counter.
         try:
-            lesson = Lesson.objects.get(id=value)
+            enrollment = (
+                Enrollment.objects.with_completion_state(attrs["lesson"])
+                .select_for_update(of=("self",))
+                .get(pk=self.context["enrollment_id"], user=request.user)
+            )
+        except Enrollment.DoesNotExist:
+            raise NotFound("Enrollment not found.")
+
+        is_next = not enrollment.earlier_lesson_open
+        next_rank = None
+        if not is_next:
+            # Only the error message needs the place of the lesson to do first.
+            next_rank = (
+                Enrollment.objects.with_next_lesson()
+                .values_list("next_lesson_rank", flat=True)
+                .get(pk=enrollment.pk)
+            )
+        error = lesson_completion_error(
+            enrollment.course_id,
+            enrollment.lesson_course_id,
+            enrollment.lesson_completed,
+            is_next,
+            next_rank,
+        )
+        if error:
+            raise serializers.ValidationError({"lesson": error})
 
-        except Lesson.DoesNotExist:
-            raise serializers.ValidationError("Lesson does not exist.")
+        attrs["enrollment"] = enrollment
+        return attrs
 
-        if lesson.course_id != enrollment.course_id:
-            raise serializers.ValidationError("Lesson does not belong to this course.")
+    def create(self, validated_data):
+        enrollment = validated_data["enrollment"]
+        was_completed = enrollment.is_completed
+
+        if not enrollment.record_lesson_completions(
+            [validated_data["lesson"]], enrollment.course_total_lessons
+        ):
+            # Another request completed the lesson after our read: it advanced
+            # the counter or, read through the lock, already stored the
+            # progress. With a sequential course it can only be this lesson.
+            raise serializers.ValidationError(
+                {"lesson": "This lesson has already been completed."}
+            )
+        lessons_completed.send(
+            sender=Enrollment,
+            enrollment=enrollment,
+            lesson_ids=[validated_data["lesson"]],
+            course_completed=enrollment.is_completed and not was_completed,
+        )
+        return enrollment
+
+
+class BulkEnrollmentCompleteSerializer(serializers.Serializer):
+    lessons = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=500
+    )
+
+    def validate(self, attrs):
+        request = self.context["request"]
+        lesson_ids = attrs["lessons"]
+
+        try:
+            enrollment = (
+                Enrollment.objects.annotate(
+                    course_total_lessons=F("course__total_lessons")
+                )
+                .select_for_update(of=("self",))
+                .get(pk=self.context["enrollment_id"], user=request.user)
+            )
+        except Enrollment.DoesNotExist:
+            raise NotFound("Enrollment not found.")
 
-        if enrollment.lesson_progress.filter(
-            lesson=lesson,
-            completed_at__isnull=False,
-        ).exists():
-            raise serializers.ValidationError("This lesson has already been completed.")
+        lessons = Lesson.objects.only("id", "course_id").in_bulk(lesson_ids)
+        # The course's lessons in order, and the ones the learner completed:
+        # the sequential rule walks both.
+        sequence = list(
+            Lesson.objects.filter(course_id=enrollment.course_id)
+            .order_by("order")
+            .values_list("id", flat=True)
+        )
+        completed = set(
+            enrollment.lesson_progress.filter(completed_at__isnull=False).values_list(
+                "lesson_id", flat=True
+            )
+        )
+        rank = {lesson_id: index for index, lesson_id in enumerate(sequence)}
+
+        # Apply the sequential rule in lesson order, so a client may send its
+        # offline backlog in any order but still cannot skip a lesson.
+        errors = {}
+        accepted = []
+        next_index = 0
+        for lesson_id in sorted(set(lesson_ids), key=lambda id: rank.get(id, -1)):
+            while next_index < len(sequence) and sequence[next_index] in completed:
+                next_index += 1
+            lesson = lessons.get(lesson_id)
+            error = lesson_completion_error(
+                enrollment.course_id,
+                lesson.course_id if lesson else None,
+                lesson_id in completed,
+                next_index < len(sequence) and sequence[next_index] == lesson_id,
+                next_index + 1,
+            )
+            if error:
+                errors[lesson_id] = error
+                continue
+            accepted.append(lesson_id)
+            completed.add(lesson_id)
 
-        # Enforce sequential lesson completion
-        completed_count = enrollment.lesson_progress.filter(
-            completed_at__isnull=False
-        ).count()
+        attrs.update(enrollment=enrollment, accepted=accepted, errors=errors)
+        return attrs
 
-        expected_order = completed_count + 1
+    def create(self, validated_data):
+        enrollment = validated_data["enrollment"]
+        accepted = validated_data["accepted"]
+        was_completed = enrollment.is_completed
 
-        if lesson.order != expected_order:
+        if not accepted:
+            return enrollment
+        if not enrollment.record_lesson_completions(
+            accepted, enrollment.course_total_lessons
+        ):
             raise serializers.ValidationError(
-                f"You must complete lesson {expected_order} first."
+                {"lessons": "Progress changed while saving, please retry."}
             )
+        lessons_completed.send(
+            sender=Enrollment,
+            enrollment=enrollment,
+            lesson_ids=accepted,
+            course_completed=enrollment.is_completed and not was_completed,
+        )
+        return enrollment
+
+    def get_results(self):
+        accepted = set(self.validated_data["accepted"])
+        errors = self.validated_data["errors"]
+        results = []
+        seen = set()
+        for lesson_id in self.validated_data["lessons"]:
+            if lesson_id in accepted and lesson_id not in seen:
+                results.append({"lesson": lesson_id, "status": "completed"})
+            else:
+                results.append(
+                    {
+                        "lesson": lesson_id,
+                        "status": "rejected",
+                        "error": errors.get(
+                            lesson_id, "This lesson has already been completed."
+                        ),
+                    }
+                )
+            seen.add(lesson_id)
+        return results
+
+
+class BulkEnrollmentItemSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    course_id = serializers.IntegerField()
+
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    enrollments = serializers.ListField(
+        child=BulkEnrollmentItemSerializer(), allow_empty=False, max_length=1000
+    )
+
+    def validate(self, attrs):
+        items = attrs["enrollments"]
+        user_ids = {item["user_id"] for item in items}
+        course_ids = {item["course_id"] for item in items}
+
+        users = User.objects.only("id", "role").in_bulk(user_ids)
+        courses = (
+            Course.objects.filter(is_published=True)
+            .only("id", "user_id")
+            .in_bulk(course_ids)
+        )
+        existing = set(
+            Enrollment.objects.filter(
+                user_id__in=user_ids, course_id__in=course_ids
+            ).values_list("user_id", "course_id")
+        )
+
+        results = []
+        for item in items:
+            pair = (item["user_id"], item["course_id"])
+            user = users.get(item["user_id"])
+            course = courses.get(item["course_id"])
+
+            if user is None:
+                error = "User does not exist."
+            elif course is None:
+                error = "Course does not exist."
+            elif user.role == UserRoles.INSTRUCTOR and course.user_id == user.id:
+                error = "Instructors cannot enroll in their own courses."
+            elif pair in existing:
+                error = "User is already enrolled in this course."
+            else:
+                error = None
+
+            if error:
+                results.append({**item, "status": "rejected", "error": error})
+                continue
+            existing.add(pair)
+            results.append({**item, "status": "enrolled"})
+
+        attrs["results"] = results
+        return attrs
+
+    def create(self, validated_data):
+        results = validated_data["results"]
+        enrolled = [result for result in results if result["status"] == "enrolled"]
 
-        return lesson
+        enrollments = Enrollment.objects.bulk_create(
+            Enrollment(user_id=result["user_id"], course_id=result["course_id"])
+            for result in enrolled
+        )
+        for result, enrollment in zip(enrolled, enrollments):
+            result["enrollment_id"] = enrollment.id
+        enrollments_created.send(sender=Enrollment, enrollments=enrollments)
+        return enrollments
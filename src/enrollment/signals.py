@@ -0,0 +1,20 @@
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Enrollment, LessonProgress
+
+# Sent after lessons are marked completed, with ``enrollment``, ``lesson_ids``
+# and ``course_completed`` (whether they finished the course).
+lessons_completed = Signal()
+# Sent for enrollments written with bulk_create, which skips post_save.
+enrollments_created = Signal()
+
+
+@receiver(post_delete, sender=LessonProgress)
+def decrement_completed_lessons(sender, instance, **kwargs):
+    if instance.completed_at is None:
+        return
+    Enrollment.objects.filter(
+        pk=instance.enrollment_id, completed_lessons__gt=0
+    ).update(completed_lessons=F("completed_lessons") - 1)
@@ -1,13 +1,9 @@
 from celery import shared_task
 
+from .events import process_pending_events
 
-@shared_task
-def after_enrollment_complete(enrolled_at, completed_at):
 
-    time_duration = completed_at - enrolled_at
-    print(
-        "***************Congratulations!! you have successfully completed the course ********************"
-    )
-    print(
-        f"*******************Time taken to complete the course: {time_duration}*******************"
-    )
+@shared_task(ignore_result=True)
+def process_completion_events():
+    """Drain the completion outbox; queued on commit and run periodically."""
+    return process_pending_events()
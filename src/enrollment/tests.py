@@ -1,11 +1,32 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
+from learnify.utils.testing import (
+    QueryCountAssertionsMixin,
+    QueryPlanAssertionsMixin,
+)
 from user.models import User
+from user.tokens import LearnifyRefreshToken
 from course.models import Course, Lesson
-from .models import Enrollment, LessonProgress
+from . import events
+from .filters import EnrollmentFilters
+from .models import CompletionEvent, Enrollment, LearnerActivity, LessonProgress
+from .tasks import process_completion_events
 
 
 class TestEnrollmentCreation(APITestCase):
@@ -160,3 +181,810 @@ class TestLessonCompletion(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("already been completed", str(response.data))
+
+    def test_lesson_inserted_before_completed_ones_comes_next(self):
+        self.client.force_authenticate(user=self.student)
+        url = reverse("enrollment-complete", kwargs={"pk": self.enrollment.id})
+        for lesson in (self.lesson1, self.lesson2):
+            response = self.client.patch(url, {"lesson": lesson.id}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Orders are sparse; 0 puts the new lesson first without moving others.
+        inserted = Lesson.objects.create(
+            title="Setup", content="Install Python", course=self.course, order=0
+        )
+
+        response = self.client.patch(url, {"lesson": self.lesson3.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("You must complete lesson 1 first", str(response.data))
+
+        response = self.client.patch(url, {"lesson": inserted.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {"lesson": self.lesson3.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestProgressCounters(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+
+        self.course = Course.objects.create(
+            title="Python Course",
+            description="Learn Python",
+            is_published=True,
+            user=self.instructor,
+        )
+
+        self.lessons = [
+            Lesson.objects.create(
+                title=f"Lesson {order}",
+                content="Content",
+                course=self.course,
+                order=order,
+            )
+            for order in range(1, 4)
+        ]
+
+        self.enrollment = Enrollment.objects.create(
+            user=self.student, course=self.course
+        )
+
+    def _complete(self, lesson):
+        url = reverse("enrollment-complete", kwargs={"pk": self.enrollment.id})
+        return self.client.patch(url, {"lesson": lesson.id}, format="json")
+
+    def test_counters_follow_lessons_and_completions(self):
+        self.client.force_authenticate(user=self.student)
+
+        self.assertEqual(self._complete(self.lessons[0]).status_code, 200)
+
+        self.course.refresh_from_db()
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.course.total_lessons, 3)
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+
+        url = reverse("enrollment-progress", kwargs={"pk": self.enrollment.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(
+            response.data["data"],
+            {"total_lessons": 3, "completed_lessons": 1, "progress": 33.33},
+        )
+
+    def test_completion_is_one_locked_read_and_one_conditional_write(self):
+        self.client.force_authenticate(user=self.student)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self._complete(self.lessons[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        statements = [
+            query["sql"].split()[0]
+            for query in context.captured_queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        # Then the dashboard's activity summary (created by the learner's
+        # first completion) and the lesson statistics are brought up to date.
+        self.assertEqual(
+            statements,
+            ["SELECT", "UPDATE", "INSERT", "UPDATE", "INSERT", "UPDATE"],
+        )
+        response = self._complete(self.lessons[1])
+        with CaptureQueriesContext(connection) as context:
+            response = self._complete(self.lessons[2])
+        statements = [
+            query["sql"].split()[0]
+            for query in context.captured_queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        # Finishing the course also counts a completion in its statistics
+        # and writes the completion event; nothing waits for the workers.
+        self.assertEqual(
+            statements,
+            ["SELECT", "UPDATE", "INSERT", "UPDATE", "UPDATE", "UPDATE", "INSERT"],
+        )
+
+    def test_stale_completion_state_does_not_double_count(self):
+        first = Enrollment.objects.with_completion_state(self.lessons[0].id).get(
+            pk=self.enrollment.pk
+        )
+        second = Enrollment.objects.with_completion_state(self.lessons[0].id).get(
+            pk=self.enrollment.pk
+        )
+
+        self.assertTrue(first.record_lesson_completions([self.lessons[0].id], 3))
+        self.assertFalse(second.record_lesson_completions([self.lessons[0].id], 3))
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(self.enrollment.lesson_progress.count(), 1)
+
+    def test_completion_validated_on_a_stale_snapshot_is_rejected(self):
+        # On READ COMMITTED a request that waited for the row lock reads the
+        # fresh counter but may validate against the state from before the
+        # other request committed: the lesson then looks not completed yet.
+        self.client.force_authenticate(user=self.student)
+        self._complete(self.lessons[0])
+
+        with mock.patch(
+            "enrollment.serializers.lesson_completion_error", return_value=None
+        ):
+            response = self._complete(self.lessons[0])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already been completed", str(response.data))
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(self.enrollment.lesson_progress.count(), 1)
+
+    def test_deleting_a_completed_lesson_updates_both_counters(self):
+        self.client.force_authenticate(user=self.student)
+        self._complete(self.lessons[0])
+
+        self.client.force_authenticate(user=self.instructor)
+        url = reverse("specific_lesson", kwargs={"id": self.lessons[0].id})
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.course.refresh_from_db()
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.course.total_lessons, 2)
+        self.assertEqual(self.enrollment.completed_lessons, 0)
+
+    def test_enrollment_list_reads_progress_without_counting(self):
+        self.client.force_authenticate(user=self.student)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("enrollments"))
+
+        self.assertEqual(response.data["data"][0]["progress"]["total_lessons"], 3)
+
+    def test_rebuild_command_repairs_drift(self):
+        LessonProgress.objects.create(
+            enrollment=self.enrollment,
+            lesson=self.lessons[0],
+            completed_at=timezone.now(),
+        )
+        Course.objects.filter(pk=self.course.pk).update(total_lessons=7)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_progress_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_progress_counters", stdout=StringIO())
+
+        self.course.refresh_from_db()
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.course.total_lessons, 3)
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        call_command("rebuild_progress_counters", "--check", stdout=StringIO())
+
+
+class TestBulkEndpoints(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@test.com", full_name="Admin", password="admin123"
+        )
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f"student{i}@test.com",
+                full_name=f"Student {i}",
+                password="student123",
+                role="student",
+            )
+            for i in range(3)
+        ]
+        self.course = Course.objects.create(
+            title="Python Course",
+            description="Learn Python",
+            is_published=True,
+            user=self.instructor,
+        )
+        self.lessons = [
+            Lesson.objects.create(
+                title=f"Lesson {order}",
+                content="Content",
+                course=self.course,
+                order=order,
+            )
+            for order in range(1, 6)
+        ]
+        self.enrollment = Enrollment.objects.create(
+            user=self.students[0], course=self.course
+        )
+
+    def _complete(self, lesson_ids):
+        url = reverse("enrollment-complete-bulk", kwargs={"pk": self.enrollment.id})
+        return self.client.patch(url, {"lessons": lesson_ids}, format="json")
+
+    def test_batch_is_applied_in_lesson_order(self):
+        self.client.force_authenticate(user=self.students[0])
+
+        response = self._complete(
+            [self.lessons[2].id, self.lessons[0].id, self.lessons[1].id]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data["data"]],
+            ["completed", "completed", "completed"],
+        )
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 3)
+
+    def test_batch_cannot_skip_a_lesson(self):
+        self.client.force_authenticate(user=self.students[0])
+
+        response = self._complete(
+            [self.lessons[0].id, self.lessons[2].id, self.lessons[0].id]
+        )
+
+        results = response.data["data"]
+        self.assertEqual(results[0]["status"], "completed")
+        self.assertIn("You must complete lesson 2 first", results[1]["error"])
+        self.assertIn("already been completed", results[2]["error"])
+        self.assertEqual(
+            LessonProgress.objects.filter(enrollment=self.enrollment).count(), 1
+        )
+
+    def test_batch_cost_does_not_grow_with_batch_size(self):
+        self.client.force_authenticate(user=self.students[0])
+        # Not a first completion, which also creates the activity summary.
+        LearnerActivity.objects.record(self.students[0].id, timezone.now())
+
+        with CaptureQueriesContext(connection) as small:
+            self._complete([self.lessons[0].id])
+        with CaptureQueriesContext(connection) as large:
+            self._complete([lesson.id for lesson in self.lessons[1:4]])
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_bulk_enrollment_reports_each_item(self):
+        self.client.force_authenticate(user=self.admin)
+        payload = {
+            "enrollments": [
+                {"user_id": self.students[1].id, "course_id": self.course.id},
+                {"user_id": self.students[2].id, "course_id": self.course.id},
+                {"user_id": self.students[0].id, "course_id": self.course.id},
+                {"user_id": self.instructor.id, "course_id": self.course.id},
+                {"user_id": self.students[1].id, "course_id": self.course.id},
+            ]
+        }
+
+        # Including one statistics UPDATE for the course.
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                reverse("enrollments-bulk"), payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data["data"]],
+            ["enrolled", "enrolled", "rejected", "rejected", "rejected"],
+        )
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 3)
+
+    def test_bulk_enrollment_requires_admin(self):
+        self.client.force_authenticate(user=self.students[0])
+
+        response = self.client.post(
+            reverse("enrollments-bulk"),
+            {"enrollments": [{"user_id": self.students[1].id, "course_id": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestEnrollmentQueryPlans(QueryPlanAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        course = Course.objects.create(
+            title="Python Course",
+            description="Learn Python",
+            is_published=True,
+            user=instructor,
+        )
+        self.enrollment = Enrollment.objects.create(user=self.student, course=course)
+
+    def test_completed_progress_uses_an_index(self):
+        self.assertUsesIndexes(
+            LessonProgress.objects.filter(
+                enrollment=self.enrollment, completed_at__isnull=False
+            )
+        )
+
+    def test_enrollment_date_filters_use_an_index(self):
+        filterset = EnrollmentFilters(
+            {"from_date": "2026-01-01", "to_date": "2026-12-31"},
+            queryset=Enrollment.objects.filter(user=self.student).order_by(
+                "-enrolled_at", "-id"
+            ),
+        )
+
+        self.assertUsesIndexes(filterset.qs)
+
+
+class TestEnrollmentListQueryCount(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        for i in range(6):
+            course = Course.objects.create(
+                title=f"Course {i}",
+                description="Course description",
+                is_published=True,
+                user=instructor,
+            )
+            lesson = Lesson.objects.create(
+                course=course, title="Lesson 1", content="Content", order=1
+            )
+            enrollment = Enrollment.objects.create(user=self.student, course=course)
+            if i % 2:
+                LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        self.client.force_authenticate(user=self.student)
+
+    def test_enrollment_list(self):
+        self.assertQueryCountFlat(reverse("enrollments"))
+        self.assertQueryCountFlat(reverse("enrollments"), {"is_completed": "false"})
+
+
+class TestDashboard(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        self.enrollments = []
+        for i in range(3):
+            course = Course.objects.create(
+                title=f"Course {i}",
+                description="Course description",
+                is_published=True,
+                user=instructor,
+            )
+            for order in range(1, 3):
+                Lesson.objects.create(
+                    course=course, title=f"Lesson {order}", content="", order=order
+                )
+            self.enrollments.append(
+                Enrollment.objects.create(user=self.student, course=course)
+            )
+        self.client.force_authenticate(user=self.student)
+
+    def _complete(self, enrollment, order):
+        lesson = enrollment.course.lessons.get(order=order)
+        url = reverse("enrollment-complete", kwargs={"pk": enrollment.id})
+        response = self.client.patch(url, {"lesson": lesson.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dashboard_summarises_every_enrollment(self):
+        self._complete(self.enrollments[1], 1)
+        self._complete(self.enrollments[2], 1)
+        self._complete(self.enrollments[2], 2)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["data"]
+        self.assertEqual(data["current_streak"], 1)
+        self.assertEqual(data["longest_streak"], 1)
+        self.assertIsNotNone(data["last_activity_at"])
+
+        # Most recent activity first, untouched enrollments last.
+        finished, started, fresh = data["enrollments"]
+        self.assertEqual(finished["id"], self.enrollments[2].id)
+        self.assertTrue(finished["is_completed"])
+        self.assertIsNone(finished["next_lesson"])
+        self.assertEqual(started["progress"]["completed_lessons"], 1)
+        self.assertEqual(started["next_lesson"]["order"], 2)
+        self.assertEqual(started["next_lesson"]["title"], "Lesson 2")
+        self.assertIsNone(fresh["last_activity_at"])
+        self.assertEqual(fresh["next_lesson"]["order"], 1)
+
+    def test_dashboard_query_count_does_not_grow_with_enrollments(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse("dashboard"))
+
+        Enrollment.objects.filter(pk=self.enrollments[0].pk).delete()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(len(response.data["data"]["enrollments"]), 2)
+
+    def test_streak_counts_consecutive_days(self):
+        day = datetime(2026, 3, 1, 12, tzinfo=dt_timezone.utc)
+        for offset in (0, 0, 1, 2, 5):
+            LearnerActivity.objects.record(
+                self.student.id, day + timedelta(days=offset)
+            )
+
+        activity = LearnerActivity.objects.get(user=self.student)
+        self.assertEqual(activity.current_streak, 1)
+        self.assertEqual(activity.longest_streak, 3)
+        self.assertEqual(activity.streak_on(activity.last_active_on), 1)
+        self.assertEqual(
+            activity.streak_on(activity.last_active_on + timedelta(days=2)), 0
+        )
+
+
+# Workers are not running in tests; tasks run where they are queued. The app
+# reads its config from the CELERY_ settings, so that is where to switch it.
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class TestCompletionEvents(APITestCase):
+
+    def setUp(self):
+        cache.delete(events._SCHEDULED_KEY)
+
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(
+            title="Python Course",
+            description="Learn Python",
+            is_published=True,
+            user=instructor,
+        )
+        self.lesson = Lesson.objects.create(
+            course=self.course, title="Lesson 1", content="", order=1
+        )
+        self.enrollment = Enrollment.objects.create(
+            user=self.student, course=self.course
+        )
+
+        self.batches = []
+        events.handles("test")(self.batches.append)
+        self.addCleanup(events._handlers.pop, "test")
+
+    def _add_event(self, key):
+        CompletionEvent.objects.create(kind="test", idempotency_key=key, payload={})
+
+    def test_completing_a_course_is_handled_after_commit(self):
+        self.client.force_authenticate(user=self.student)
+        url = reverse("enrollment-complete", kwargs={"pk": self.enrollment.id})
+
+        with self.assertLogs("learnify.events", "INFO") as logs:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.client.patch(
+                    url, {"lesson": self.lesson.id}, format="json"
+                )
+                # Nothing is processed before the transaction commits.
+                self.assertIsNone(CompletionEvent.objects.get().processed_at)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(callbacks), 1)
+        event = CompletionEvent.objects.get()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.payload["v"], events.PAYLOAD_VERSION)
+        self.assertEqual(event.payload["enrollment"], self.enrollment.id)
+        self.assertIn(f"completed course {self.course.id}", logs.output[0])
+
+    def test_unreachable_broker_leaves_events_for_the_periodic_run(self):
+        self.client.force_authenticate(user=self.student)
+        url = reverse("enrollment-complete", kwargs={"pk": self.enrollment.id})
+
+        with mock.patch.object(
+            process_completion_events,
+            "apply_async",
+            side_effect=ConnectionError("broker down"),
+        ):
+            with self.assertLogs("learnify.events", "ERROR") as logs:
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.patch(
+                        url, {"lesson": self.lesson.id}, format="json"
+                    )
+
+        # The completion stands, the failure is logged and the next completion
+        # may try to schedule again.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Could not schedule", logs.output[0])
+        self.assertIsNone(cache.get(events._SCHEDULED_KEY))
+        self.assertIsNone(CompletionEvent.objects.get().processed_at)
+
+        # The beat-scheduled run picks the event up.
+        process_completion_events.apply()
+        self.assertIsNotNone(CompletionEvent.objects.get().processed_at)
+
+    def test_enqueueing_twice_writes_one_event(self):
+        self.enrollment.refresh_from_db()
+        self.enrollment.completed_at = timezone.now()
+        with self.captureOnCommitCallbacks():
+            events.course_completed(self.enrollment)
+            events.course_completed(self.enrollment)
+
+        self.assertEqual(CompletionEvent.objects.count(), 1)
+
+    def test_pending_events_are_handled_once_in_batches(self):
+        for i in range(5):
+            self._add_event(f"test:{i}")
+
+        self.assertEqual(events.process_pending_events(batch_size=2), 5)
+        self.assertEqual([len(batch) for batch in self.batches], [2, 2, 1])
+
+        self.assertEqual(events.process_pending_events(), 0)
+        self.assertEqual(len(self.batches), 3)
+
+    def test_failed_batches_are_retried(self):
+        self._add_event("test:1")
+
+        def fail(batch):
+            raise RuntimeError("downstream unavailable")
+
+        events.handles("test")(fail)
+        with self.assertRaises(RuntimeError):
+            events.process_pending_events()
+        event = CompletionEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIsNone(event.processed_at)
+
+        events._handlers["test"].remove(fail)
+        self.assertEqual(events.process_pending_events(), 1)
+
+    def test_one_task_is_queued_per_delay_window(self):
+        with mock.patch.object(
+            process_completion_events, "apply_async"
+        ) as apply_async:
+            events.schedule_processing()
+            events.schedule_processing()
+
+        apply_async.assert_called_once_with(countdown=settings.COMPLETION_EVENT_DELAY)
+
+
+class TestAsyncEnrollmentViews(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        self.other = User.objects.create_user(
+            email="other@test.com",
+            full_name="Other Student",
+            password="student123",
+            role="student",
+        )
+        instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        for i in range(3):
+            course = Course.objects.create(
+                title=f"Course {i}",
+                description="Course description",
+                is_published=True,
+                user=instructor,
+            )
+            lesson = Lesson.objects.create(
+                course=course, title="Lesson 1", content="Content", order=1
+            )
+            Lesson.objects.create(
+                course=course, title="Lesson 2", content="Content", order=2
+            )
+            self.enrollment = Enrollment.objects.create(
+                user=self.student, course=course
+            )
+        LessonProgress.objects.create(enrollment=self.enrollment, lesson=lesson)
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(completed_lessons=1)
+
+    def _headers(self, user):
+        token = LearnifyRefreshToken.for_user(user).access_token
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_list_and_progress_match_sync_views(self):
+        headers = self._headers(self.student)
+        progress = {"pk": self.enrollment.pk}
+        for sync_url, async_url, params in (
+            (reverse("enrollments"), reverse("async-enrollments"), {"limit": 2}),
+            (reverse("enrollments"), reverse("async-enrollments"), {"cursor": ""}),
+            (
+                reverse("enrollment-progress", kwargs=progress),
+                reverse("async-enrollment-progress", kwargs=progress),
+                {},
+            ),
+        ):
+            expected = self.client.get(sync_url, params, headers=headers)
+            response = async_to_sync(self.async_client.get)(
+                async_url, params, headers=headers
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = response.content.decode().replace("/async/", "/")
+            self.assertEqual(json.loads(body), expected.json())
+
+        self.assertEqual(response.json()["data"]["completed_lessons"], 1)
+
+    def test_progress_of_another_learner_is_not_found(self):
+        response = async_to_sync(self.async_client.get)(
+            reverse("async-enrollment-progress", kwargs={"pk": self.enrollment.pk}),
+            headers=self._headers(self.other),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json()["message"], "Enrollment not found.")
+
+    def test_only_reads_are_allowed(self):
+        response = async_to_sync(self.async_client.post)(
+            reverse("async-enrollments"), headers=self._headers(self.student)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class TestExports(APITestCase):
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        other_instructor = User.objects.create_user(
+            email="other@test.com",
+            full_name="Other Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            full_name="Test Student",
+            password="student123",
+            role="student",
+        )
+        self.course = Course.objects.create(
+            title="Course, with a comma",
+            description="Description",
+            user=self.instructor,
+        )
+        other_course = Course.objects.create(
+            title="Other", description="Description", user=other_instructor
+        )
+        lesson = Lesson.objects.create(
+            course=self.course, title="Lesson 1", content="Content", order=1
+        )
+        self.enrollment = Enrollment.objects.create(
+            user=self.student, course=self.course
+        )
+        Enrollment.objects.create(user=self.student, course=other_course)
+        LessonProgress.objects.create(
+            enrollment=self.enrollment, lesson=lesson, completed_at=timezone.now()
+        )
+        token = LearnifyRefreshToken.for_user(self.instructor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def export(self, name="enrollments-export", **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_holds_the_instructors_enrollments(self):
+        lines = self.export().splitlines()
+
+        self.assertEqual(lines[0].split(",")[:3], ["id", "user_id", "user_email"])
+        self.assertEqual(len(lines), 2)
+        self.assertIn('"Course, with a comma"', lines[1])
+
+    def test_ndjson_progress(self):
+        rows = [
+            json.loads(line)
+            for line in self.export("progress-export", output="ndjson").splitlines()
+        ]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["enrollment_id"], self.enrollment.pk)
+        self.assertEqual(rows[0]["user_email"], "student@test.com")
+        self.assertEqual(rows[0]["lesson_order"], 1)
+
+    def test_filters_are_honored(self):
+        self.assertEqual(len(self.export(output="ndjson", is_completed=True)), 0)
+
+        response = self.client.get(reverse("enrollments-export"), {"from_date": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rows_are_read_in_chunks(self):
+        for i in range(4):
+            course = Course.objects.create(
+                title=f"Course {i}", description="Description", user=self.instructor
+            )
+            Enrollment.objects.create(user=self.student, course=course)
+
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(
+                reverse("enrollments-export"), {"output": "ndjson"}
+            )
+            chunks = list(response.streaming_content)
+
+        self.assertEqual([chunk.count(b"\n") for chunk in chunks], [2, 2, 1])
+
+    def test_students_cannot_export(self):
+        token = LearnifyRefreshToken.for_user(self.student).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        response = self.client.get(reverse("enrollments-export"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get(reverse("enrollments-export"), {"output": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_takes_the_same_filters(self):
+        out = StringIO()
+
+        call_command(
+            "export_enrollments",
+            "--output",
+            "ndjson",
+            "--course-id",
+            str(self.course.pk),
+            stdout=out,
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.enrollment.pk])
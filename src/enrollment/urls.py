@@ -1,21 +1,61 @@
 from django.urls import path
 
 from .views import (
+    AsyncEnrollmentAPIView,
+    AsyncEnrollmentProgressAPIView,
+    BulkEnrollmentAPIView,
+    BulkEnrollmentCompleteAPIView,
+    DashboardAPIView,
     EnrollmentAPIView,
     EnrollmentCompleteAPIView,
+    EnrollmentExportAPIView,
     EnrollmentProgressAPIView,
 )
 
 urlpatterns = [
     path("enrollments/", EnrollmentAPIView.as_view(), name="enrollments"),
+    path(
+        "enrollments/bulk/",
+        BulkEnrollmentAPIView.as_view(),
+        name="enrollments-bulk",
+    ),
+    path(
+        "enrollments/export/",
+        EnrollmentExportAPIView.as_view(),
+        {"export": "enrollments"},
+        name="enrollments-export",
+    ),
+    path(
+        "enrollments/progress/export/",
+        EnrollmentExportAPIView.as_view(),
+        {"export": "progress"},
+        name="progress-export",
+    ),
     path(
         "enrollments/<int:pk>/complete/",
         EnrollmentCompleteAPIView.as_view(),
         name="enrollment-complete",
     ),
+    path(
+        "enrollments/<int:pk>/complete/bulk/",
+        BulkEnrollmentCompleteAPIView.as_view(),
+        name="enrollment-complete-bulk",
+    ),
     path(
         "enrollments/<int:pk>/progress/",
         EnrollmentProgressAPIView.as_view(),
         name="enrollment-progress",
     ),
+    path("dashboard/", DashboardAPIView.as_view(), name="dashboard"),
+    # Async variants of the read endpoints, for deployments under ASGI.
+    path(
+        "async/enrollments/",
+        AsyncEnrollmentAPIView.as_view(),
+        name="async-enrollments",
+    ),
+    path(
+        "async/enrollments/<int:pk>/progress/",
+        AsyncEnrollmentProgressAPIView.as_view(),
+        name="async-enrollment-progress",
+    ),
 ]
@@ -1,12 +1,13 @@
-from enrollment.models import Enrollment
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
+from course.models import Course, Lesson
+from enrollment.models import Enrollment, LessonProgress
 
-def calculate_enrollment_progress(enrollment: Enrollment):
-    total_lessons = enrollment.course.lessons.count()
 
-    completed_lessons = enrollment.lesson_progress.filter(
-        completed_at__isnull=False
-    ).count()
+def calculate_enrollment_progress(enrollment: Enrollment):
+    total_lessons = enrollment.course.total_lessons
+    completed_lessons = enrollment.completed_lessons
 
     progress = (
         round((completed_lessons / total_lessons) * 100, 2)
@@ -19,3 +20,54 @@ def calculate_enrollment_progress(enrollment: Enrollment):
         "completed_lessons": completed_lessons,
         "progress": progress,
     }
+
+
+def actual_total_lessons():
+    lesson_counts = (
+        Lesson.objects.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(lesson_counts), 0)
+
+
+def actual_completed_lessons():
+    completed_counts = (
+        LessonProgress.objects.filter(
+            enrollment=OuterRef("pk"), completed_at__isnull=False
+        )
+        .order_by()
+        .values("enrollment")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(completed_counts), 0)
+
+
+def find_counter_drift():
+    """Return the courses and enrollments whose stored counters are stale."""
+    courses = (
+        Course.objects.annotate(actual=actual_total_lessons())
+        .exclude(total_lessons=F("actual"))
+        .values_list("id", "total_lessons", "actual")
+    )
+    enrollments = (
+        Enrollment.objects.annotate(actual=actual_completed_lessons())
+        .exclude(completed_lessons=F("actual"))
+        .values_list("id", "completed_lessons", "actual")
+    )
+    return list(courses), list(enrollments)
+
+
+def rebuild_progress_counters():
+    """Recompute every stored counter from the source rows.
+
+    Returns the number of course and enrollment rows written.
+    """
+    courses = Course.objects.update(total_lessons=actual_total_lessons())
+    enrollments = Enrollment.objects.update(
+        completed_lessons=actual_completed_lessons()
+    )
+    return courses, enrollments
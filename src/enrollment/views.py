@@ -1,7 +1,9 @@
-from .models import Enrollment
-from .tasks import after_enrollment_complete
+from .models import Enrollment, LearnerActivity
+from . import events, exports
 
 from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
@@ -16,19 +18,23 @@ from rest_framework import status
 
 from .filters import EnrollmentFilters
 from .serializers import (
+    BulkEnrollmentCompleteSerializer,
+    BulkEnrollmentSerializer,
+    DashboardEnrollmentSerializer,
     EnrollmentSerializer,
     EnrollmentListSerializer,
     EnrollmentCompleteSerializer,
 )
+from learnify.utils.async_views import AsyncAPIView
 from learnify.utils.pagination import CustomPagination
+from learnify.utils.permission import IsAdmin, IsInstructor
 from learnify.utils.response import api_response
-from .models import LessonProgress
 from .utils.progress import calculate_enrollment_progress
 
 
 class EnrollmentAPIView(ListCreateAPIView):
     permission_classes = [IsAuthenticated]
-    paginator = CustomPagination()
+    paginator = CustomPagination(keyset_ordering=("-enrolled_at", "-id"))
     filter_backends = [DjangoFilterBackend]
     filterset_class = EnrollmentFilters
 
@@ -61,7 +67,11 @@ class EnrollmentAPIView(ListCreateAPIView):
     def get(
         self: "EnrollmentAPIView", request: Request, *args: any, **kwargs: any
     ) -> Response:
-        enrollments = Enrollment.objects.filter(user=request.user)
+        enrollments = (
+            Enrollment.objects.filter(user=request.user)
+            .select_related("course")
+            .order_by("-enrolled_at", "-id")
+        )
         filterset = self.filterset_class(request.GET, queryset=enrollments)
         if not filterset.is_valid():
             return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -91,39 +101,79 @@ class EnrollmentCompleteAPIView(APIView):
         *args: any,
         **kwargs: any,
     ) -> Response:
-        try:
-            enrollment = Enrollment.objects.get(pk=pk, user=request.user)
-        except Enrollment.DoesNotExist:
-            raise NotFound("Enrollment not found.")
-
         serializer = EnrollmentCompleteSerializer(
-            data=request.data, context={"enrollment": enrollment}
+            data=request.data, context={"request": request, "enrollment_id": pk}
         )
-        serializer.is_valid(raise_exception=True)
-        lesson = serializer.validated_data["lesson"]
 
+        # One locked read of the enrollment and lesson state during validation,
+        # then one conditional counter update plus the progress insert.
         with transaction.atomic():
-            LessonProgress.objects.update_or_create(
-                enrollment=enrollment,
-                lesson=lesson,
-                defaults={"completed_at": timezone.now()},
-            )
+            serializer.is_valid(raise_exception=True)
+            was_completed = serializer.validated_data["enrollment"].is_completed
+            enrollment = serializer.save()
 
-            # Check if all lessons are completed
-            total_lessons = enrollment.course.lessons.count()
-            completed_lessons = enrollment.lesson_progress.filter(
-                completed_at__isnull=False
-            ).count()
-
-            if total_lessons == completed_lessons:
-                enrollment.mark_completed()
-                after_enrollment_complete.delay(
-                    enrollment.enrolled_at, enrollment.completed_at
-                )
+            if enrollment.is_completed and not was_completed:
+                events.course_completed(enrollment)
 
         return api_response(
             data=None,
-            message=f"Lesson '{lesson.title}' marked as completed.",
+            message=f"Lesson '{enrollment.lesson_title}' marked as completed.",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class BulkEnrollmentCompleteAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(request_body=BulkEnrollmentCompleteSerializer)
+    def patch(
+        self: "BulkEnrollmentCompleteAPIView",
+        request: Request,
+        pk: int,
+        *args: any,
+        **kwargs: any,
+    ) -> Response:
+        serializer = BulkEnrollmentCompleteSerializer(
+            data=request.data, context={"request": request, "enrollment_id": pk}
+        )
+
+        # Same shape as the single completion: one locked read of the
+        # enrollment, one read each for the lessons and their progress, then
+        # one counter update and one bulk insert for the whole batch.
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            was_completed = serializer.validated_data["enrollment"].is_completed
+            enrollment = serializer.save()
+
+            if enrollment.is_completed and not was_completed:
+                events.course_completed(enrollment)
+
+        results = serializer.get_results()
+        completed = sum(1 for result in results if result["status"] == "completed")
+        return api_response(
+            data=results,
+            message=f"{completed} of {len(results)} lessons marked as completed.",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class BulkEnrollmentAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    @swagger_auto_schema(request_body=BulkEnrollmentSerializer)
+    def post(
+        self: "BulkEnrollmentAPIView", request: Request, *args: any, **kwargs: any
+    ) -> Response:
+        serializer = BulkEnrollmentSerializer(data=request.data)
+
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            enrollments = serializer.save()
+
+        results = serializer.validated_data["results"]
+        return api_response(
+            data=results,
+            message=f"{len(enrollments)} of {len(results)} enrollments created.",
             status_code=status.HTTP_200_OK,
         )
 
@@ -141,7 +191,9 @@ class EnrollmentProgressAPIView(APIView):
         **kwargs: any,
     ) -> Response:
         try:
-            enrollment = Enrollment.objects.get(pk=pk, user=request.user)
+            enrollment = Enrollment.objects.select_related("course").get(
+                pk=pk, user=request.user
+            )
         except Enrollment.DoesNotExist:
             raise NotFound("Enrollment not found.")
 
@@ -152,3 +204,142 @@ class EnrollmentProgressAPIView(APIView):
             message="Enrollment progress retrieved successfully!",
             status_code=status.HTTP_200_OK,
         )
+
+
+class EnrollmentExportAPIView(APIView):
+    """Stream every enrollment, or its lesson progress, as CSV or NDJSON.
+
+    ``export`` comes from the URL: "enrollments" or "progress". Instructors
+    export their own courses and admins everything, narrowed by the
+    EnrollmentFilters parameters.
+    """
+
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "output",
+                openapi.IN_QUERY,
+                description="csv (default) or ndjson",
+                type=openapi.TYPE_STRING,
+            ),
+        ]
+    )
+    def get(
+        self: "EnrollmentExportAPIView",
+        request: Request,
+        export: str,
+        *args: any,
+        **kwargs: any,
+    ) -> Response:
+        output = request.query_params.get("output", "csv")
+        if output not in exports.FORMATS:
+            return api_response(
+                message="output must be one of: " + ", ".join(exports.FORMATS),
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        filterset = EnrollmentFilters(
+            request.GET, queryset=exports.enrollments_for(request.user)
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            exports.stream_export(export, output, filterset.qs),
+            content_type=exports.CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{export}.{output}"'
+        return response
+
+
+class DashboardAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema()
+    def get(
+        self: "DashboardAPIView", request: Request, *args: any, **kwargs: any
+    ) -> Response:
+        # Two queries whatever the number of enrollments: the enrollments with
+        # their course and next lesson, and the learner's activity summary.
+        enrollments = (
+            Enrollment.objects.filter(user=request.user)
+            .with_next_lesson()
+            .select_related("course")
+            .order_by(
+                F("last_activity_at").desc(nulls_last=True), "-enrolled_at", "-id"
+            )
+        )
+        activity = LearnerActivity.objects.filter(user=request.user).first()
+
+        return api_response(
+            data={
+                "enrollments": DashboardEnrollmentSerializer(
+                    enrollments, many=True
+                ).data,
+                "last_activity_at": activity.last_activity_at if activity else None,
+                "current_streak": (
+                    activity.streak_on(timezone.localdate()) if activity else 0
+                ),
+                "longest_streak": activity.longest_streak if activity else 0,
+            },
+            message="Dashboard retrieved successfully!",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class AsyncEnrollmentAPIView(AsyncAPIView):
+    """``GET enrollments/`` on the async ORM."""
+
+    paginator = CustomPagination(keyset_ordering=("-enrolled_at", "-id"))
+
+    async def get(
+        self: "AsyncEnrollmentAPIView", request: Request, *args: any, **kwargs: any
+    ) -> Response:
+        enrollments = (
+            Enrollment.objects.filter(user=request.user)
+            .select_related("course")
+            .order_by("-enrolled_at", "-id")
+        )
+        filterset = EnrollmentFilters(request.GET, queryset=enrollments)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        enrollments = filterset.qs
+        page = await self.paginator.apaginate_queryset(enrollments, request)
+
+        if page is not None:
+            serializer = EnrollmentListSerializer(page, many=True)
+            return self.paginator.get_paginated_response(serializer.data)
+
+        enrollments = [enrollment async for enrollment in enrollments]
+        serializer = EnrollmentListSerializer(enrollments, many=True)
+        return api_response(
+            data=serializer.data,
+            message="Enrollments retrieved successfully!",
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class AsyncEnrollmentProgressAPIView(AsyncAPIView):
+    """``GET enrollments/<pk>/progress/`` on the async ORM."""
+
+    async def get(
+        self: "AsyncEnrollmentProgressAPIView",
+        request: Request,
+        pk: int,
+        *args: any,
+        **kwargs: any,
+    ) -> Response:
+        try:
+            enrollment = await Enrollment.objects.select_related("course").aget(
+                pk=pk, user=request.user
+            )
+        except Enrollment.DoesNotExist:
+            raise NotFound("Enrollment not found.")
+
+        return api_response(
+            data=calculate_enrollment_progress(enrollment),
+            message="Enrollment progress retrieved successfully!",
+            status_code=status.HTTP_200_OK,
+        )
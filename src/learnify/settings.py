@@ -44,6 +44,8 @@ INSTALLED_APPS = [
     "user",
     "course",
     "enrollment",
+    "analytics",
+    "benchmark",
     "drf_yasg",
     "celery",
 ]
@@ -51,6 +53,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "user.User"
 
 MIDDLEWARE = [
+    "learnify.utils.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,16 +73,22 @@ SWAGGER_SETTINGS = {
 REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "learnify.utils.response.custom_exception_handler",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "learnify.utils.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "learnify.utils.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=2),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-    "ROTATE_REFRESH_TOKENS": False,
-    "BLACKLIST_AFTER_ROTATION": True,
+    # Every refresh returns a new refresh token and uses up the old one;
+    # revocation is user.revocation's, not simplejwt's blacklist app.
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "VERIFYING_KEY": None,
@@ -88,6 +97,17 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
 }
 
+# See learnify.utils.authentication.CachedJWTAuthentication. Trusting the
+# token claims skips the users table entirely, at the cost of role changes
+# only applying once the access token is refreshed.
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false") == "true"
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 30))
+# See user.revocation: how often each process picks up token families
+# revoked by others, and how many live revoked families its filter is sized
+# for before it is rebuilt.
+TOKEN_REVOCATION_SYNC_INTERVAL = int(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 5))
+TOKEN_REVOCATION_CAPACITY = int(os.getenv("TOKEN_REVOCATION_CAPACITY", 100000))
+
 ROOT_URLCONF = "learnify.urls"
 
 TEMPLATES = [
@@ -137,6 +157,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New passwords are hashed with PASSWORD_HASHER; logins rehash passwords
+# stored with any other listed hasher. argon2 needs argon2-cffi and bcrypt
+# needs bcrypt.
+PASSWORD_HASHER_CHOICES = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "bcrypt": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "pbkdf2_sha1": "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher
+    for name, hasher in PASSWORD_HASHER_CHOICES.items()
+    if name != PASSWORD_HASHER
+]
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -167,9 +204,111 @@ USE_TZ = True
 STATIC_URL = "static/"
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Local memory by default (and in tests); point CACHE_URL at the Redis
+# service from docker-compose in production, e.g. redis://redis:6379/1.
+
+CACHE_URL = os.getenv("CACHE_URL")
+
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+CATALOG_CACHE_ALIAS = "default"
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", 300))
+
+# Logins; see user.throttling and user.passwords. Failed attempts are
+# counted per email and per IP; at the limit, logins are refused with 429
+# until LOGIN_FAILURE_WINDOW seconds after the first failure.
+LOGIN_CACHE_ALIAS = "default"
+LOGIN_FAILURE_WINDOW = int(os.getenv("LOGIN_FAILURE_WINDOW", 900))
+LOGIN_FAILURES_PER_EMAIL = int(os.getenv("LOGIN_FAILURES_PER_EMAIL", 5))
+LOGIN_FAILURES_PER_IP = int(os.getenv("LOGIN_FAILURES_PER_IP", 50))
+# Threads hashing passwords, and how many more checks may wait for one.
+LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", os.cpu_count() or 1))
+LOGIN_HASH_QUEUE = int(os.getenv("LOGIN_HASH_QUEUE", 32))
+
+
+# Request instrumentation; see learnify.utils.instrumentation. Metrics are
+# served at /metrics, behind METRICS_TOKEN as a bearer token when it is set.
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "true") == "true"
+# Requests repeating one SQL statement this often (a likely N+1) or taking
+# longer than this are logged as warnings; the rest at INFO.
+INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+INSTRUMENTATION_SLOW_REQUEST_MS = 500
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # One JSON object per request; set INFO to log every request.
+        "learnify.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+        "learnify.events": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 CELERY_TIMEZONE = "Asia/Kathmandu"
+# Tasks run in the calling process, e.g. for tests without a broker.
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "false") == "true"
+CELERY_BEAT_SCHEDULE = {
+    # Repairs statistics drift and refreshes the median completion times.
+    "reconcile-course-statistics": {
+        "task": "analytics.tasks.reconcile_course_statistics",
+        "schedule": timedelta(
+            seconds=int(os.getenv("STATISTICS_RECONCILE_INTERVAL", 3600))
+        ),
+    },
+    # Picks up completion events whose on-commit task was lost.
+    "process-completion-events": {
+        "task": "enrollment.tasks.process_completion_events",
+        "schedule": timedelta(minutes=1),
+    },
+    "prune-revoked-tokens": {
+        "task": "user.tasks.prune_expired_revocations",
+        "schedule": timedelta(hours=1),
+    },
+}
+
+# Completion events (enrollment.events): seconds to wait so that events
+# arriving together are handled in one batch, the batch size, and how often
+# a failing batch is retried before its events are left for inspection.
+COMPLETION_EVENT_DELAY = int(os.getenv("COMPLETION_EVENT_DELAY", 2))
+COMPLETION_EVENT_BATCH_SIZE = 500
+COMPLETION_EVENT_MAX_ATTEMPTS = 5
+
+# Rows fetched per round trip by the enrollment exports (enrollment.exports).
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Course imports (course.imports): courses and lessons written per
+# transaction, and how many rejected records a job keeps for its report.
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+IMPORT_MAX_ERRORS = 1000
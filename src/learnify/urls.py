@@ -5,6 +5,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
 
+from learnify.utils.instrumentation import metrics_view
+
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -21,9 +23,11 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path("api/v1/", include("user.urls")),
     path("api/v1/", include("course.urls")),
     path("api/v1/", include("enrollment.urls")),
+    path("api/v1/", include("analytics.urls")),
     path(
         "docs/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -0,0 +1,137 @@
+"""Async views for the read endpoints.
+
+DRF views are synchronous, so under ASGI every request holds a thread from
+the sync-to-async pool for as long as it runs, database waits included.
+``AsyncAPIView`` is a plain async Django view that keeps what the API
+clients see from DRF: the ``Request`` object, JWT authentication, permission
+classes, the error format of ``custom_exception_handler`` and JSON bodies.
+
+Subclasses load rows through the async ORM (``aget``, ``acount``, ``async
+for``) and serialize them once they are in memory, so a serializer must
+never reach back into the database: that raises ``SynchronousOnlyOperation``.
+Permission classes are called as they are and must not query either; the
+ones in learnify.utils.permission only look at ``request.user``.
+"""
+
+import copy
+from typing import Any, List
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAuthenticated,
+    PermissionDenied,
+)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .authentication import CachedJWTAuthentication
+from .renderers import FastJSONRenderer
+from .response import custom_exception_handler
+
+
+class AsyncAPIView(View):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    # Copied for every request: the async pagination keeps per-page state
+    # across awaits, when other requests run on the same event loop.
+    paginator = None
+    renderer = FastJSONRenderer()
+    http_method_names = ["get", "head", "options"]
+
+    def setup(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        super().setup(request, *args, **kwargs)
+        if self.paginator is not None:
+            self.paginator = copy.copy(self.paginator)
+
+    async def dispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        request = Request(request)
+        self.request = request
+        try:
+            await self.perform_authentication(request)
+            self.check_permissions(request)
+
+            method = request.method.lower()
+            handler = None
+            if method in self.http_method_names:
+                handler = getattr(self, method, None)
+            if handler is None:
+                raise MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(request, response)
+
+    def get_authenticators(self) -> List[Any]:
+        return [auth() for auth in self.authentication_classes]
+
+    def get_permissions(self) -> List[Any]:
+        return [permission() for permission in self.permission_classes]
+
+    async def perform_authentication(self, request: Request) -> None:
+        for authenticator in self.get_authenticators():
+            result = await authenticator.aauthenticate(request)
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+
+        request._authenticator = None
+        request.user, request.auth = AnonymousUser(), None
+
+    def check_permissions(self, request: Request) -> None:
+        for permission in self.get_permissions():
+            if not permission.has_permission(request, self):
+                if request.successful_authenticator is None:
+                    raise NotAuthenticated()
+                raise PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, exc: Exception) -> Response:
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            # 401 with a challenge, as APIView answers.
+            authenticators = self.get_authenticators()
+            if authenticators:
+                exc.auth_header = authenticators[0].authenticate_header(self.request)
+            else:
+                exc.status_code = 403
+
+        context = {
+            "view": self,
+            "args": self.args,
+            "kwargs": self.kwargs,
+            "request": self.request,
+        }
+        response = custom_exception_handler(exc, context)
+        if response is None:
+            raise exc
+        response.exception = True
+        return response
+
+    def finalize_response(
+        self, request: Request, response: HttpResponse
+    ) -> HttpResponse:
+        """Render a DRF ``Response`` here rather than in a worker thread.
+
+        Django renders template responses through ``sync_to_async``; a plain
+        ``HttpResponse`` goes straight out.
+        """
+        if not isinstance(response, Response):
+            return response
+
+        content = self.renderer.render(
+            response.data,
+            renderer_context={"view": self, "request": request, "response": response},
+        )
+        rendered = HttpResponse(
+            content, status=response.status_code, content_type="application/json"
+        )
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                rendered[header] = value
+        return rendered
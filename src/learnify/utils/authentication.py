@@ -0,0 +1,167 @@
+import copy
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from user import revocation
+
+# Claims the login and refresh views sign into every token; see
+# user.tokens.LearnifyRefreshToken.
+ROLE_CLAIM = "role"
+SUPERUSER_CLAIM = "is_superuser"
+
+# user id -> (expires at, user). Per process: other workers only see a
+# change once their entry expires, so keep AUTH_USER_CACHE_TIMEOUT short.
+_users: Dict[Any, Tuple[float, Any]] = {}
+_MAX_CACHED_USERS = 10000
+
+
+def forget_user(user_id: Any) -> None:
+    _users.pop(user_id, None)
+
+
+def clear_user_cache() -> None:
+    _users.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication without a users-table read on every request.
+
+    With ``AUTH_TRUST_TOKEN_CLAIMS`` the user is rebuilt from the id, role
+    and superuser claims of the access token and never loaded; a role
+    change then takes effect when the token is next refreshed, which reads
+    the claims from the user row again. Otherwise
+    users are kept in a per-process cache for ``AUTH_USER_CACHE_TIMEOUT``
+    seconds (0 disables it), dropped early when saved or deleted.
+
+    Async views call ``aauthenticate``, which shares the cache and loads a
+    missing user through the async ORM.
+
+    Tokens of a revoked family (see user.revocation) are refused either way.
+    """
+
+    def get_user(self, validated_token: Token) -> Any:
+        if revocation.is_family_revoked(validated_token):
+            raise self.revoked()
+        user, user_id = self.cached_user(validated_token)
+        if user is not None:
+            return user
+        return self.remember(user_id, super().get_user(validated_token))
+
+    async def aauthenticate(self, request: Any) -> Optional[Tuple[Any, Token]]:
+        """``authenticate`` for async views; only a cache miss is awaited."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token: Token) -> Any:
+        if await revocation.ais_family_revoked(validated_token):
+            raise self.revoked()
+        user, user_id = self.cached_user(validated_token)
+        if user is not None:
+            return user
+        return self.remember(user_id, await self.aload_user(validated_token))
+
+    async def aload_user(self, validated_token: Token) -> Any:
+        """``JWTAuthentication.get_user``, reading the user with ``aget``."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = await self.user_model.objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
+
+    def revoked(self) -> AuthenticationFailed:
+        return AuthenticationFailed(_("Token is revoked"), code="token_revoked")
+
+    def cached_user(self, validated_token: Token) -> Tuple[Any, Any]:
+        """The user if the claims or the cache provide it, and its cache key.
+
+        The key is None when the loaded user should not be cached.
+        """
+        if settings.AUTH_TRUST_TOKEN_CLAIMS:
+            user = self.user_from_claims(validated_token)
+            if user is not None:
+                return user, None
+
+        if not settings.AUTH_USER_CACHE_TIMEOUT:
+            return None, None
+
+        try:
+            user_id = self.user_id(validated_token)
+        except KeyError:
+            return None, None
+        cached = _users.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            # A copy, so a view that changes request.user cannot leak the
+            # change into other requests.
+            return copy.copy(cached[1]), user_id
+        return None, user_id
+
+    def remember(self, user_id: Any, user: Any) -> Any:
+        if user_id is None:
+            return user
+        if len(_users) >= _MAX_CACHED_USERS:
+            _users.clear()
+        expires = time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT
+        _users[user_id] = (expires, user)
+        return copy.copy(user)
+
+    def user_id(self, validated_token: Token) -> Any:
+        # Claims are JSON, so the id arrives as a string.
+        field = self.user_model._meta.get_field(api_settings.USER_ID_FIELD)
+        return field.to_python(validated_token[api_settings.USER_ID_CLAIM])
+
+    def user_from_claims(self, validated_token: Token) -> Any:
+        """An unsaved user carrying only the claims, or None if any is missing."""
+        try:
+            user_id = self.user_id(validated_token)
+            role = validated_token[ROLE_CLAIM]
+            is_superuser = validated_token[SUPERUSER_CLAIM]
+        except KeyError:
+            return None
+
+        user = self.user_model(
+            **{api_settings.USER_ID_FIELD: user_id},
+            role=role,
+            is_superuser=is_superuser,
+            is_active=True,
+        )
+        user._state.adding = False
+        user._state.db = "default"
+        return user
@@ -0,0 +1,80 @@
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Savepoint statements only show up because benchmarks run inside a
+# transaction that is rolled back afterwards; they are not part of the
+# measured code path.
+_BOOKKEEPING_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(durations: List[float], queries: List[int]) -> Dict[str, Any]:
+    return {
+        "runs": len(durations),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 95) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3)
+        if durations
+        else 0.0,
+        "queries": max(queries) if queries else 0,
+    }
+
+
+def measure(func: Callable[[int], Any], iterations: int) -> Dict[str, Any]:
+    """Call ``func(i)`` ``iterations`` times and summarize latency and queries."""
+    durations = []
+    queries = []
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            func(i)
+            durations.append(time.perf_counter() - start)
+        queries.append(
+            sum(
+                1
+                for query in context.captured_queries
+                if not query["sql"].startswith(_BOOKKEEPING_PREFIXES)
+            )
+        )
+    return summarize(durations, queries)
+
+
+def measure_allocations(func: Callable[[int], Any], iterations: int) -> float:
+    """Median peak of Python allocations per ``func(i)`` call, in KiB.
+
+    Kept apart from ``measure`` because tracing slows every allocation down.
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(iterations):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            func(i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return round(statistics.median(peaks) / 1024, 1) if peaks else 0.0
+
+
+def format_summary(label: str, summary: Dict[str, Any]) -> str:
+    return (
+        f"{label}: runs={summary['runs']} p50={summary['p50_ms']}ms "
+        f"p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms "
+        f"mean={summary['mean_ms']}ms queries={summary['queries']}"
+        + (f" alloc={summary['alloc_kib']}KiB" if "alloc_kib" in summary else "")
+    )
@@ -0,0 +1,84 @@
+"""Conditional GET: ``ETag`` and ``Last-Modified`` from a few aggregates.
+
+A view computes the validators of a response from what it would read, before
+loading or serializing anything: row counts and the newest ``updated_at`` of
+the querysets behind it. An insert or a delete changes a count, an update
+moves a timestamp, so the ETag (a hash of those values, the requested URL and
+whatever else the caller passes in ``scope``) changes with the body.
+
+``Last-Modified`` is only the newest timestamp and cannot see deletions or
+rows leaving a filter; it is there for clients that do not keep ETags.
+As RFC 9110 asks, ``If-Modified-Since`` is ignored when ``If-None-Match`` is
+sent.
+"""
+
+import datetime
+import hashlib
+from typing import Any, Mapping, Optional, Tuple
+
+from django.utils.http import (
+    http_date,
+    parse_etags,
+    parse_http_date_safe,
+    quote_etag,
+)
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+def validators(
+    request: Request, aggregates: Mapping[str, Any], scope: str = ""
+) -> Tuple[str, Optional[datetime.datetime]]:
+    """Return the strong ETag and the ``Last-Modified`` of a response."""
+    parts = [request.build_absolute_uri(), scope]
+    parts.extend(
+        f"{name}={_text(value)}" for name, value in sorted(aggregates.items())
+    )
+    etag = quote_etag(hashlib.sha1("|".join(parts).encode()).hexdigest())
+
+    timestamps = [
+        value for value in aggregates.values() if isinstance(value, datetime.datetime)
+    ]
+    return etag, max(timestamps) if timestamps else None
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime.datetime]
+) -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        # Weak comparison, as If-None-Match requires: W/"x" matches "x".
+        etags = parse_etags(if_none_match)
+        return "*" in etags or any(tag.removeprefix("W/") == etag for tag in etags)
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    since = parse_http_date_safe(if_modified_since)
+    # HTTP dates have whole seconds.
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime.datetime]
+) -> Response:
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified(etag: str, last_modified: Optional[datetime.datetime]) -> Response:
+    return set_validators(
+        Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified
+    )
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
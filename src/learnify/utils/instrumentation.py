@@ -0,0 +1,327 @@
+"""Per-request query, timing and size instrumentation.
+
+``InstrumentationMiddleware`` wraps every request in a ``RequestMetrics``
+that counts the queries it runs, spots repeated SQL templates, the usual
+N+1 signature, and picks up serializer time from
+``InstrumentedSerializerMixin``. The totals are sent back in a
+``Server-Timing`` header, logged as one JSON line on the
+``learnify.requests`` logger and added to per-URL-name counters that
+``metrics_view`` serves in the Prometheus text format.
+
+Queries are picked up by an execute wrapper installed on every connection,
+which finds the request through a context variable. The async ORM runs its
+queries in worker threads with their own connections, and the variable is
+copied into those threads, so async views are counted like sync ones.
+
+Counters live in the process, so each worker exposes its own; Prometheus
+sums them across scrape targets.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger("learnify.requests")
+
+_current: contextvars.ContextVar = contextvars.ContextVar(
+    "request_metrics", default=None
+)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """What one request cost. Also the execute wrapper that collects it."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.templates: Counter = Counter()
+        self.in_serializer = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            # Parameters are passed separately, so ``sql`` is the template.
+            self.templates[sql] += 1
+
+    @property
+    def duplicate_queries(self) -> int:
+        return sum(count - 1 for count in self.templates.values() if count > 1)
+
+    def most_repeated(self) -> Optional[tuple]:
+        if not self.templates:
+            return None
+        sql, count = self.templates.most_common(1)[0]
+        return (sql, count) if count > 1 else None
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class InstrumentedSerializerMixin:
+    """Adds the time spent in ``to_representation`` to the request metrics.
+
+    Only the outermost call is timed, so nested and per-row serializers are
+    not counted twice. Queries a serializer triggers count towards both its
+    own time and the database time.
+    """
+
+    def to_representation(self, instance: Any) -> Any:
+        metrics = _current.get()
+        if metrics is None or metrics.in_serializer:
+            return super().to_representation(instance)
+
+        metrics.in_serializer = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+            metrics.in_serializer = False
+
+
+class MetricsRegistry:
+    """Per-process counters by URL name, rendered for Prometheus."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Counter = Counter()
+            self.totals: Dict[str, Counter] = defaultdict(Counter)
+            self.buckets: Dict[str, list] = {}
+
+    def observe(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        duration: float,
+        metrics: RequestMetrics,
+        size: Optional[int],
+    ) -> None:
+        with self._lock:
+            self.requests[(route, method, status)] += 1
+            totals = self.totals[route]
+            totals["duration_seconds"] += duration
+            totals["count"] += 1
+            totals["db_queries"] += metrics.queries
+            totals["db_duration_seconds"] += metrics.db_time
+            totals["duplicate_queries"] += metrics.duplicate_queries
+            totals["serializer_duration_seconds"] += metrics.serializer_time
+            totals["response_bytes"] += size or 0
+
+            buckets = self.buckets.setdefault(route, [0] * len(DURATION_BUCKETS))
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[index] += 1
+
+    def render(self, extra: Optional[Dict[str, float]] = None) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("learnify_requests_total", "counter", "Requests by URL name.")
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'learnify_requests_total{{route="{route}",method="{method}",'
+                    f'status="{status}"}} {count}'
+                )
+
+            family(
+                "learnify_request_duration_seconds",
+                "histogram",
+                "Time spent handling requests.",
+            )
+            for route in sorted(self.totals):
+                for bound, count in zip(DURATION_BUCKETS, self.buckets[route]):
+                    lines.append(
+                        f'learnify_request_duration_seconds_bucket{{route="{route}",'
+                        f'le="{bound}"}} {count}'
+                    )
+                totals = self.totals[route]
+                lines.append(
+                    f'learnify_request_duration_seconds_bucket{{route="{route}",'
+                    f'le="+Inf"}} {totals["count"]}'
+                )
+                lines.append(
+                    f'learnify_request_duration_seconds_sum{{route="{route}"}} '
+                    f'{totals["duration_seconds"]:.6f}'
+                )
+                lines.append(
+                    f'learnify_request_duration_seconds_count{{route="{route}"}} '
+                    f'{totals["count"]}'
+                )
+
+            for key, help_text in (
+                ("db_queries", "Database queries run."),
+                ("db_duration_seconds", "Time spent in the database."),
+                ("duplicate_queries", "Queries repeating an earlier SQL template."),
+                ("serializer_duration_seconds", "Time spent serializing."),
+                ("response_bytes", "Response body bytes."),
+            ):
+                name = f"learnify_{key}_total"
+                family(name, "counter", help_text)
+                for route in sorted(self.totals):
+                    value = self.totals[route][key]
+                    lines.append(f'{name}{{route="{route}"}} {_number(value)}')
+
+        for name, value in sorted((extra or {}).items()):
+            family(name, "counter", name.replace("_", " ").capitalize() + ".")
+            lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return str(value) if isinstance(value, int) else f"{value:.6f}"
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported missed the
+        # connection_created signal.
+        install_query_recorder(connection)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+
+        install_query_recorder(connection)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.INSTRUMENTATION_ENABLED:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def finish(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        metrics: RequestMetrics,
+        start: float,
+    ) -> HttpResponse:
+        duration = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        route = (match.url_name if match else None) or "unmatched"
+        size = None if response.streaming else len(response.content)
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f"serializer;dur={metrics.serializer_time * 1000:.1f}",
+                f"app;dur={duration * 1000:.1f}",
+            ]
+        )
+        registry.observe(
+            route, request.method, response.status_code, duration, metrics, size
+        )
+        self.log(request, response, route, duration, metrics, size)
+        return response
+
+    def log(self, request, response, route, duration, metrics, size) -> None:
+        record = {
+            "route": route,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "db_queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "duplicate_queries": metrics.duplicate_queries,
+            "serializer_ms": round(metrics.serializer_time * 1000, 2),
+            "response_bytes": size,
+        }
+        level = logging.INFO
+        if duration * 1000 >= settings.INSTRUMENTATION_SLOW_REQUEST_MS:
+            level = logging.WARNING
+        repeated = metrics.most_repeated()
+        if repeated and repeated[1] >= settings.INSTRUMENTATION_N_PLUS_ONE_THRESHOLD:
+            # The same statement once per row is the N+1 signature.
+            record["repeated_sql"] = repeated[0]
+            record["repeated_count"] = repeated[1]
+            level = logging.WARNING
+        logger.log(level, json.dumps(record))
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Prometheus scrape endpoint; needs METRICS_TOKEN as a bearer token if set."""
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+
+    # Imported here so learnify.utils does not depend on the apps at import.
+    from course import cache as catalog_cache
+
+    body = registry.render(
+        {
+            "learnify_catalog_cache_hits_total": catalog_cache.stats["hits"],
+            "learnify_catalog_cache_misses_total": catalog_cache.stats["misses"],
+        }
+    )
+    return HttpResponse(body, content_type="text/plain; version=0.0.4")
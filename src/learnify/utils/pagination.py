@@ -1,22 +1,200 @@
-from typing import Any
+import base64
+import json
+from typing import Any, Optional, Sequence
 
+from django.core.paginator import InvalidPage
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
+    """Page-number pagination with an opt-in keyset mode.
+
+    Views that pass ``keyset_ordering`` (unique once the trailing ``id`` is
+    included) can be paged with ``?cursor=``: an empty cursor returns the
+    first page and every response links to opaque cursors for its
+    neighbours. Keyset pages filter on the last row seen instead of running
+    ``COUNT(*)`` and an ``OFFSET`` scan, so ``count`` is null in that mode.
+    """
+
     page_size = 5
     page_size_query_param = "limit"
     max_page_size = 100
+    cursor_query_param = "cursor"
+
+    def __init__(self, keyset_ordering: Optional[Sequence[str]] = None) -> None:
+        self.keyset_ordering = tuple(keyset_ordering or ())
+        self.cursor_mode = False
+
+    def uses_cursor(self, request) -> bool:
+        return bool(
+            self.keyset_ordering and self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        """Page ``queryset``; ``count``, when the caller already has it, saves
+        the page-number mode its ``COUNT(*)``."""
+        self.cursor_mode = self.uses_cursor(request)
+        if self.cursor_mode:
+            queryset, position, reverse = self._keyset_query(queryset, request)
+            return self._keyset_page(list(queryset), position, reverse)
+
+        if count is None:
+            return super().paginate_queryset(queryset, request, view)
+        if not self._number_page(queryset, request, count):
+            return None
+        return list(self.page)
+
+    async def apaginate_queryset(self, queryset, request, view=None, count=None):
+        """``paginate_queryset`` for async views, through the async ORM."""
+        self.cursor_mode = self.uses_cursor(request)
+        if self.cursor_mode:
+            queryset, position, reverse = self._keyset_query(queryset, request)
+            rows = [row async for row in queryset]
+            return self._keyset_page(rows, position, reverse)
+
+        # Counted here so the paginator never counts synchronously.
+        if count is None and self.get_page_size(request):
+            count = await queryset.acount()
+        if not self._number_page(queryset, request, count):
+            return None
+        self.page.object_list = [row async for row in self.page.object_list]
+        return self.page.object_list
+
+    def _number_page(self, queryset, request, count: int) -> bool:
+        """Set ``self.page`` as PageNumberPagination does, with a known count."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return False
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = count
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return True
+
+    def _keyset_query(self, queryset, request):
+        """The query for one keyset page, fetching one extra row."""
+        self.request = request
+        self.keyset_page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(
+            queryset, request.query_params[self.cursor_query_param]
+        )
+
+        ordering = self.keyset_ordering
+        if reverse:
+            ordering = tuple(_flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_after(ordering, position))
+        return queryset[: self.keyset_page_size + 1], position, reverse
+
+    def _keyset_page(self, rows: list, position: Optional[list], reverse: bool):
+        page_size = self.keyset_page_size
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.first_position = self.position_of(rows[0]) if rows else position
+        self.last_position = self.position_of(rows[-1]) if rows else position
+        return rows
+
+    def position_of(self, obj: Any) -> list:
+        return [getattr(obj, field.lstrip("-")) for field in self.keyset_ordering]
+
+    def encode_cursor(self, position: list, reverse: bool = False) -> str:
+        payload = {"p": [_to_json(value) for value in position], "r": reverse}
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, queryset: QuerySet, cursor: str):
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fields = [
+                queryset.model._meta.get_field(field.lstrip("-"))
+                for field in self.keyset_ordering
+            ]
+            position = [
+                field.to_python(value) for field, value in zip(fields, payload["p"])
+            ]
+            if len(position) != len(fields):
+                raise ValueError(cursor)
+            return position, bool(payload.get("r"))
+        except Exception:
+            raise NotFound("Invalid cursor.")
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self._cursor_link(self.encode_cursor(self.last_position))
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._cursor_link(self.encode_cursor(self.first_position, True))
+
+    def _cursor_link(self, cursor: str) -> str:
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
 
     def get_paginated_response(self: Any, data: Any, extras: Any = None) -> Response:
         return Response(
             {
                 "status": "success",
                 "message": "Retrieved successfully",
-                "count": self.page.paginator.count,
+                "count": None if self.cursor_mode else self.page.paginator.count,
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "data": data,
             }
         )
+
+
+def _flip(field: str) -> str:
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def _after(ordering: Sequence[str], position: list) -> Q:
+    """Rows strictly after ``position`` in ``ordering``.
+
+    (a, b) > (x, y) expands to a > x OR (a = x AND b > y), with the
+    comparison flipped for descending fields.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, position):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
@@ -0,0 +1,55 @@
+from typing import Any, Mapping, Optional
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional: without it the stdlib encoder is used.
+    orjson = None
+
+# orjson writes these two as raw UTF-8; JSONRenderer escapes them so the
+# output stays a strict JavaScript subset.
+_LINE_SEPARATOR = "\u2028".encode()
+_PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` through orjson, with byte-for-byte the same output.
+
+    Dates and times are handed back to DRF's encoder, which writes UTC as
+    ``Z`` where orjson would write ``+00:00``. Anything orjson refuses
+    (integers over 64 bits, non-string keys) and indented output fall back
+    to the stdlib encoder, as does a missing orjson. Floats in exponent
+    notation are the one difference: orjson writes ``1e-5`` where Python
+    writes ``1e-05``; API payloads only carry rounded percentages.
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _LINE_SEPARATOR in content or _PARAGRAPH_SEPARATOR in content:
+            content = content.replace(_LINE_SEPARATOR, b"\\u2028").replace(
+                _PARAGRAPH_SEPARATOR, b"\\u2029"
+            )
+        return content
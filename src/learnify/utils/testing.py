@@ -0,0 +1,117 @@
+import re
+import traceback
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import QuerySet
+
+from . import instrumentation
+
+_SEQUENTIAL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)$", re.MULTILINE),
+}
+
+
+def sequential_scans(queryset: QuerySet) -> Tuple[List[str], str]:
+    """Return the tables ``queryset`` reads with a full scan, and its plan."""
+    pattern = _SEQUENTIAL_SCAN.get(connection.vendor)
+    if pattern is None:
+        return [], ""
+
+    if connection.vendor != "postgresql":
+        plan = queryset.explain()
+        return pattern.findall(plan), plan
+
+    # Test tables are tiny, and for tiny tables Postgres prefers a seq scan
+    # even when an index is available. With seq scans disabled the planner
+    # only picks one when there is no usable index.
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+        try:
+            plan = queryset.explain()
+        finally:
+            cursor.execute("RESET enable_seqscan")
+    return pattern.findall(plan), plan
+
+
+class QueryPlanAssertionsMixin:
+    def assertUsesIndexes(self, queryset: QuerySet) -> None:
+        tables, plan = sequential_scans(queryset)
+        if tables:
+            self.fail(
+                f"Sequential scan on {', '.join(tables)} for:\n"
+                f"{queryset.query}\n\nPlan:\n{plan}"
+            )
+
+
+class QueryRecorder:
+    """Execute wrapper counting each SQL template and where it was run from."""
+
+    def __init__(self) -> None:
+        self.templates: Counter = Counter()
+        self.origins: Dict[str, str] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.templates[sql] += 1
+        self.origins.setdefault(sql, _origin())
+        return execute(sql, params, many, context)
+
+
+def _origin() -> str:
+    """The innermost frame of project code, skipping the query wrappers."""
+    root = str(settings.BASE_DIR)
+    wrappers = (__file__, instrumentation.__file__)
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(root) and frame.filename not in wrappers:
+            return f"{frame.filename}:{frame.lineno} in {frame.name}: {frame.line}"
+    return "<outside the project>"
+
+
+class QueryCountAssertionsMixin:
+    """N+1 guard for list endpoints; mix into any ``APITestCase``."""
+
+    def assertQueryCountFlat(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        sizes: Sequence[int] = (2, 6),
+        page_size_param: str = "limit",
+    ) -> None:
+        """Fail if ``url`` runs more queries for a bigger page.
+
+        The endpoint is requested once per page size, so the test data must
+        hold at least ``max(sizes)`` rows. Every statement run more often
+        on the bigger page is reported with the code that ran it.
+        """
+        recorders = []
+        for size in sizes:
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                response = self.client.get(
+                    url, {**(params or {}), page_size_param: size}
+                )
+            self.assertEqual(response.status_code, 200, response.content)
+            rows = response.data["data"]
+            self.assertEqual(
+                len(rows), size, f"{url} needs at least {size} rows to compare."
+            )
+            recorders.append(recorder)
+
+        small, large = recorders[0], recorders[-1]
+        if sum(large.templates.values()) <= sum(small.templates.values()):
+            return
+
+        grown = [
+            f"{small.templates[sql]} -> {count} times:\n{sql}\n"
+            f"  from {large.origins[sql]}"
+            for sql, count in large.templates.items()
+            if count > small.templates[sql]
+        ]
+        self.fail(
+            f"{url} ran {sum(small.templates.values())} queries for "
+            f"{sizes[0]} rows but {sum(large.templates.values())} for "
+            f"{sizes[-1]} rows. Growing statements:\n\n" + "\n\n".join(grown)
+        )
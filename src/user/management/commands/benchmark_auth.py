@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from course.models import Course
+from learnify.utils.authentication import CachedJWTAuthentication, clear_user_cache
+from learnify.utils.benchmark import format_summary, measure
+from user import revocation
+from user.models import RevokedToken, User, UserRoles
+from user.tokens import LearnifyRefreshToken
+
+# How authenticate() learns whether the token's family is revoked.
+REVOCATION_MODES = {
+    "no revocation check": lambda token: False,
+    "revocation filter": revocation.is_family_revoked,
+    "revocation table read": lambda token: RevokedToken.objects.filter(
+        kind=RevokedToken.Kind.FAMILY, value=token[revocation.FAMILY_CLAIM]
+    ).exists(),
+}
+
+MODES = {
+    "uncached": {"AUTH_TRUST_TOKEN_CLAIMS": False, "AUTH_USER_CACHE_TIMEOUT": 0},
+    "user cache": {"AUTH_TRUST_TOKEN_CLAIMS": False, "AUTH_USER_CACHE_TIMEOUT": 30},
+    "token claims": {"AUTH_TRUST_TOKEN_CLAIMS": True, "AUTH_USER_CACHE_TIMEOUT": 0},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/sec of CourseAPIView.get with a real bearer token "
+        "for each authentication mode, and the time authenticate() takes with "
+        "and without the token revocation check. All data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            instructor = User.objects.create(
+                email="bench-instructor@learnify.local",
+                full_name="Benchmark Instructor",
+                role=UserRoles.INSTRUCTOR,
+            )
+            Course.objects.bulk_create(
+                Course(title=f"Course {i}", description="Benchmark", user=instructor)
+                for i in range(5)
+            )
+            token = LearnifyRefreshToken.for_user(instructor).access_token
+
+            # Instructors bypass the catalog cache, so every request reaches
+            # the database for its page.
+            client = APIClient(SERVER_NAME="localhost")
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            url = reverse("courses")
+
+            def request(_):
+                response = client.get(url)
+                assert response.status_code == 200, response.content
+
+            for label, overrides in MODES.items():
+                clear_user_cache()
+                with override_settings(**overrides):
+                    summary = measure(request, options["iterations"])
+                rps = round(1000 / summary["mean_ms"]) if summary["mean_ms"] else 0
+                self.stdout.write(f"{format_summary(label, summary)} rps={rps}")
+
+            self.measure_revocation(token, options["iterations"] * 20)
+            transaction.set_rollback(True)
+
+    def measure_revocation(self, token, iterations):
+        # Claims are trusted, so authenticate() reads no user and the
+        # revocation check is the only thing that varies.
+        request = Request(
+            RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        )
+        authentication = CachedJWTAuthentication()
+        revocation.revoke_family(revocation.new_family(), RevokedToken.Reason.LOGOUT)
+
+        for label, check in REVOCATION_MODES.items():
+            with override_settings(AUTH_TRUST_TOKEN_CLAIMS=True), mock.patch(
+                "user.revocation.is_family_revoked", check
+            ):
+                summary = measure(
+                    lambda _: authentication.authenticate(request), iterations
+                )
+            self.stdout.write(
+                f"{label}: authenticate() mean={summary['mean_ms'] * 1000:.1f}us "
+                f"p95={summary['p95_ms'] * 1000:.1f}us queries={summary['queries']}"
+            )
@@ -0,0 +1,111 @@
+import importlib.util
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from learnify.utils.benchmark import format_summary, measure
+from user.models import User, UserRoles
+
+EMAIL = "bench-login@learnify.local"
+PASSWORD = "benchmark-password"
+
+# hasher -> library it needs
+HASHERS = {
+    "pbkdf2": None,
+    "scrypt": None,
+    "argon2": "argon2",
+    "bcrypt": "bcrypt",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins per second of CPU through UserLoginView: valid "
+        "logins with each available password hasher, and a stream of wrong "
+        "passwords with and without the failed-login limit. All data is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+
+    def handle(self, *args, **options):
+        # Refused logins would each log a warning.
+        request_log = logging.getLogger("django.request")
+        level = request_log.level
+        request_log.setLevel(logging.ERROR)
+        try:
+            self.run_all(options["iterations"])
+        finally:
+            request_log.setLevel(level)
+
+    def run_all(self, iterations):
+        # A private cache, so the failure counts of this run never reach
+        # the shared one.
+        login_caches = {
+            **settings.CACHES,
+            "login-benchmark": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "login-benchmark",
+            },
+        }
+        with override_settings(
+            CACHES=login_caches, LOGIN_CACHE_ALIAS="login-benchmark"
+        ):
+            with transaction.atomic():
+                user = User.objects.create(
+                    email=EMAIL, full_name="Benchmark Learner", role=UserRoles.STUDENT
+                )
+                for name, library in HASHERS.items():
+                    if library and importlib.util.find_spec(library) is None:
+                        self.stdout.write(f"{name}: skipped, needs {library}")
+                        continue
+                    with self.hasher(name):
+                        user.set_password(PASSWORD)
+                        user.save(update_fields=["password"])
+                        self.run(f"login {name}", PASSWORD, 200, iterations)
+
+                user.set_password(PASSWORD)
+                user.save(update_fields=["password"])
+                with override_settings(LOGIN_FAILURES_PER_EMAIL=10**9):
+                    self.run("wrong password, unlimited", "wrong", 400, iterations)
+                self.run("wrong password, limited", "wrong", None, iterations)
+                transaction.set_rollback(True)
+
+    def hasher(self, name):
+        preferred = settings.PASSWORD_HASHER_CHOICES[name]
+        return override_settings(
+            PASSWORD_HASHERS=[preferred]
+            + [hasher for hasher in settings.PASSWORD_HASHERS if hasher != preferred]
+        )
+
+    def run(self, label, password, expected_status, iterations):
+        caches["login-benchmark"].clear()
+        # A documentation address, so no real client's IP count moves.
+        client = APIClient(SERVER_NAME="localhost", REMOTE_ADDR="192.0.2.1")
+        url = reverse("user-login")
+        statuses = set()
+
+        def login(_):
+            response = client.post(
+                url, {"email": EMAIL, "password": password}, format="json"
+            )
+            statuses.add(response.status_code)
+            if expected_status is not None:
+                assert response.status_code == expected_status, response.content
+
+        cpu = time.process_time()
+        summary = measure(login, iterations)
+        cpu = time.process_time() - cpu
+        per_core = round(iterations / cpu, 1) if cpu else 0.0
+        self.stdout.write(
+            f"{format_summary(label, summary)} logins/s/core={per_core} "
+            f"statuses={sorted(statuses)}"
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_user_users_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('token', 'Token'), ('family', 'Family')], max_length=10)),
+                ('value', models.CharField(max_length=64)),
+                ('reason', models.CharField(choices=[('rotated', 'Rotated'), ('reused', 'Reused after rotation'), ('logout', 'Logout')], max_length=10)),
+                ('revoked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'revoked_tokens',
+                'indexes': [models.Index(fields=['kind', 'revoked_at'], name='revoked_kind_revoked_idx'), models.Index(fields=['expires_at'], name='revoked_expires_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='revoked_tokens_kind_value_uniq')],
+            },
+        ),
+    ]
@@ -29,6 +29,51 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = "users"
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="users_created_idx"),
+        ]
 
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """A refresh token (by jti) or a whole token family that is revoked.
+
+    Rows are only needed until every token they cover has expired; see
+    user.revocation.
+    """
+
+    class Kind(models.TextChoices):
+        TOKEN = "token", "Token"
+        FAMILY = "family", "Family"
+
+    class Reason(models.TextChoices):
+        ROTATED = "rotated", "Rotated"
+        REUSED = "reused", "Reused after rotation"
+        LOGOUT = "logout", "Logout"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    value = models.CharField(max_length=64)
+    reason = models.CharField(max_length=10, choices=Reason.choices)
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "revoked_tokens"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "value"], name="revoked_tokens_kind_value_uniq"
+            ),
+        ]
+        indexes = [
+            # Revocation filters pull the families revoked since their last
+            # sync; pruning deletes by expiry.
+            models.Index(
+                fields=["kind", "revoked_at"], name="revoked_kind_revoked_idx"
+            ),
+            models.Index(fields=["expires_at"], name="revoked_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.value}"
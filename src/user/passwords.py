@@ -0,0 +1,73 @@
+"""Password checks on a bounded pool of hasher threads.
+
+Hashing a password costs a fixed slice of CPU (hundreds of milliseconds with
+PBKDF2) and releases the GIL while it runs. Logins hand that work to
+``LOGIN_HASH_WORKERS`` threads, one per core by default, so a burst of
+logins queues for the hasher instead of running in every request thread
+at once and starving the rest of the API. At most ``LOGIN_HASH_QUEUE``
+more checks wait for a thread; past that, logins fail fast with 503.
+
+A password stored with another hasher than the first of
+``PASSWORD_HASHERS``, or with an outdated work factor, is rehashed on the
+pool after a successful check and saved, as ``User.check_password`` would.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import User
+
+_lock = threading.Lock()
+_pool = {}
+
+
+class HasherBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many logins at once, try again shortly."
+    default_code = "hasher_busy"
+
+
+def _executor() -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    size = (settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_QUEUE)
+    with _lock:
+        if _pool.get("size") != size:
+            if "executor" in _pool:
+                _pool["executor"].shutdown(wait=False)
+            _pool.update(
+                size=size,
+                executor=ThreadPoolExecutor(
+                    settings.LOGIN_HASH_WORKERS, thread_name_prefix="password-hasher"
+                ),
+                slots=threading.BoundedSemaphore(sum(size)),
+            )
+        return _pool["executor"], _pool["slots"]
+
+
+def _verify(password: str, encoded: str) -> Tuple[bool, Optional[str]]:
+    """Return whether ``password`` matches, and its new hash if it needs one."""
+    is_correct, must_update = verify_password(password, encoded)
+    if is_correct and must_update:
+        return True, make_password(password)
+    return is_correct, None
+
+
+def check_password(user: User, password: str) -> bool:
+    """``user.check_password`` with the hashing done on the pool."""
+    executor, slots = _executor()
+    if not slots.acquire(blocking=False):
+        raise HasherBusy()
+    future = executor.submit(_verify, password, user.password)
+    future.add_done_callback(lambda _: slots.release())
+
+    is_correct, new_hash = future.result()
+    if new_hash is not None:
+        user.password = new_hash
+        user.save(update_fields=["password"])
+    return is_correct
+
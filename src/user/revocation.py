@@ -0,0 +1,262 @@
+"""Token families and their revocation.
+
+Every login starts a token family: a random ``fam`` claim carried by its
+refresh token, by every refresh token rotated from it and by all their
+access tokens. RevokedToken rows revoke either one refresh token (by its
+jti) or a whole family:
+
+* refreshing uses the presented refresh token up: its jti is revoked and a
+  new one is issued. Presenting a used refresh token again revokes its
+  family, since one of the two parties holding it is not the user;
+* logging out revokes the family.
+
+Refreshes read the table. Authenticated requests check their family
+against a per-process Bloom filter of revoked families instead, which
+answers "not revoked" for nearly every request without any I/O; only a
+filter hit is confirmed against the table, through a bounded cache of
+answers. Each process pulls the families revoked elsewhere every
+``TOKEN_REVOCATION_SYNC_INTERVAL`` seconds with one indexed query, so a
+revocation reaches every worker within that interval, and rebuilds its
+filter from the live rows every hour to shed the expired ones.
+"""
+
+import datetime
+import hashlib
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from .models import RevokedToken
+
+FAMILY_CLAIM = "fam"
+
+_REBUILD_INTERVAL = 3600
+# Rows can commit out of revoked_at order; each pull looks back this far.
+_SYNC_OVERLAP = datetime.timedelta(seconds=30)
+_FALSE_POSITIVE_RATE = 0.001
+_MAX_ANSWERS = 10000
+
+
+def new_family() -> str:
+    return uuid.uuid4().hex
+
+
+class BloomFilter:
+    """A set that may claim to hold keys it does not, but never misses one."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        if key in self:
+            return
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevokedFamilies:
+    """The per-process view of revoked families; see the module docstring."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._pulled_until: Optional[datetime.datetime] = None
+        # family -> revoked, for families the filter claims to hold.
+        self._answers: "OrderedDict[str, bool]" = OrderedDict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = None
+            self._answers.clear()
+
+    def is_fresh(self) -> bool:
+        return (
+            self._filter is not None
+            and time.monotonic() - self._synced_at
+            < settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        )
+
+    def __contains__(self, family: str) -> bool:
+        # A local reference: clear() may drop the filter at any time.
+        bloom = self._filter
+        if bloom is None or not self.is_fresh():
+            bloom = self.sync()
+        if family not in bloom:
+            return False
+
+        revoked = self._answers.get(family)
+        if revoked is None:
+            revoked = RevokedToken.objects.filter(
+                kind=RevokedToken.Kind.FAMILY,
+                value=family,
+                expires_at__gt=timezone.now(),
+            ).exists()
+            with self._lock:
+                if len(self._answers) >= _MAX_ANSWERS:
+                    self._answers.popitem(last=False)
+                self._answers[family] = revoked
+        return revoked
+
+    async def acontains(self, family: str) -> bool:
+        """``family in self`` for async code; only a sync or a hit awaits."""
+        bloom = self._filter
+        if bloom is not None and self.is_fresh() and family not in bloom:
+            return False
+        return await sync_to_async(self.__contains__)(family)
+
+    def add(self, family: str) -> None:
+        """Record a family this process has just revoked."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(family)
+            self._answers.pop(family, None)
+
+    def sync(self) -> BloomFilter:
+        """Bring the filter up to date unless another thread is; return it.
+
+        Only the first build is waited for. Once there is a filter, threads
+        that find it stale while another one pulls keep answering from it,
+        and one that got the lock after a pull finished does not pull again.
+        """
+        current = self._filter
+        if not self._lock.acquire(blocking=current is None):
+            return current
+        try:
+            if not self.is_fresh():
+                self._pull()
+            return self._filter
+        finally:
+            self._lock.release()
+
+    def _pull(self) -> None:
+        """Rebuild the filter or add the newly revoked families; hold the lock."""
+        now = timezone.now()
+        rebuild = (
+            self._filter is None
+            or time.monotonic() - self._built_at >= _REBUILD_INTERVAL
+            or self._filter.count >= settings.TOKEN_REVOCATION_CAPACITY
+        )
+        families = RevokedToken.objects.filter(kind=RevokedToken.Kind.FAMILY)
+        if rebuild:
+            # Filled before it replaces the current one, which the threads
+            # that do not wait for this pull keep reading.
+            bloom = BloomFilter(
+                max(settings.TOKEN_REVOCATION_CAPACITY, 1), _FALSE_POSITIVE_RATE
+            )
+            families = families.filter(expires_at__gt=now)
+        else:
+            bloom = self._filter
+            families = families.filter(
+                revoked_at__gte=self._pulled_until - _SYNC_OVERLAP
+            )
+
+        for family in families.values_list("value", flat=True).iterator():
+            bloom.add(family)
+            self._answers.pop(family, None)
+        if rebuild:
+            self._answers.clear()
+            self._built_at = time.monotonic()
+            self._filter = bloom
+        self._pulled_until = now
+        self._synced_at = time.monotonic()
+
+
+revoked_families = RevokedFamilies()
+
+
+def _expiry(token: Token) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(token["exp"], tz=datetime.timezone.utc)
+
+
+def revoke_family(family: str, reason: str) -> None:
+    # No token of the family outlives a refresh token issued just now.
+    expires_at = timezone.now() + api_settings.REFRESH_TOKEN_LIFETIME
+    RevokedToken.objects.bulk_create(
+        [
+            RevokedToken(
+                kind=RevokedToken.Kind.FAMILY,
+                value=family,
+                reason=reason,
+                expires_at=expires_at,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    revoked_families.add(family)
+
+
+def is_family_revoked(token: Token) -> bool:
+    family = token.get(FAMILY_CLAIM)
+    return family is not None and family in revoked_families
+
+
+async def ais_family_revoked(token: Token) -> bool:
+    family = token.get(FAMILY_CLAIM)
+    return family is not None and await revoked_families.acontains(family)
+
+
+def use_refresh_token(refresh: Token) -> None:
+    """Revoke ``refresh`` before it is rotated, once and only once.
+
+    A second use revokes the whole family and raises ``TokenError``, as
+    does any use of a token whose family is revoked.
+    """
+    family = refresh.get(FAMILY_CLAIM)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                kind=RevokedToken.Kind.TOKEN,
+                value=refresh[api_settings.JTI_CLAIM],
+                reason=RevokedToken.Reason.ROTATED,
+                expires_at=_expiry(refresh),
+            )
+    except IntegrityError:
+        if family is not None:
+            revoke_family(family, RevokedToken.Reason.REUSED)
+        raise TokenError("Token has already been used")
+
+    # Read from the table: a family revoked by another process in the last
+    # few seconds must not be able to rotate.
+    if (
+        family is not None
+        and RevokedToken.objects.filter(
+            kind=RevokedToken.Kind.FAMILY, value=family
+        ).exists()
+    ):
+        raise TokenError("Token is revoked")
+
+
+def prune_revoked_tokens() -> int:
+    """Delete the rows every covered token has outlived; return how many."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -3,6 +3,13 @@ from typing import Any
 from rest_framework import serializers
 
 from .models import User
+from .passwords import check_password
+from .throttling import (
+    check_login_allowed,
+    clear_login_failures,
+    record_login_failure,
+)
+from learnify.utils.instrumentation import InstrumentedSerializerMixin
 
 
 class UserRegisterSerializer(serializers.ModelSerializer):
@@ -34,18 +41,26 @@ class UserLoginSerializer(serializers.Serializer):
         if not email or not password:
             raise serializers.ValidationError("Email and password are required.")
 
+        # Refused before the query and the hash, which is what a password
+        # guessing run would otherwise cost us.
+        request = self.context["request"]
+        check_login_allowed(request, email)
+
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
+            record_login_failure(request, email)
             raise serializers.ValidationError("User with this email does not exist.")
 
-        if not user.check_password(password):
+        if not check_password(user, password):
+            record_login_failure(request, email)
             raise serializers.ValidationError("Incorrect password.")
 
+        clear_login_failures(email)
         return {"user": user}
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .revocation import prune_revoked_tokens
+
+
+@shared_task(ignore_result=True)
+def prune_expired_revocations():
+    """Scheduled by CELERY_BEAT_SCHEDULE; drops rows no live token needs."""
+    return prune_revoked_tokens()
@@ -1,8 +1,27 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from .models import User
+from course.models import Course
+from learnify.utils.authentication import clear_user_cache
+from learnify.utils.testing import QueryCountAssertionsMixin
+from . import passwords, revocation
+from .models import RevokedToken, User, UserRoles
+from .tokens import LearnifyRefreshToken
 
 
 class TestUserRegistration(APITestCase):
@@ -25,3 +44,366 @@ class TestUserRegistration(APITestCase):
         user = User.objects.get(email=payload["email"])
         assert user.full_name == payload["full_name"]
         assert user.check_password(payload["password"])
+
+
+class TestCachedAuthentication(APITestCase):
+
+    def setUp(self):
+        clear_user_cache()
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            full_name="Test Instructor",
+            password="instructor123",
+            role="instructor",
+        )
+        token = LearnifyRefreshToken.for_user(self.instructor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("courses")
+
+    def _users_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query for query in context.captured_queries if '"users"' in query["sql"]
+        ]
+
+    def test_access_token_carries_role_claims(self):
+        token = LearnifyRefreshToken.for_user(self.instructor).access_token
+
+        self.assertEqual(token["role"], "instructor")
+        self.assertFalse(token["is_superuser"])
+
+    def test_user_is_loaded_once_per_timeout(self):
+        self.assertEqual(len(self._users_queries()), 1)
+        self.assertEqual(self._users_queries(), [])
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self._users_queries()
+        self.instructor.role = "student"
+        self.instructor.save()
+
+        self.assertEqual(len(self._users_queries()), 1)
+
+    def test_async_views_share_the_cache(self):
+        self._users_queries()
+        token = LearnifyRefreshToken.for_user(self.instructor).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+
+        with CaptureQueriesContext(connection) as context:
+            response = async_to_sync(self.async_client.get)(
+                reverse("async_courses"), headers=headers
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            [query for query in context.captured_queries if '"users"' in query["sql"]]
+        )
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        self.assertEqual(len(self._users_queries()), 1)
+        self.assertEqual(len(self._users_queries()), 1)
+
+    @override_settings(AUTH_TRUST_TOKEN_CLAIMS=True)
+    def test_trusted_claims_skip_the_users_table(self):
+        self.assertEqual(self._users_queries(), [])
+
+        # Instructor-only writes are authorized from the claims as well.
+        response = self.client.post(
+            self.url,
+            {"title": "Course", "description": "Description"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Course.objects.get().user_id, self.instructor.id)
+
+
+class TestLogin(APITestCase):
+
+    def setUp(self):
+        caches[settings.LOGIN_CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(
+            email="learner@test.com",
+            full_name="Test Learner",
+            password="learner123",
+        )
+        self.url = reverse("user-login")
+
+    def login(self, password, email="learner@test.com", ip="198.51.100.1"):
+        return self.client.post(
+            self.url,
+            {"email": email, "password": password},
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def test_valid_credentials_return_tokens(self):
+        response = self.login("learner123")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data["data"])
+
+    @override_settings(LOGIN_FAILURES_PER_EMAIL=3)
+    def test_failures_lock_the_email_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login("wrong").status_code, 400)
+
+        with mock.patch("user.passwords.verify_password") as verify:
+            with self.assertNumQueries(0):
+                response = self.login("learner123", ip="198.51.100.2")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.data["status"], 429)
+        self.assertIn("Retry-After", response)
+        verify.assert_not_called()
+
+    @override_settings(LOGIN_FAILURES_PER_EMAIL=3)
+    def test_success_clears_the_email_failures(self):
+        for _ in range(2):
+            self.login("wrong")
+        self.assertEqual(self.login("learner123").status_code, 200)
+
+        for _ in range(2):
+            self.login("wrong")
+        self.assertEqual(self.login("learner123").status_code, 200)
+
+    @override_settings(LOGIN_FAILURES_PER_IP=2)
+    def test_failures_lock_the_ip(self):
+        self.login("wrong", email="nobody@test.com")
+        self.login("wrong", email="someone@test.com")
+
+        self.assertEqual(self.login("learner123").status_code, 429)
+        self.assertEqual(self.login("learner123", ip="198.51.100.2").status_code, 200)
+
+    def test_outdated_hash_is_upgraded(self):
+        self.user.password = make_password("learner123", hasher="pbkdf2_sha1")
+        self.user.save()
+
+        self.assertEqual(self.login("learner123").status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+
+    @override_settings(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=0)
+    def test_busy_hasher_fails_fast(self):
+        _, slots = passwords._executor()
+        slots.acquire()
+        try:
+            response = self.login("learner123")
+        finally:
+            slots.release()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class TestTokenRevocation(APITestCase):
+
+    def setUp(self):
+        clear_user_cache()
+        revocation.revoked_families.clear()
+        self.user = User.objects.create_user(
+            email="learner@test.com",
+            full_name="Test Learner",
+            password="learner123",
+        )
+        self.refresh = LearnifyRefreshToken.for_user(self.user)
+
+    def refresh_with(self, token):
+        return self.client.post(
+            reverse("refresh-token"), {"refresh_token": str(token)}, format="json"
+        )
+
+    def get_courses(self, token, name="courses"):
+        return self.client.get(reverse(name), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_refresh_rotates_within_the_family(self):
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rotated = LearnifyRefreshToken(response.data["data"]["refresh"])
+        self.assertNotEqual(rotated["jti"], self.refresh["jti"])
+        self.assertEqual(rotated["fam"], self.refresh["fam"])
+        self.assertEqual(self.refresh_with(rotated).status_code, 200)
+
+    def hold_pull(self):
+        """Patch the filter's table read to block until the returned event."""
+        families = revocation.revoked_families
+        pulling, release = threading.Event(), threading.Event()
+
+        def pull():
+            pulling.set()
+            release.wait(5)
+            families._filter = families._filter or revocation.BloomFilter(100, 0.01)
+            families._synced_at = time.monotonic()
+
+        return mock.patch.object(families, "_pull", side_effect=pull), pulling, release
+
+    def test_stale_filter_is_pulled_by_one_thread(self):
+        families = revocation.revoked_families
+        families.sync()
+        families._synced_at -= settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        patch, pulling, release = self.hold_pull()
+
+        with patch as pulls:
+            first = threading.Thread(target=families.__contains__, args=("a",))
+            first.start()
+            self.assertTrue(pulling.wait(5))
+            # Meanwhile other lookups answer from the filter they have.
+            with self.assertNumQueries(0):
+                self.assertFalse("b" in families)
+            release.set()
+            first.join(5)
+            self.assertFalse("c" in families)
+
+        self.assertEqual(pulls.call_count, 1)
+
+    def test_first_build_is_waited_for_once(self):
+        families = revocation.revoked_families
+        patch, pulling, release = self.hold_pull()
+
+        with patch as pulls:
+            threads = [
+                threading.Thread(target=families.__contains__, args=(family,))
+                for family in ("a", "b")
+            ]
+            threads[0].start()
+            self.assertTrue(pulling.wait(5))
+            # The second lookup queues on the lock, then finds the filter fresh.
+            threads[1].start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(pulls.call_count, 1)
+
+    def test_refresh_signs_the_current_role(self):
+        User.objects.filter(pk=self.user.pk).update(
+            role=UserRoles.INSTRUCTOR, is_superuser=True
+        )
+
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data["data"]["access"])
+        rotated = LearnifyRefreshToken(response.data["data"]["refresh"])
+        for token in (access, rotated):
+            self.assertEqual(token["role"], UserRoles.INSTRUCTOR)
+            self.assertIs(token["is_superuser"], True)
+
+    def test_refresh_is_refused_for_inactive_or_deleted_users(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("inactive", response.data["message"])
+
+        # The refusal does not use up the token.
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 200)
+
+        refresh = LearnifyRefreshToken.for_user(self.user)
+        self.user.delete()
+        self.assertEqual(self.refresh_with(refresh).status_code, 400)
+
+    def test_reused_refresh_token_revokes_its_family(self):
+        rotated = self.refresh_with(self.refresh).data["data"]["refresh"]
+
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.refresh_with(rotated).status_code, 400)
+        self.assertEqual(
+            self.get_courses(self.refresh.access_token).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.assertTrue(
+            RevokedToken.objects.filter(
+                kind=RevokedToken.Kind.FAMILY,
+                value=self.refresh["fam"],
+                reason=RevokedToken.Reason.REUSED,
+            ).exists()
+        )
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        access = self.refresh.access_token
+        other_session = LearnifyRefreshToken.for_user(self.user)
+        self.assertEqual(self.get_courses(access).status_code, 200)
+
+        response = self.client.post(
+            reverse("user-logout"), {"refresh_token": str(self.refresh)}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_courses(access).status_code, 401)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 400)
+        self.assertEqual(self.get_courses(other_session.access_token).status_code, 200)
+
+    def test_async_views_refuse_revoked_tokens(self):
+        revocation.revoke_family(self.refresh["fam"], RevokedToken.Reason.LOGOUT)
+        headers = {"Authorization": f"Bearer {self.refresh.access_token}"}
+
+        response = async_to_sync(self.async_client.get)(
+            reverse("async_courses"), headers=headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_live_family_is_checked_without_a_query(self):
+        revocation.revoke_family(revocation.new_family(), RevokedToken.Reason.LOGOUT)
+        self.get_courses(self.refresh.access_token)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.get_courses(self.refresh.access_token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if '"revoked_tokens"' in query["sql"]
+            ]
+        )
+
+    def test_families_revoked_elsewhere_are_pulled(self):
+        self.get_courses(self.refresh.access_token)
+        # As another worker would: a row, but nothing in this process.
+        RevokedToken.objects.create(
+            kind=RevokedToken.Kind.FAMILY,
+            value=self.refresh["fam"],
+            reason=RevokedToken.Reason.LOGOUT,
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+        with override_settings(TOKEN_REVOCATION_SYNC_INTERVAL=0):
+            response = self.get_courses(self.refresh.access_token)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bloom_filter_holds_every_key_added(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        keys = [revocation.new_family() for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+        misses = sum(revocation.new_family() in bloom for _ in range(1000))
+        self.assertLess(misses, 50)
+
+
+class TestUserListQueryCount(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            email="admin@test.com", full_name="Admin", password="admin123"
+        )
+        for i in range(6):
+            User.objects.create_user(
+                email=f"student{i}@test.com",
+                full_name=f"Student {i}",
+                password="student123",
+            )
+        self.client.force_authenticate(user=admin)
+
+    def test_user_list(self):
+        self.assertQueryCountFlat(reverse("user-list"))
@@ -0,0 +1,60 @@
+"""Failed-login limits, checked before any password is hashed.
+
+Failures are counted per email and per client IP in fixed windows of
+``LOGIN_FAILURE_WINDOW`` seconds, in the cache named by
+``LOGIN_CACHE_ALIAS``: process memory by default, Redis when ``CACHE_URL``
+is set, which makes the limits shared by every worker. Once either count
+reaches its limit, logins for that email or from that IP are refused with
+429 until the window ends, without a query or a hash. A successful login
+clears the email's count.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+
+def _cache():
+    return caches[settings.LOGIN_CACHE_ALIAS]
+
+
+def _email_key(email: str) -> str:
+    digest = hashlib.sha1(email.strip().lower().encode()).hexdigest()
+    return f"login:failures:email:{digest}"
+
+
+def _limits(request: Request, email: str) -> dict:
+    return {
+        _email_key(email): settings.LOGIN_FAILURES_PER_EMAIL,
+        f"login:failures:ip:{BaseThrottle().get_ident(request)}": (
+            settings.LOGIN_FAILURES_PER_IP
+        ),
+    }
+
+
+def check_login_allowed(request: Request, email: str) -> None:
+    """Raise ``Throttled`` if ``email`` or the client failed too often."""
+    limits = _limits(request, email)
+    counts = _cache().get_many(limits)
+    if any(counts.get(key, 0) >= limit for key, limit in limits.items()):
+        raise Throttled(wait=settings.LOGIN_FAILURE_WINDOW)
+
+
+def record_login_failure(request: Request, email: str) -> None:
+    cache = _cache()
+    for key in _limits(request, email):
+        # The window starts with the first failure; incr keeps its expiry.
+        if not cache.add(key, 1, timeout=settings.LOGIN_FAILURE_WINDOW):
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr().
+                cache.add(key, 1, timeout=settings.LOGIN_FAILURE_WINDOW)
+
+
+def clear_login_failures(email: str) -> None:
+    _cache().delete(_email_key(email))
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from learnify.utils.authentication import ROLE_CLAIM, SUPERUSER_CLAIM
+from .revocation import FAMILY_CLAIM, new_family
+
+
+class LearnifyRefreshToken(RefreshToken):
+    """Refresh token that also signs the user's role into its access tokens.
+
+    CachedJWTAuthentication can then authorize a request from the token
+    alone when AUTH_TRUST_TOKEN_CLAIMS is on. Each login starts a new token
+    family (see user.revocation), which rotated tokens keep.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[SUPERUSER_CLAIM] = user.is_superuser
+        token[FAMILY_CLAIM] = new_family()
+        return token
+
+    def sync_user(self):
+        """Re-sign the role claims from the user row before a refresh.
+
+        Raises ``TokenError`` when the user was deleted or deactivated, so a
+        demoted or removed user cannot keep old claims by refreshing.
+        """
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            )
+            .only("role", "is_superuser", "is_active")
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise TokenError("User not found or inactive")
+        self[ROLE_CLAIM] = user.role
+        self[SUPERUSER_CLAIM] = user.is_superuser
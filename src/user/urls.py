@@ -5,6 +5,7 @@ from .views import (
     UserListView,
     UserDetailView,
     RefreshTokenView,
+    LogoutView,
 )
 
 
@@ -14,4 +15,5 @@ urlpatterns = [
     path("user/", UserListView.as_view(), name="user-list"),
     path("user/<int:pk>/", UserDetailView.as_view(), name="user-detail"),
     path("user/refresh-token/", RefreshTokenView.as_view(), name="refresh-token"),
+    path("user/logout/", LogoutView.as_view(), name="user-logout"),
 ]
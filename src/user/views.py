@@ -7,10 +7,12 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.exceptions import TokenError
 
-from .models import User
+from . import revocation
+from .models import RevokedToken, User
+from .tokens import LearnifyRefreshToken
 from .serializers import (
     UserRegisterSerializer,
     UserLoginSerializer,
@@ -47,11 +49,13 @@ class UserLoginView(APIView):
     def post(
         self: "UserLoginView", request: Request, *args: Any, **kwargs: Any
     ) -> Response:
-        serializer = UserLoginSerializer(data=request.data)
+        serializer = UserLoginSerializer(
+            data=request.data, context={"request": request}
+        )
         serializer.is_valid(raise_exception=True)
 
         user = serializer.validated_data["user"]
-        refresh = RefreshToken.for_user(user)
+        refresh = LearnifyRefreshToken.for_user(user)
         return api_response(
             data={
                 "refresh": str(refresh),
@@ -63,7 +67,7 @@ class UserLoginView(APIView):
 
 
 class UserListView(APIView):
-    paginator = CustomPagination()
+    paginator = CustomPagination(keyset_ordering=("-created_at", "-id"))
     permission_classes = [IsAdmin]
 
     @swagger_auto_schema()
@@ -153,8 +157,19 @@ class RefreshTokenView(APIView):
             )
 
         try:
-            refresh = RefreshToken(refresh_token)
+            refresh = LearnifyRefreshToken(refresh_token)
+            refresh.sync_user()
+            revocation.use_refresh_token(refresh)
+            if revocation.FAMILY_CLAIM not in refresh:
+                # Issued before token families; it joins one now.
+                refresh[revocation.FAMILY_CLAIM] = revocation.new_family()
             access_token = str(refresh.access_token)
+
+            # The replacement keeps the family and the re-signed claims, under
+            # a new jti.
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
             return api_response(
                 data={"access": access_token, "refresh": str(refresh)},
                 message="Access token refreshed successfully",
@@ -165,3 +180,31 @@ class RefreshTokenView(APIView):
                 message="Invalid refresh token: " + str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
+
+
+class LogoutView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(request_body=RefreshTokenSerializer)
+    def post(
+        self: "LogoutView", request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            refresh = LearnifyRefreshToken(serializer.validated_data["refresh_token"])
+        except TokenError as e:
+            return api_response(
+                message="Invalid refresh token: " + str(e),
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Ends the session: its refresh tokens and its access tokens.
+        family = refresh.get(revocation.FAMILY_CLAIM)
+        if family is not None:
+            revocation.revoke_family(family, RevokedToken.Reason.LOGOUT)
+        return api_response(
+            message="User logged out successfully",
+            status_code=status.HTTP_200_OK,
+        )